@@ -20,9 +20,11 @@ from flask import current_app, Flask, redirect, url_for
 # Importa o módulo Helper
 import utils.helper
 from utils.helper import _error
+from utils.helper import JSONEncoderAPI
 from utils.helper import InputException
 from utils.helper import BusinessException
 from utils.helper import ServerException
+from utils import instrumentacao
 
 def create_app(config, debug=False, testing=False, config_overrides=None):
     app = Flask(__name__)
@@ -31,15 +33,17 @@ def create_app(config, debug=False, testing=False, config_overrides=None):
 
     app.debug = debug
     app.testing = testing
+    # Serializa Decimal, datas e objetos de negócio diretamente na geração do JSON das respostas
+    app.json_encoder = JSONEncoderAPI
 
     if config_overrides:
         app.config.update(config_overrides)
 
+    # Inicializa o objeto para gravação de logs (utilizado pelos tratamentos de erro também em testes)
+    logger = logging.getLogger('Controller API')
     # Configure logging
     if not app.testing:
-        # Inicializa o objeto para gravação de logs
         logging.basicConfig(level=logging.INFO)
-        logger = logging.getLogger('Controller API')
         logger.setLevel(logging.INFO)
 
     # Setup the data model.
@@ -47,6 +51,9 @@ def create_app(config, debug=False, testing=False, config_overrides=None):
         model = get_model()
         model.init_app(app)
 
+    # Tempo por etapa das requisições (Server-Timing) e perfilamento por amostragem
+    instrumentacao.init_app(app)
+
     # Register the Bookshelf CRUD blueprint.
     from .api import api
     app.register_blueprint(api, url_prefix='/api')
@@ -1,16 +1,24 @@
 # Importa o módulo responsável por selecionar o banco de dados conforme configuração no pacote model
 from model import get_model
+# Importa o cache em memória dos feriados
+from model import cache_feriados
 # Importa módulos utilizados do framework Flask
-from flask import Blueprint, redirect, render_template, request, url_for, jsonify
+from flask import Blueprint, current_app, redirect, render_template, request, url_for, jsonify, stream_with_context
 # Importanto módulo para tratamento de números decimais
-from decimal import Decimal, getcontext
+from decimal import Decimal
 # Importa módulo para tratamento de data/hora
 from datetime import datetime
 # Importa módulo pra tratamento de arquivos json
 import json
+# Importa módulos para medição de tempo e controle de concorrência
+import time
+import threading
 # Importa o módulo Helper
 import utils.helper
 from utils.helper import _success
+from utils.helper import _stream_success
+from utils.helper import _stream_ndjson
+from utils.helper import TipoFormato
 from utils.helper import _error
 from utils.helper import _variable
 from utils.helper import _clean_attributes
@@ -20,12 +28,18 @@ from utils.helper import _converter_datas_dict
 from utils.helper import InputException
 from utils.helper import BusinessException
 from utils.helper import ServerException
+from utils.cache import CacheLRU
+from utils import instrumentacao
+from utils.instrumentacao import etapa
 # Importa o módulo de log
 import logging
 # Importa as classes de negócio
 from negocio.investimento import Investimento
 from negocio.gestaocadastro import GestaoCadastro
 from negocio.calendario import Calendario
+from negocio.motorcalculo import TipoMotor, TipoDetalhe
+from negocio.indexador import TipoIndexador
+from negocio.projecao import TipoModeloProjecao
 
 # Inicializa o objeto para gravação de logs
 logger = logging.getLogger('Gerenciador API')
@@ -34,143 +48,284 @@ logger.setLevel(logging.INFO)
 # Criando blueprint do módulo da API
 api = Blueprint('api', __name__)
 
-@api.route('/investimento', methods=['GET'])
-def calcular_investimento():
-    """Calcula a evolução do investimento a partir de um valor inicial aplicando os indices referentes 
-    ao período, indexador e taxa informados.
-    
+# Cache das respostas de /investimento (criado na primeira requisição com a capacidade definida em CACHE_INVESTIMENTOS_MAX_BYTES)
+_cacheInvestimentos = None
+_lockCacheInvestimentos = threading.Lock()
+
+def _get_cache_investimentos():
+    """Retorna o cache LRU das respostas de cálculo de investimento do processo ou None quando desabilitado
+    (CACHE_INVESTIMENTOS_MAX_BYTES = 0).
+    """
+    global _cacheInvestimentos
+    if _cacheInvestimentos is None:
+        with _lockCacheInvestimentos:
+            if _cacheInvestimentos is None:
+                _cacheInvestimentos = CacheLRU('investimentos', current_app.config.get('CACHE_INVESTIMENTOS_MAX_BYTES', 64 * 1024 * 1024))
+    return _cacheInvestimentos if _cacheInvestimentos.capacidadeBytes > 0 else None
+
+def _chave_cache_investimento(parametros: dict, versao):
+    """Monta a chave do cache de um cálculo de investimento a partir dos parâmetros validados e da versão do 
+    indexador gravada no banco de dados (data do último índice e data/hora da última atualização, ver 
+    GestaoCadastro.versao_indexador). Quando a carga de índices (atualizar_indices) é executada em qualquer 
+    processo o registro do indexador muda e as respostas anteriores deixam de ser utilizadas por todos os processos.
+
     Argumentos:
-        tipoInvestimento: tipo de investimento (ex.: CDB, LCI, LCA, Poupanca)
-        tipoRendimento: 
-           pre: pré-fixado (7% a.a) - requer campo taxaPrefixada
-           pos: pós-fixado (120% do CDI) - requer campo taxa
-           hibrido: misto de pré-fixado e pós-fixado (ex.: IPCA + 7% a.a.) - requer campos taxa e taxaPrefixada
-        valor: valor inicial do investimento
-        indexador: nome identificador do indexador (ex.: ipca, selic)
-        taxa: percentual aplicado sobre o índice (ex.: 130 (130% do cdi))
-        taxaPrefixada: percentual prefixado anual para investimentos prerfixados ou híbridos (ex.: Préfixado - 7% a.a ou Híbrido - 7% a.a. + IPCA (IPCA + 7%))
-        dataInicial: data inicial do investimento
-        dataFinal: data de vencimento do investimento
+        parametros: dictionary retornado por _obter_parametros_investimento
+        versao: versão do indexador ou None para investimentos pré-fixados
+    """
+    # Decimais de mesmo valor (ex.: 100 e 100.0) possuem o mesmo hash e são considerados iguais
+    return tuple(sorted(parametros.items())) + (versao,)
+
+def _obter_formato(parametros):
+    """Valida e retorna o formato de resposta solicitado (ver TipoFormato). Padrão: json.
+    """
+    formato = str(parametros.get('formato', TipoFormato.JSON.value)).lower()
+    if formato not in TipoFormato.values():
+        mensagem  = "Formato de resposta inválido. Valores esperados: {}.".format(TipoFormato.values())
+        raise InputException('formato', mensagem)
+    return formato
+
+def _stream_response(formato: str, body: dict, caminho: tuple, itens, complemento=None):
+    """Monta a resposta transmitida em partes (chunked) no formato solicitado a partir de um iterável de itens.
+    No formato json-stream o JSON é idêntico ao de _success (com a lista em caminho). No formato ndjson a primeira 
+    linha contém body, cada linha seguinte um item e a última linha o complemento.
+
+    Argumentos:
+        formato: json-stream ou ndjson (ver TipoFormato)
+        body: corpo da resposta sem a lista transmitida
+        caminho: chaves até a lista transmitida. Ex.: ('resultadoInvestimento', 'evolucao')
+        itens: iterável (ex.: generator) com os itens da lista
+        complemento: (opcional) função que retorna os atributos do objeto que contém a lista, chamada após o último item
+    """
+    if formato == TipoFormato.NDJSON.value:
+        partes = _stream_ndjson(body, itens, (lambda: {caminho[0]: complemento()}) if complemento is not None else None)
+        mimetype = 'application/x-ndjson'
+    else:
+        partes = _stream_success(body, caminho, itens, complemento)
+        mimetype = 'application/json'
+    return current_app.response_class(stream_with_context(partes), mimetype=mimetype), 200, {'Access-Control-Allow-Origin': '*'}
+
+def _obter_parametros_investimento(parametros, prefixo: str = ''):
+    """Resgata e valida os parâmetros de entrada para cálculo da evolução de um investimento.
+
+    Argumentos:
+        parametros: dictionary (ou query string) contendo os parâmetros do investimento
+        prefixo: prefixo incluído no nome do atributo das mensagens de erro (ex.: investimentos[0].)
     Retorno:
-            Retorna uma lista contendo dictionaries referentes aos valores 
-            de saldo e rentabilidade do investimento além de uma sublista 
-            da evolução do valor inicial em função do tempo (período informado)
+        Dictionary com os parâmetros validados e convertidos para os tipos esperados pelo cálculo.
     """
-    # Obtém argumentos
-    queryParameters = request.args
-    
-    # Loga os estado atual do indexador
-    logger.info("Parâmetros recebidos para cálculo do investimento: {}".format(queryParameters))
-    # Define a precisão da classe Decimal para 9 casas decimais
-    getcontext().prec = 9
     # ------------------------------------------------------------------------------ #
     # Resgata e valida os dados de entrada para cálculo da evolução do investimento
     # ------------------------------------------------------------------------------ #
     # Validação - indexador
-    if 'tipoInvestimento' not in queryParameters:
+    if 'tipoInvestimento' not in parametros:
         mensagem  = "Você deve informar o tipo de investimento."
-        raise InputException('tipoInvestimento', mensagem)
+        raise InputException(prefixo + 'tipoInvestimento', mensagem)
     else:
-        tipoInvestimento = queryParameters.get('tipoInvestimento')
+        tipoInvestimento = str(parametros.get('tipoInvestimento'))
     
     # TODO: Verificar se é um tipo de investimento válido
 
     # Validação - tipoRendimento
-    if 'tipoRendimento' not in queryParameters:
+    if 'tipoRendimento' not in parametros:
         mensagem  = "Você deve informar o tipo de rendimento (pré-fixado, pós-fixado ou híbrido)."
-        raise InputException('tipoRendimento', mensagem)
+        raise InputException(prefixo + 'tipoRendimento', mensagem)
     else:
-        tipoRendimento = queryParameters.get('tipoRendimento')
+        tipoRendimento = str(parametros.get('tipoRendimento'))
 
     # Validação - valor
-    if 'valor' not in queryParameters:
+    if 'valor' not in parametros:
         mensagem  = "Você deve informar o valor inicial do investimento."
-        raise InputException('valor', mensagem)
-    elif _is_number(queryParameters.get('valor')) == False:
+        raise InputException(prefixo + 'valor', mensagem)
+    elif isinstance(parametros.get('valor'), bool) or _is_number(parametros.get('valor')) == False:
         mensagem  = "O valor inicial do investimento é inválido. Utilizar ponto ao invés de virgula para casas decimais."
-        raise InputException('valor', mensagem)
+        raise InputException(prefixo + 'valor', mensagem)
     else:
-        valInvestimentoInicial = Decimal(queryParameters.get('valor'))
+        valInvestimentoInicial = Decimal(str(parametros.get('valor')))
     
     taxaPrefixada = Decimal(0)
     if tipoRendimento.lower() == 'pre' or tipoRendimento.lower() == 'hibrido':
         # Validação - taxa
-        if 'taxaPrefixada' not in queryParameters:
+        if 'taxaPrefixada' not in parametros:
             mensagem  = "Você deve informar a taxa pré-fixada."
-            raise InputException('taxaPrefixada', mensagem)
-        elif _is_number(queryParameters.get('taxaPrefixada')) == False:
+            raise InputException(prefixo + 'taxaPrefixada', mensagem)
+        elif isinstance(parametros.get('taxaPrefixada'), bool) or _is_number(parametros.get('taxaPrefixada')) == False:
             mensagem  = "Taxa pré-fixada é inválida. Utilizar ponto ao invés de virgula para casas decimais."
-            raise InputException('taxaPrefixada', mensagem)
+            raise InputException(prefixo + 'taxaPrefixada', mensagem)
         else:
-            taxaPrefixada = Decimal(queryParameters.get('taxaPrefixada'))
+            taxaPrefixada = Decimal(str(parametros.get('taxaPrefixada')))
 
     # Validação - indexador
     indexador = None
     if tipoRendimento.lower() != 'pre':
-        if 'indexador' not in queryParameters:
+        if 'indexador' not in parametros:
             mensagem  = "Você deve informar o indexador do investimento."
-            raise InputException('indexador', mensagem)
+            raise InputException(prefixo + 'indexador', mensagem)
         else:
-            indexador = queryParameters.get('indexador')
+            indexador = str(parametros.get('indexador'))
     
     # TODO: Verificar se é um indexador válido
 
     # Validação - taxa
     taxa = Decimal(100)
     if tipoRendimento.lower() != 'pre':
-        if 'taxa' not in queryParameters:
+        if 'taxa' not in parametros:
             mensagem  = "Você deve informar a taxa relativa ao indexador do investimento."
-            raise InputException('taxa', mensagem)
-        elif _is_number(queryParameters.get('taxa')) == False:
+            raise InputException(prefixo + 'taxa', mensagem)
+        elif isinstance(parametros.get('taxa'), bool) or _is_number(parametros.get('taxa')) == False:
             mensagem  = "Taxa relativa ao indexador do investimento é inválida. Utilizar ponto ao invés de virgula para casas decimais."
-            raise InputException('taxa', mensagem)
+            raise InputException(prefixo + 'taxa', mensagem)
         else:
-            taxa = Decimal(queryParameters.get('taxa'))
+            taxa = Decimal(str(parametros.get('taxa')))
 
     # taxaPrefixada = Decimal(100)
     # # Validação - taxaPrefixada
-    # if 'taxaPrefixada' not in queryParameters:
+    # if 'taxaPrefixada' not in parametros:
     #     mensagem  = "Você deve informar a taxa prefixada ."
-    #     raise InputException('taxa', mensagem)
-    # elif _is_number(queryParameters.get('taxa')) == False:
+    #     raise InputException(prefixo + 'taxa', mensagem)
+    # elif _is_number(parametros.get('taxa')) == False:
     #     mensagem  = "Taxa relativa ao indexador do investimento é inválida. Utilizar ponto ao invés de virgula para casas decimais."
-    #     raise InputException('taxa', mensagem)
+    #     raise InputException(prefixo + 'taxa', mensagem)
     # else:
-    #     taxa = Decimal(queryParameters.get('taxa'))
+    #     taxa = Decimal(str(parametros.get('taxa')))
 
     # Validação - dataInicial
-    if 'dataInicial' not in queryParameters:
+    if 'dataInicial' not in parametros:
         mensagem  = "Você deve informar a data inicial do investimento. Formato esperado: AAAA-MM-DD"
-        raise InputException('dataInicial', mensagem)
-    elif _is_date(queryParameters.get('dataInicial'), "%Y-%m-%d") == False:
+        raise InputException(prefixo + 'dataInicial', mensagem)
+    elif _is_date(parametros.get('dataInicial'), "%Y-%m-%d") == False:
         mensagem  = "Data inicial do investimento inválida. Formato esperado: AAAA-MM-DD"
-        raise InputException('dataInicial', mensagem)
+        raise InputException(prefixo + 'dataInicial', mensagem)
     else:
-        dataInicial = datetime.strptime(queryParameters.get('dataInicial'), "%Y-%m-%d").date()
+        dataInicial = datetime.strptime(parametros.get('dataInicial'), "%Y-%m-%d").date()
 
     # Validação - dataFinal
-    if 'dataFinal' not in queryParameters:
+    if 'dataFinal' not in parametros:
         # mensagem  = "Você deve informar a data final do investimento. Formato esperado: AAAA-MM-DD"
-        # raise InputException('dataFinal', mensagem)
+        # raise InputException(prefixo + 'dataFinal', mensagem)
         # Quando não informada assumir data atual
         dataFinal = datetime.now().date()
-    elif _is_date(queryParameters.get('dataFinal'), '%Y-%m-%d') == False:
+    elif _is_date(parametros.get('dataFinal'), '%Y-%m-%d') == False:
         mensagem  = "Data final do investimento inválida. Formato esperado: AAAA-MM-DD"
-        raise InputException('dataFinal', mensagem)
+        raise InputException(prefixo + 'dataFinal', mensagem)
     else:
-        dataFinal = datetime.strptime(queryParameters.get('dataFinal'), "%Y-%m-%d").date()
+        dataFinal = datetime.strptime(parametros.get('dataFinal'), "%Y-%m-%d").date()
+
+    # Validação - motor
+    motor = str(parametros.get('motor', TipoMotor.ITERATIVO.value)).lower()
+    if motor not in TipoMotor.values():
+        mensagem  = "Motor de cálculo inválido. Motores esperados: {}.".format(TipoMotor.values())
+        raise InputException(prefixo + 'motor', mensagem)
+
+    # Validação - arredondamentoDiario
+    arredondamentoDiario = str(parametros.get('arredondamentoDiario', 'true')).lower()
+    if arredondamentoDiario not in ('true', 'false'):
+        mensagem  = "Arredondamento diário inválido. Valores esperados: true ou false."
+        raise InputException(prefixo + 'arredondamentoDiario', mensagem)
+    else:
+        arredondamentoDiario = arredondamentoDiario == 'true'
+
+    # Validação - detalhe
+    detalhe = str(parametros.get('detalhe', TipoDetalhe.DIARIO.value)).lower()
+    if detalhe not in TipoDetalhe.values():
+        mensagem  = "Detalhe da evolução do investimento inválido. Valores esperados: {}.".format(TipoDetalhe.values())
+        raise InputException(prefixo + 'detalhe', mensagem)
+
+    return {'tipoInvestimento': tipoInvestimento, 'tipoRendimento': tipoRendimento, 'valInvestimentoInicial': valInvestimentoInicial, 
+            'indexador': indexador, 'taxa': taxa, 'taxaPrefixada': taxaPrefixada, 'dataInicial': dataInicial, 'dataFinal': dataFinal, 
+            'motor': motor, 'arredondamentoDiario': arredondamentoDiario, 'detalhe': detalhe}
+
+@api.route('/investimento', methods=['GET'])
+def calcular_investimento():
+    """Calcula a evolução do investimento a partir de um valor inicial aplicando os indices referentes 
+    ao período, indexador e taxa informados.
+    
+    Argumentos:
+        tipoInvestimento: tipo de investimento (ex.: CDB, LCI, LCA, Poupanca)
+        tipoRendimento: 
+           pre: pré-fixado (7% a.a) - requer campo taxaPrefixada
+           pos: pós-fixado (120% do CDI) - requer campo taxa
+           hibrido: misto de pré-fixado e pós-fixado (ex.: IPCA + 7% a.a.) - requer campos taxa e taxaPrefixada
+        valor: valor inicial do investimento
+        indexador: nome identificador do indexador (ex.: ipca, selic)
+        taxa: percentual aplicado sobre o índice (ex.: 130 (130% do cdi))
+        taxaPrefixada: percentual prefixado anual para investimentos prerfixados ou híbridos (ex.: Préfixado - 7% a.a ou Híbrido - 7% a.a. + IPCA (IPCA + 7%))
+        dataInicial: data inicial do investimento
+        dataFinal: data de vencimento do investimento
+        motor: (opcional) motor de cálculo: iterativo (padrão) ou vetorizado
+        arredondamentoDiario: (opcional) arredonda o saldo para 2 casas decimais a cada dia (padrão: true)
+        detalhe: (opcional) detalhe da evolução do investimento: none, mensal ou diario (padrão)
+        formato: (opcional) formato da resposta: json (padrão), json-stream (mesmo JSON transmitido em partes à medida 
+        que a evolução é calculada) ou ndjson (um JSON por linha: mensagem, itens da evolução e resultado do investimento)
+    Retorno:
+            Retorna uma lista contendo dictionaries referentes aos valores 
+            de saldo e rentabilidade do investimento além de uma sublista 
+            da evolução do valor inicial em função do tempo (período informado)
+    """
+    # Obtém argumentos
+    queryParameters = request.args
     
+    # Loga os estado atual do indexador
+    logger.info("Parâmetros recebidos para cálculo do investimento: {}".format(queryParameters))
+    # Resgata e valida os dados de entrada para cálculo da evolução do investimento
+    with etapa('conversao'):
+        parametros = _obter_parametros_investimento(queryParameters)
+        motor = parametros.pop('motor')
+        arredondamentoDiario = parametros.pop('arredondamentoDiario')
+        detalhe = parametros.pop('detalhe')
+        formato = _obter_formato(queryParameters)
+
+    if formato != TipoFormato.JSON.value:
+        # Respostas transmitidas em partes não utilizam o cache de respostas
+        try:
+            objInvest = Investimento(**parametros)
+            # Validação e obtenção dos índices ocorrem aqui, antes do início da transmissão
+            with etapa('calculo'):
+                evolucao = objInvest.gerar_evolucao(motor=motor, arredondamentoDiario=arredondamentoDiario, detalhe=detalhe)
+        except BusinessException as be:
+            raise be
+        except Exception as e:
+            raise ServerException(e)
+        # Saldo e rentabilidade são atualizados ao final da iteração da evolução
+        resumo = lambda: dict((atributo, valor) for atributo, valor in objInvest.__dict__.items() if atributo != 'evolucao')
+        return _stream_response(formato, {'mensagem': 'Cálculo do investimento realizado com sucesso!'}, 
+                                ('resultadoInvestimento', 'evolucao'), evolucao, resumo)
+
     try: 
+        # Consulta o cache de respostas (somente para indexadores conhecidos, os demais são rejeitados no cálculo)
+        cache = _get_cache_investimentos()
+        chave = None
+        serieIndices = None
+        objIndexador = None
+        if cache is not None:
+            if parametros['tipoRendimento'].lower() == 'pre':
+                chave = _chave_cache_investimento(dict(parametros, motor=motor, arredondamentoDiario=arredondamentoDiario, detalhe=detalhe), None)
+            elif parametros['indexador'].lower() in TipoIndexador.values():
+                # Versão lida do registro do indexador: a série em memória é revalidada quando outro processo gravou índices
+                objGestaoCadastro = GestaoCadastro()
+                objIndexador = objGestaoCadastro.get_indexador(parametros['indexador'])
+                versao = objGestaoCadastro.versao_indexador(objIndexador)
+                serieIndices = objGestaoCadastro.get_serie_indices(parametros['indexador'], versao)
+                chave = _chave_cache_investimento(dict(parametros, motor=motor, arredondamentoDiario=arredondamentoDiario, detalhe=detalhe), versao)
+        if chave is not None:
+            corpo = cache.obter(chave)
+            if corpo is not None:
+                return current_app.response_class(corpo, mimetype='application/json'), 200, {'Access-Control-Allow-Origin': '*', 'X-Cache': 'HIT'}
         # Instancia a classe de negócio Investimento 
-        objInvest = Investimento(tipoInvestimento=tipoInvestimento, tipoRendimento=tipoRendimento, valInvestimentoInicial=valInvestimentoInicial, indexador=indexador, taxa=taxa, taxaPrefixada=taxaPrefixada, dataInicial=dataInicial, dataFinal=dataFinal)
+        objInvest = Investimento(**parametros)
         # Realiza o cálculo de evolução do investimento
-        resultadoInvestimento = objInvest.calcular_investimento()
+        with etapa('calculo'):
+            resultadoInvestimento = objInvest.calcular_investimento(motor=motor, arredondamentoDiario=arredondamentoDiario, serieIndices=serieIndices, objIndexador=objIndexador, detalhe=detalhe)
     except BusinessException as be:
         raise be
     except Exception as e:
         raise ServerException(e)
     else:
-        return _success({ 'mensagem': 'Cálculo do investimento realizado com sucesso!', 'resultadoInvestimento': resultadoInvestimento }, 200), 200, {'Access-Control-Allow-Origin': '*'} 
+        resposta = _success({ 'mensagem': 'Cálculo do investimento realizado com sucesso!', 'resultadoInvestimento': resultadoInvestimento }, 200)
+        if chave is not None:
+            corpo = resposta.get_data()
+            cache.armazenar(chave, corpo, len(corpo))
+        return resposta, 200, {'Access-Control-Allow-Origin': '*', 'X-Cache': 'MISS'} 
 
 @api.route('/investimento', methods=['OPTIONS'])
 def investimento_options (self):
@@ -178,6 +333,333 @@ def investimento_options (self):
     { 'Access-Control-Allow-Origin': '*', \
     'Access-Control-Allow-Methods' : 'GET' }
 
+@api.route('/investimento/projecao', methods=['GET'])
+def projetar_investimento():
+    """Projeta a distribuição do saldo de um investimento pós-fixado ou híbrido cuja data final é posterior 
+    ao último índice conhecido do indexador através de simulação de Monte Carlo dos índices futuros.
+
+    Argumentos:
+        mesmos argumentos de /investimento (exceto motor, arredondamentoDiario, detalhe e formato) e:
+        cenarios: (opcional) quantidade de cenários simulados (padrão: 10000, máximo: PROJECAO_MAX_CENARIOS)
+        modelo: (opcional) modelo dos índices futuros: bootstrap (padrão, índices sorteados da série histórica) 
+        ou reversao-media (processo com reversão à média estimado na série histórica)
+        semente: (opcional) semente da simulação para reprodução de um resultado anterior
+    Retorno:
+        Dados da simulação, saldo líquido médio, percentual de cenários com prejuízo e os saldos bruto 
+        e líquido (após imposto de renda) dos percentis 5, 10, 25, 50, 75, 90 e 95.
+    """
+    # Obtém argumentos
+    queryParameters = request.args
+    # Loga os estado atual do indexador
+    logger.info("Parâmetros recebidos para projeção do investimento: {}".format(queryParameters))
+    with etapa('conversao'):
+        # Resgata e valida os dados de entrada do investimento
+        parametros = _obter_parametros_investimento(queryParameters)
+        for atributo in ('motor', 'arredondamentoDiario', 'detalhe'):
+            parametros.pop(atributo)
+
+        # Validação - cenarios
+        qtdMaxima = current_app.config.get('PROJECAO_MAX_CENARIOS', 50000)
+        cenarios = queryParameters.get('cenarios', '10000')
+        if not cenarios.isdigit() or int(cenarios) == 0 or int(cenarios) > qtdMaxima:
+            mensagem  = "Quantidade de cenários inválida. Informe um número inteiro entre 1 e {}.".format(qtdMaxima)
+            raise InputException('cenarios', mensagem)
+        cenarios = int(cenarios)
+
+        # Validação - modelo
+        modelo = str(queryParameters.get('modelo', TipoModeloProjecao.BOOTSTRAP.value)).lower()
+        if modelo not in TipoModeloProjecao.values():
+            mensagem  = "Modelo de projeção inválido. Valores esperados: {}.".format(TipoModeloProjecao.values())
+            raise InputException('modelo', mensagem)
+
+        # Validação - semente
+        semente = queryParameters.get('semente')
+        if semente is not None:
+            if not semente.isdigit():
+                mensagem  = "Semente inválida. Informe um número inteiro não negativo."
+                raise InputException('semente', mensagem)
+            semente = int(semente)
+
+    try:
+        # Quantidade de processos da simulação (padrão: 1, simulação no próprio processo; ver PROJECAO_PROCESSOS)
+        qtdProcessos = max(int(current_app.config.get('PROJECAO_PROCESSOS', 1) or 1), 1)
+        # Instancia a classe de negócio Investimento 
+        objInvest = Investimento(**parametros)
+        # Realiza a projeção do investimento
+        with etapa('calculo'):
+            projecaoInvestimento = objInvest.projetar_investimento(qtdCenarios=cenarios, modelo=modelo, semente=semente, qtdProcessos=qtdProcessos)
+    except BusinessException as be:
+        raise be
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        resposta = {'mensagem': 'Projeção do investimento realizada com sucesso!', 'projecaoInvestimento': projecaoInvestimento}
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'}
+
+@api.route('/investimento/backtest', methods=['GET'])
+def backtest_investimento():
+    """Calcula a rentabilidade histórica de um investimento pós-fixado ou híbrido em janelas deslizantes
+    (ex.: rentabilidade de 120% do CDI em cada janela de 12 meses desde 2005), uma janela para cada data
+    da série de índices do indexador, em uma única passagem sobre a série.
+
+    Argumentos:
+        mesmos argumentos de /investimento (exceto motor, arredondamentoDiario, detalhe e formato), onde
+        dataInicial e dataFinal delimitam o período das janelas e:
+        meses: (opcional) duração de cada janela em meses (padrão: 12, máximo: 360)
+        indexadorComparacao: (opcional) indexador cuja rentabilidade nas mesmas janelas é comparada à
+        rentabilidade líquida do investimento (ex.: ipca)
+        taxaComparacao: (opcional) percentual aplicado sobre o indexador de comparação (padrão: 100)
+    Retorno:
+        Dados do investimento, estatísticas das rentabilidades e a lista de janelas com as datas inicial e final
+        e as rentabilidades bruta, líquida e do indexador de comparação (em percentual).
+    """
+    # Obtém argumentos
+    queryParameters = request.args
+    # Loga os estado atual do indexador
+    logger.info("Parâmetros recebidos para backtest do investimento: {}".format(queryParameters))
+    with etapa('conversao'):
+        # Resgata e valida os dados de entrada do investimento
+        parametros = _obter_parametros_investimento(queryParameters)
+        for atributo in ('motor', 'arredondamentoDiario', 'detalhe'):
+            parametros.pop(atributo)
+
+        # Validação - meses
+        meses = queryParameters.get('meses', '12')
+        if not meses.isdigit() or int(meses) == 0 or int(meses) > 360:
+            mensagem  = "Duração das janelas inválida. Informe um número inteiro de meses entre 1 e 360."
+            raise InputException('meses', mensagem)
+        meses = int(meses)
+
+        # Validação - indexadorComparacao
+        indexadorComparacao = queryParameters.get('indexadorComparacao')
+        if indexadorComparacao is not None:
+            indexadorComparacao = indexadorComparacao.lower()
+            if indexadorComparacao not in TipoIndexador.values():
+                mensagem  = "Indexador de comparação inválido. Valores esperados: {}.".format(TipoIndexador.values())
+                raise InputException('indexadorComparacao', mensagem)
+
+        # Validação - taxaComparacao
+        taxaComparacao = queryParameters.get('taxaComparacao', '100')
+        if _is_number(taxaComparacao) == False or Decimal(str(taxaComparacao)) <= Decimal(0):
+            mensagem  = "Taxa relativa ao indexador de comparação é inválida. Utilizar ponto ao invés de virgula para casas decimais."
+            raise InputException('taxaComparacao', mensagem)
+        taxaComparacao = Decimal(str(taxaComparacao))
+
+    try:
+        # Instancia a classe de negócio Investimento
+        objInvest = Investimento(**parametros)
+        # Realiza o backtest do investimento
+        with etapa('calculo'):
+            backtestInvestimento = objInvest.backtest_investimento(qtdMeses=meses, indexadorComparacao=indexadorComparacao, taxaComparacao=taxaComparacao)
+    except BusinessException as be:
+        raise be
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        resposta = {'mensagem': 'Backtest do investimento realizado com sucesso!', 'backtestInvestimento': backtestInvestimento}
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'}
+
+@api.route('/investimentos/comparacao', methods=['POST'], provide_automatic_options=False)
+def comparar_investimentos():
+    """Calcula em uma única requisição a evolução de uma lista de investimentos. As séries de índices 
+    e os dados de cada indexador e o calendário de dias úteis são obtidos uma única vez e compartilhados 
+    entre todos os investimentos da lista.
+
+    Argumentos (corpo JSON):
+        investimentos: lista de investimentos, cada um com os mesmos argumentos de /investimento 
+        (tipoInvestimento, tipoRendimento, valor, indexador, taxa, taxaPrefixada, dataInicial, dataFinal, 
+        motor, arredondamentoDiario, detalhe). Ex.:
+            {"investimentos": [{"tipoInvestimento": "cdb", "tipoRendimento": "pos", "valor": 1000, 
+                                "indexador": "cdi", "taxa": 120, "dataInicial": "2019-01-01"}, ...]}
+    Retorno:
+        Lista com o resultado de cada investimento (ou o erro de negócio correspondente) na mesma ordem 
+        da lista recebida e os tempos (em milissegundos) de carga dos dados, de cálculo e médio por investimento.
+    """
+    # Obtém argumentos
+    dados = request.get_json(silent=True)
+    # Loga os estado atual do indexador
+    logger.info("Parâmetros recebidos para comparação de investimentos: {}".format(dados))
+    # ------------------------------------------------------------------------------ #
+    # Resgata e valida os dados de entrada
+    # ------------------------------------------------------------------------------ #
+    # Validação - investimentos
+    qtdMaxima = current_app.config.get('COMPARACAO_MAX_INVESTIMENTOS', 20)
+    if not isinstance(dados, dict) or not isinstance(dados.get('investimentos'), list) or len(dados['investimentos']) == 0:
+        mensagem  = "Você deve informar a lista de investimentos a serem comparados."
+        raise InputException('investimentos', mensagem)
+    elif len(dados['investimentos']) > qtdMaxima:
+        mensagem  = "Quantidade de investimentos a serem comparados não pode ser maior que {}.".format(qtdMaxima)
+        raise InputException('investimentos', mensagem)
+
+    listaParametros = []
+    for posicao, investimento in enumerate(dados['investimentos']):
+        prefixo = 'investimentos[{}].'.format(posicao)
+        if not isinstance(investimento, dict):
+            mensagem  = "Investimento inválido. Esperado objeto com os argumentos do investimento."
+            raise InputException(prefixo[:-1], mensagem)
+        with etapa('conversao'):
+            listaParametros.append(_obter_parametros_investimento(investimento, prefixo))
+
+    try:
+        instanteInicial = time.perf_counter()
+        # Instancia a classe de negócios responsável pela gestão de cadastros da API
+        objGestaoCadastro = GestaoCadastro()
+        # Obtém uma única vez a série de índices e os dados de cada indexador utilizado
+        series = {}
+        indexadores = {}
+        for parametros in listaParametros:
+            if parametros['tipoRendimento'].lower() != 'pre':
+                indexador = parametros['indexador'].lower()
+                if indexador in TipoIndexador.values() and indexador not in series:
+                    series[indexador] = objGestaoCadastro.get_serie_indices(indexador)
+                    indexadores[indexador] = objGestaoCadastro.get_indexador(indexador)
+        # Garante o calendário de dias úteis carregado em memória
+        Calendario.carregarCalendario()
+        tempoCarga = time.perf_counter() - instanteInicial
+
+        # Calcula cada investimento compartilhando as séries e indexadores obtidos
+        resultados = []
+        for parametros in listaParametros:
+            motor = parametros.pop('motor')
+            arredondamentoDiario = parametros.pop('arredondamentoDiario')
+            detalhe = parametros.pop('detalhe')
+            indexador = parametros['indexador'].lower() if parametros['indexador'] is not None else None
+            instanteCalculo = time.perf_counter()
+            try:
+                # Instancia a classe de negócio Investimento 
+                objInvest = Investimento(**parametros)
+                # Realiza o cálculo de evolução do investimento
+                with etapa('calculo'):
+                    objInvest.calcular_investimento(motor=motor, arredondamentoDiario=arredondamentoDiario, serieIndices=series.get(indexador), objIndexador=indexadores.get(indexador), detalhe=detalhe)
+                resultado = {'resultadoInvestimento': objInvest}
+            except BusinessException as be:
+                resultado = {'BusinessException': {'codigo': be.codigo, 'mensagem': be.mensagem}}
+            resultado['tempoCalculo'] = round((time.perf_counter() - instanteCalculo) * 1000, 3)
+            resultados.append(resultado)
+        tempoTotal = time.perf_counter() - instanteInicial
+    except BusinessException as be:
+        raise be
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        tempos = {'carga': round(tempoCarga * 1000, 3), 
+                  'calculo': round((tempoTotal - tempoCarga) * 1000, 3), 
+                  'total': round(tempoTotal * 1000, 3), 
+                  'medioPorInvestimento': round(tempoTotal * 1000 / len(resultados), 3)}
+        resposta = {'mensagem': 'Comparação dos investimentos realizada com sucesso!', 'resultados': resultados, 'tempos': tempos}
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'} 
+
+@api.route('/investimentos/comparacao', methods=['OPTIONS'])
+def comparacao_options():
+    return '', 200, \
+    { 'Access-Control-Allow-Origin': '*', \
+    'Access-Control-Allow-Methods' : 'POST', \
+    'Access-Control-Allow-Headers' : 'Content-Type' }
+
+@api.route('/investimento/taxa-equilibrio', methods=['POST'], provide_automatic_options=False)
+def calcular_taxa_equilibrio():
+    """Calcula a taxa (percentual do indexador) ou a taxa pré-fixada anual mínima para que o investimento atinja
+    um saldo líquido alvo ou o saldo líquido de um investimento de referência (ex.: taxa do CDB equivalente
+    a uma LCI de 95% do CDI). A série de índices e o calendário são obtidos uma única vez.
+
+    Argumentos (corpo JSON):
+        investimento: argumentos de /investimento (a variável calculada pode ser omitida)
+        variavel: (opcional) taxa ou taxaPrefixada (padrão: taxaPrefixada para investimentos pré-fixados e taxa
+        para os demais)
+        valSaldoLiquidoAlvo: saldo líquido a ser atingido na data final ou
+        investimentoReferencia: argumentos de /investimento do investimento cujo saldo líquido deve ser atingido. Ex.:
+            {"investimento": {"tipoInvestimento": "cdb", "tipoRendimento": "pos", "valor": 1000, "indexador": "cdi",
+                              "dataInicial": "2019-01-02", "dataFinal": "2021-01-04"},
+             "investimentoReferencia": {"tipoInvestimento": "lci", "tipoRendimento": "pos", "valor": 1000,
+                                        "indexador": "cdi", "taxa": 95, "dataInicial": "2019-01-02", "dataFinal": "2021-01-04"}}
+    Retorno:
+        Variável e valor encontrados, saldo líquido alvo, quantidade de iterações e de cálculos completos, o investimento calculado com o
+        valor encontrado e o investimento de referência (quando informado), ambos sem evolução.
+    """
+    # Obtém argumentos
+    dados = request.get_json(silent=True)
+    # Loga os estado atual do indexador
+    logger.info("Parâmetros recebidos para cálculo da taxa de equilíbrio: {}".format(dados))
+    # ------------------------------------------------------------------------------ #
+    # Resgata e valida os dados de entrada
+    # ------------------------------------------------------------------------------ #
+    with etapa('conversao'):
+        # Validação - investimento
+        if not isinstance(dados, dict) or not isinstance(dados.get('investimento'), dict):
+            mensagem  = "Você deve informar o investimento cuja taxa será calculada."
+            raise InputException('investimento', mensagem)
+        investimento = dict(dados['investimento'])
+        tipoRendimento = str(investimento.get('tipoRendimento', '')).lower()
+
+        # Validação - variavel
+        variavel = str(dados.get('variavel', 'taxaPrefixada' if tipoRendimento == 'pre' else 'taxa'))
+        if variavel not in ('taxa', 'taxaPrefixada'):
+            mensagem  = "Variável inválida. Valores esperados: ['taxa', 'taxaPrefixada']."
+            raise InputException('variavel', mensagem)
+        # O valor da variável calculada não é obrigatório no investimento
+        investimento.setdefault(variavel, 1)
+        parametros = _obter_parametros_investimento(investimento, 'investimento.')
+        parametros.pop('detalhe')
+        motor = parametros.pop('motor')
+        arredondamentoDiario = parametros.pop('arredondamentoDiario')
+
+        # Validação - valSaldoLiquidoAlvo / investimentoReferencia
+        parametrosReferencia = None
+        valSaldoLiquidoAlvo = None
+        if isinstance(dados.get('investimentoReferencia'), dict):
+            parametrosReferencia = _obter_parametros_investimento(dados['investimentoReferencia'], 'investimentoReferencia.')
+        elif not isinstance(dados.get('valSaldoLiquidoAlvo'), bool) and _is_number(dados.get('valSaldoLiquidoAlvo')):
+            valSaldoLiquidoAlvo = Decimal(str(dados.get('valSaldoLiquidoAlvo')))
+        else:
+            mensagem  = "Você deve informar o saldo líquido alvo (valSaldoLiquidoAlvo) ou o investimento de referência (investimentoReferencia)."
+            raise InputException('valSaldoLiquidoAlvo', mensagem)
+
+    try:
+        # Obtém uma única vez a série de índices e os dados do indexador do investimento
+        objGestaoCadastro = GestaoCadastro()
+        serieIndices = None
+        objIndexador = None
+        indexador = parametros['indexador'].lower() if parametros['indexador'] is not None else None
+        if indexador is not None and indexador in TipoIndexador.values():
+            serieIndices = objGestaoCadastro.get_serie_indices(indexador)
+            objIndexador = objGestaoCadastro.get_indexador(indexador)
+
+        objReferencia = None
+        if parametrosReferencia is not None:
+            # Calcula o investimento de referência (compartilhando a série quando o indexador é o mesmo)
+            motorReferencia = parametrosReferencia.pop('motor')
+            arredondamentoReferencia = parametrosReferencia.pop('arredondamentoDiario')
+            parametrosReferencia.pop('detalhe')
+            indexadorReferencia = parametrosReferencia['indexador'].lower() if parametrosReferencia['indexador'] is not None else None
+            objReferencia = Investimento(**parametrosReferencia)
+            with etapa('calculo'):
+                if indexadorReferencia is not None and indexadorReferencia == indexador:
+                    objReferencia.calcular_investimento(motor=motorReferencia, arredondamentoDiario=arredondamentoReferencia, serieIndices=serieIndices, objIndexador=objIndexador, detalhe=TipoDetalhe.NONE.value)
+                else:
+                    objReferencia.calcular_investimento(motor=motorReferencia, arredondamentoDiario=arredondamentoReferencia, detalhe=TipoDetalhe.NONE.value)
+            valSaldoLiquidoAlvo = objReferencia.valSaldoLiquido
+
+        # Instancia a classe de negócio Investimento
+        objInvest = Investimento(**parametros)
+        # Calcula a taxa de equilíbrio
+        with etapa('calculo'):
+            taxaEquilibrio = objInvest.resolver_taxa(variavel, valSaldoLiquidoAlvo, motor=motor, arredondamentoDiario=arredondamentoDiario, serieIndices=serieIndices, objIndexador=objIndexador)
+    except BusinessException as be:
+        raise be
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        taxaEquilibrio['resultadoReferencia'] = objReferencia
+        resposta = {'mensagem': 'Taxa de equilíbrio calculada com sucesso!', 'taxaEquilibrio': taxaEquilibrio}
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'}
+
+@api.route('/investimento/taxa-equilibrio', methods=['OPTIONS'])
+def taxa_equilibrio_options():
+    return '', 200, \
+    { 'Access-Control-Allow-Origin': '*', \
+    'Access-Control-Allow-Methods' : 'POST', \
+    'Access-Control-Allow-Headers' : 'Content-Type' }
+
 @api.route('/indexadores', methods=['POST'])
 def post_indexadores():
     """Carga inicial das entidades que representarão os indexadores.
@@ -304,6 +786,11 @@ def list_dias_uteis():
         raise InputException('dataFinal', mensagem)
     else:
         dataFinal = datetime.strptime(queryParameters.get('dataFinal'), "%Y-%m-%d").date()
+
+    # Validação - período coberto pelo calendário de dias úteis
+    if dataInicial < Calendario.DATA_INICIAL or dataFinal > Calendario.DATA_FINAL:
+        mensagem  = "Período para consulta de dias úteis deve estar entre {0} e {1}.".format(Calendario.DATA_INICIAL, Calendario.DATA_FINAL)
+        raise InputException('dataInicial' if dataInicial < Calendario.DATA_INICIAL else 'dataFinal', mensagem)
     
     try:
         # Obtém a lista de dias úteis no mês
@@ -334,7 +821,8 @@ def atualizar_indices():
 
     try:
         # Solicita a atualização dos índices 
-        contadorTotal = objGestaoCadastro.atualizar_indices() 
+        atualizacao = objGestaoCadastro.atualizar_indices() 
+        contadorTotal = atualizacao['contador']
     except BusinessException as be:
         raise be
     except Exception as e:
@@ -349,9 +837,52 @@ def atualizar_indices():
         mensagem = "Índices atualizados com sucesso! Total de {} registro(s) atualizado(s).".format(contadorTotal)
 
     resposta = {'mensagem': mensagem}
+    resposta.update({'tempos': atualizacao['tempos']})
     resposta.update({'indexadores': objGestaoCadastro.get_indexadores()})
     return _success(resposta, statusCode), statusCode, {'Access-Control-Allow-Origin': '*'} 
 
+@api.route('/indexadores/all/indices/backfill', methods=['GET'])
+def backfill_indices():
+    """Atualiza os índices dos indexadores em janelas de tamanho fixo (ex.: anual), gravando cada janela e 
+    registrando o checkpoint no indexador antes de consultar a próxima. Execuções interrompidas (ou limitadas 
+    pelo tempo máximo) são retomadas a partir do último checkpoint na próxima chamada.
+
+    Argumentos:
+        indexador: (opcional) código identificador do indexador de atualização automática (padrão: todos)
+        janelaMeses: (opcional) tamanho (em meses) de cada janela consultada (padrão: BACKFILL_JANELA_MESES)
+        tempoMaximo: (opcional) tempo máximo (em segundos) da execução (padrão: BACKFILL_TEMPO_MAXIMO)
+    """
+    queryParameters = request.args
+    indexador = queryParameters.get('indexador')
+    janelaMeses = queryParameters.get('janelaMeses')
+    if janelaMeses is not None and (not janelaMeses.isdigit() or int(janelaMeses) < 1):
+        raise InputException('janelaMeses', "Tamanho da janela inválido. Informe a quantidade de meses (inteiro maior que zero).")
+    tempoMaximo = queryParameters.get('tempoMaximo')
+    if tempoMaximo is not None and (_is_number(tempoMaximo) == False or float(tempoMaximo) <= 0):
+        raise InputException('tempoMaximo', "Tempo máximo inválido. Informe a quantidade de segundos (maior que zero).")
+
+    # Instancia a classe de negócios responsável pela gestão de cadastros da API
+    objGestaoCadastro = GestaoCadastro()
+
+    try:
+        backfill = objGestaoCadastro.backfill_indices(indexador, 
+                                                      int(janelaMeses) if janelaMeses is not None else None, 
+                                                      float(tempoMaximo) if tempoMaximo is not None else None)
+    except BusinessException as be:
+        raise be
+    except Exception as e:
+        raise ServerException(e)
+
+    if backfill['concluido']:
+        mensagem = "Backfill concluído. Total de {} registro(s) atualizado(s).".format(backfill['contador'])
+    else:
+        mensagem = "Backfill parcial. Total de {} registro(s) atualizado(s), chame novamente para continuar a partir do último checkpoint.".format(backfill['contador'])
+    statusCode = 201 if backfill['contador'] > 0 else 200
+
+    resposta = {'mensagem': mensagem}
+    resposta.update(backfill)
+    return _success(resposta, statusCode), statusCode, {'Access-Control-Allow-Origin': '*'} 
+
 @api.route('/indexadores/all', methods=['GET'])
 def list_indexadores():
     """ Retorna lista com todos os indexadores cadastrados
@@ -404,6 +935,7 @@ def list_indices(id):
     Argumentos Query string:
         dataInicial: data inicial do período de índices a ser consultado.
         dataFinal: data final do período de índices a ser consultado.
+        formato: (opcional) formato da resposta: json (padrão), json-stream ou ndjson (um índice por linha)
     Retorno:
         Lista de índices com data e valor
     """
@@ -439,6 +971,8 @@ def list_indices(id):
     else:
         dataFinal = datetime.strptime(queryParameters.get('dataFinal'), "%Y-%m-%d").date()
 
+    formato = _obter_formato(queryParameters)
+
     try:
         # Instancia a classe de negócios responsável pela gestão de cadastros da API
         objGestaoCadastro = GestaoCadastro()
@@ -449,6 +983,54 @@ def list_indices(id):
     except Exception as e:
         raise ServerException(e)
     else:  
+        if formato != TipoFormato.JSON.value:
+            return _stream_response(formato, {'mensagem': 'Consulta aos índices realizada com sucesso'}, ('indices',), indices)
         resposta = {'mensagem': 'Consulta aos índices realizada com sucesso'}
         resposta.update({'indices': indices})
         return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'} 
+
+@api.route('/metricas/model', methods=['GET'])
+def get_metricas_model():
+    """Retorna as métricas do banco de dados do processo (worker) que atendeu a requisição: quantidade 
+    de clientes criados e quantidade e latência (em milissegundos) das operações realizadas.
+    """
+    try:
+        estatisticas = get_model().get_estatisticas()
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        resposta = {'mensagem': 'Consulta às métricas do banco de dados realizada com sucesso'}
+        resposta.update({'metricas': estatisticas})
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'} 
+
+@api.route('/metricas/cache', methods=['GET'])
+def get_metricas_cache():
+    """Retorna as estatísticas dos caches do processo (worker) que atendeu a requisição: 
+        - investimentos: respostas de /investimento (acertos, falhas, descartes (LRU) e ocupação em bytes)
+        - feriados: feriados em memória (cargas e consultas ao banco de dados evitadas)
+    """
+    try:
+        cache = _get_cache_investimentos()
+        estatisticas = {'investimentos': cache.to_dict() if cache is not None else None, 
+                        'feriados': cache_feriados.get_estatisticas()}
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        resposta = {'mensagem': 'Consulta às métricas do cache realizada com sucesso'}
+        resposta.update({'metricas': estatisticas})
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'}
+
+@api.route('/metricas/requisicoes', methods=['GET'])
+def get_metricas_requisicoes():
+    """Retorna o histograma dos tempos (em milissegundos) das requisições atendidas pelo processo (worker) por rota 
+    e etapa (consulta, conversao, calculo, serializacao e total). Requer INSTRUMENTACAO_ATIVA.
+    """
+    try:
+        ativa = current_app.config.get('INSTRUMENTACAO_ATIVA', False)
+        estatisticas = instrumentacao.histograma.to_dict() if ativa else None
+    except Exception as e:
+        raise ServerException(e)
+    else:
+        resposta = {'mensagem': 'Consulta às métricas das requisições realizada com sucesso'}
+        resposta.update({'instrumentacaoAtiva': ativa, 'metricas': estatisticas})
+        return _success(resposta, 200), 200, {'Access-Control-Allow-Origin': '*'}
@@ -0,0 +1,18 @@
+def test_janelas_equivalem_ao_calculo_sem_arredondamento(app_memoria):
+    client = app_memoria(CACHE_INVESTIMENTOS_MAX_BYTES=0).test_client()
+    url = ('/api/investimento/backtest?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi&taxa=120'
+           '&dataInicial=2015-01-01&dataFinal=2020-12-31&meses=12&indexadorComparacao=ipca')
+    backtest = client.get(url).get_json()['body']['backtestInvestimento']
+    janelas = backtest['janelas']
+    assert backtest['qtdJanelas'] == len(janelas) and janelas[-1]['dataFinal'] <= '2020-12-31'
+    assert all('percRentabilidadeComparacao' in janela for janela in janelas)
+
+    for janela in (janelas[0], janelas[len(janelas) // 2], janelas[-1]):
+        calculo = ('/api/investimento?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi&taxa=120'
+                   '&dataInicial={0}&dataFinal={1}&detalhe=none&motor=vetorizado&arredondamentoDiario=false')
+        resultado = client.get(calculo.format(janela['dataInicial'], janela['dataFinal'])).get_json()['body']['resultadoInvestimento']
+        assert abs(janela['percRentabilidadeBruta'] - resultado['percRentabilidadeBruta']) <= 0.001
+        assert abs(janela['percRentabilidadeLiquida'] - resultado['percRentabilidadeLiquida']) <= 0.001
+
+    r = client.get('/api/investimento/backtest?tipoInvestimento=cdb&tipoRendimento=pre&valor=1000&taxaPrefixada=10&dataInicial=2015-01-01')
+    assert r.status_code == 400 and r.get_json()['body']['BusinessException']['codigo'] == 'BE020'
@@ -0,0 +1,38 @@
+"""Benchmark de latência e memória do cálculo + serialização por nível de detalhe da evolução
+(none, mensal, diario) em um investimento de 20 anos.
+
+Execução (a partir da raiz do projeto):
+
+    python -m benchmarks.benchmark_detalhe
+"""
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulos para serialização e medição de tempo/memória
+import json
+import timeit
+import tracemalloc
+# Importa o motor de cálculo e o tratamento de formatos da API
+from negocio.motorcalculo import MotorCalculo, TipoDetalhe
+from utils.helper import JSONEncoderAPI
+from benchmarks.benchmark_motorcalculo import gerar_serie
+
+def calcular_e_serializar(motor: str, arredondamentoDiario: bool, detalhe: str, datas: list, indices: list):
+    saldo, evolucao = MotorCalculo.compor(motor, Decimal(1000), datas, indices, Decimal(120), Decimal(0), arredondamentoDiario, detalhe)
+    return json.dumps({'resultadoInvestimento': {'valSaldoBruto': saldo, 'evolucao': evolucao}}, cls=JSONEncoderAPI)
+
+def executar(qtdDias: int = 5040, repeticoes: int = 5):
+    datas, indices = gerar_serie(qtdDias)
+    print('{:<12} {:<8} {:>8} {:>10} {:>14} {:>12}'.format('motor', 'detalhe', 'linhas', 'ms', 'pico memória', 'bytes json'))
+    for motor, arredondamentoDiario in (('iterativo', True), ('vetorizado', False)):
+        for detalhe in (TipoDetalhe.DIARIO.value, TipoDetalhe.MENSAL.value, TipoDetalhe.NONE.value):
+            funcao = lambda: calcular_e_serializar(motor, arredondamentoDiario, detalhe, datas, indices)
+            tempo = min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+            tracemalloc.start()
+            resposta = funcao()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            linhas = len(MotorCalculo.posicoes_detalhe(datas, detalhe))
+            print('{:<12} {:<8} {:>8} {:>10.2f} {:>11.1f} KB {:>12}'.format(motor, detalhe, linhas, tempo * 1000, pico / 1024, len(resposta)))
+
+if __name__ == '__main__':
+    executar()
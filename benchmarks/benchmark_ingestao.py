@@ -0,0 +1,64 @@
+"""Benchmark de vazão (índices por segundo) da ingestão de índices: criação dos objetos Indice a partir do
+retorno da API do Banco Central, cálculo dos índices diários de indexadores mensais (ex.: ipca-diario)
+em lote e gravação em lotes (GestaoCadastro.ingerir_indices) em um banco de dados SQLite em memória.
+
+Execução (a partir da raiz do projeto):
+
+    python -m benchmarks.benchmark_ingestao
+"""
+# Importa módulo para tratamento de data/hora
+from datetime import date, datetime
+# Importa módulo para medição de tempo
+import time
+# Importa o web framework Flask (contexto de aplicação para o model)
+from flask import Flask
+# Importa o model, as classes de negócio e a série sintética de índices
+from model import cache_feriados, cache_indices, model_sqlite
+from negocio.gestaocadastro import GestaoCadastro
+from negocio.indexador import Indexador
+from negocio.indice import Indice
+from benchmarks.benchmark_motorcalculo import gerar_serie
+
+def criar_app():
+    app = Flask(__name__)
+    app.config['DATA_BACKEND'] = 'sqlite'
+    app.config['SQLITE_DATABASE'] = 'file:benchmark_ingestao?mode=memory&cache=shared'
+    model_sqlite.init_app(app)
+    cache_indices.invalidar()
+    cache_feriados.invalidar()
+    return app
+
+def criar_indices(registros: list):
+    """Cria os índices a partir do retorno da API do Banco Central (ver GestaoCadastro._obter_indices_banco_central)."""
+    dthInclusao = datetime.now()
+    return [Indice(tp_indice='cdi', dt_referencia=registro['data'], val_indice=float(registro['valor']), dth_inclusao=dthInclusao)
+            for registro in registros]
+
+def medir(funcao):
+    instanteInicial = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - instanteInicial
+
+def executar(qtdIndices: int = 50000, qtdMeses: int = 240):
+    app = criar_app()
+    datas, valores = gerar_serie(qtdIndices)
+    registros = [{'data': data, 'valor': str(valor)} for data, valor in zip(datas, valores)]
+    indexador = Indexador(id='cdi', nome='CDI', dt_ult_referencia=date(2001, 1, 1), periodicidade='Diário', tipo_atualizacao='automatica',
+                          id_indexador_referenciado=None, serie='12', qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+    indexadorDiario = Indexador(id='ipca-diario', nome='IPCA Diário', dt_ult_referencia=date(2001, 1, 1), periodicidade='Diário',
+                                tipo_atualizacao='calculada', id_indexador_referenciado='ipca', serie=None, qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+    indicesMensais = [Indice(tp_indice='ipca', dt_referencia=date(2001 + mes // 12, mes % 12 + 1, 1), val_indice=round(0.2 + (mes % 7) * 0.07, 2), dth_inclusao=None)
+                      for mes in range(qtdMeses)]
+    print('{:<36} {:>10} {:>10} {:>14}'.format('etapa', 'índices', 'ms', 'índices/s'))
+    with app.app_context():
+        objCadastro = GestaoCadastro()
+        indices, tempo = medir(lambda: criar_indices(registros))
+        print('{:<36} {:>10} {:>10.1f} {:>14.0f}'.format('criação (API Banco Central)', len(indices), tempo * 1000, len(indices) / tempo))
+        diarios, tempo = medir(lambda: objCadastro.calcular_indices_diarios_lote(indexadorDiario, indicesMensais))
+        print('{:<36} {:>10} {:>10.1f} {:>14.0f}'.format('cálculo índices diários ({} meses)'.format(qtdMeses), len(diarios), tempo * 1000, len(diarios) / tempo))
+        model_sqlite.update(model_sqlite.TipoEntidade.INDEXADORES, indexador)
+        _, tempo = medir(lambda: objCadastro.ingerir_indices(indexador, indices))
+        print('{:<36} {:>10} {:>10.1f} {:>14.0f}'.format('gravação em lotes (sqlite)', len(indices), tempo * 1000, len(indices) / tempo))
+
+if __name__ == '__main__':
+    executar()
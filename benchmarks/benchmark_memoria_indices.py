@@ -0,0 +1,63 @@
+"""Benchmark de memória (bytes por índice) dos objetos Indice mantidos em memória durante um backfill:
+representação anterior (dictionary por instância, id formatado por strftime, tipo de índice e data/hora
+de inclusão distintos por instância) x representação atual (__slots__, tipo de índice compartilhado e
+data/hora de inclusão única por consulta).
+
+Execução (a partir da raiz do projeto):
+
+    python -m benchmarks.benchmark_memoria_indices
+"""
+# Importa módulo para tratamento de data/hora
+from datetime import datetime
+# Importa módulos para medição de tempo/memória
+import gc
+import timeit
+import tracemalloc
+# Importa as classes de negócio
+from negocio.baseobject import BaseObject
+from negocio.indice import Indice
+from benchmarks.benchmark_motorcalculo import gerar_serie
+
+class IndiceDict(BaseObject):
+    """Representação anterior de Indice (atributos no dictionary da instância)."""
+    def __init__(self, tp_indice: str, dt_referencia: datetime.date, val_indice: float, dth_inclusao: datetime):
+        self.id = tp_indice.lower() + '-' + datetime.strftime(dt_referencia,"%Y%m%d")
+        self.tp_indice = tp_indice.lower()
+        self.dt_referencia = dt_referencia
+        self.val_indice = val_indice
+        self.dth_inclusao = dth_inclusao
+
+def criar_anterior(datas: list, valores: list):
+    return [IndiceDict('CDI', data, valor, datetime.now()) for data, valor in zip(datas, valores)]
+
+def criar_atual(datas: list, valores: list):
+    dthInclusao = datetime.now()
+    return [Indice('CDI', data, valor, dthInclusao) for data, valor in zip(datas, valores)]
+
+def medir(funcao, datas: list, valores: list):
+    """Retorna a memória alocada (bytes) pelos objetos criados pela função e o tempo de criação (segundos)."""
+    gc.collect()
+    tracemalloc.start()
+    objetos = funcao(datas, valores)
+    tamanho, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tempo = min(timeit.repeat(lambda: funcao(datas, valores), number=1, repeat=3))
+    return objetos, tamanho, tempo
+
+def executar(qtdIndices: int = 50000):
+    datas, indices = gerar_serie(qtdIndices)
+    # Valores do índice como retornados pela API do Banco Central (float)
+    valores = [float(indice) for indice in indices]
+    print('{:<12} {:>8} {:>12} {:>14} {:>10}'.format('versão', 'índices', 'total (KB)', 'bytes/índice', 'ms'))
+    resultados = []
+    for nome, funcao in (('anterior', criar_anterior), ('atual', criar_atual)):
+        objetos, tamanho, tempo = medir(funcao, datas, valores)
+        resultados.append(objetos)
+        print('{:<12} {:>8} {:>12.1f} {:>14.1f} {:>10.2f}'.format(nome, qtdIndices, tamanho / 1024, tamanho / qtdIndices, tempo * 1000))
+    # As duas representações devem expor os mesmos atributos (ex.: gravação no banco de dados)
+    anterior, atual = resultados
+    assert all(dict((atributo, a[atributo]) for atributo in a.keys() if atributo != 'dth_inclusao') ==
+               dict((atributo, b[atributo]) for atributo in b.keys() if atributo != 'dth_inclusao') for a, b in zip(anterior, atual))
+
+if __name__ == '__main__':
+    executar()
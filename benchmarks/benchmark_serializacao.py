@@ -0,0 +1,57 @@
+"""Benchmark da serialização das respostas da API: conversão prévia por _converter_formatos + json.dumps
+x serialização direta por JSONEncoderAPI (Decimal, datas e objetos de negócio convertidos durante a
+geração do JSON, sem cópia intermediária).
+
+Cenários: investimento de 20 anos com evolução diária e lista de índices diários (objetos Indice).
+Execução (a partir da raiz do projeto):
+
+    python -m benchmarks.benchmark_serializacao
+"""
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulo para tratamento de data/hora
+from datetime import datetime
+# Importa módulos para serialização e medição de tempo
+import json
+import timeit
+# Importa o motor de cálculo, as classes de negócio e o tratamento de formatos da API
+from negocio.motorcalculo import MotorCalculo
+from negocio.baseobject import BaseObject
+from negocio.indice import Indice
+from utils.helper import _converter_formatos
+from utils.helper import JSONEncoderAPI
+from benchmarks.benchmark_motorcalculo import gerar_serie
+
+class _Resultado(BaseObject):
+    """Resultado de investimento (mesmos atributos de Investimento) sem consulta a índices."""
+    def __init__(self, valSaldoBruto: Decimal, evolucao: list):
+        self.valInvestimentoInicial = Decimal(1000)
+        self.valSaldoBruto = valSaldoBruto
+        self.percRentabilidadeBruta = valSaldoBruto / self.valInvestimentoInicial - 1
+        self.evolucao = evolucao
+
+def cenarios(qtdDias: int = 5040):
+    datas, indices = gerar_serie(qtdDias)
+    saldo, evolucao = MotorCalculo.compor('iterativo', Decimal(1000), datas, indices, Decimal(120), Decimal(0), True, 'diario')
+    agora = datetime.now()
+    listaIndices = [Indice('cdi', data, valIndice, agora) for data, valIndice in zip(datas, indices)]
+    return [('investimento (evolução diária)', {'resultadoInvestimento': _Resultado(saldo, evolucao)}),
+            ('índices', {'indices': listaIndices})]
+
+def serializar_conversao(body):
+    return json.dumps({'statusCode': 200, 'body': _converter_formatos(body)}, sort_keys=True, separators=(',', ':'))
+
+def serializar_encoder(body):
+    return json.dumps({'statusCode': 200, 'body': body}, cls=JSONEncoderAPI, sort_keys=True, separators=(',', ':'))
+
+def executar(qtdDias: int = 5040, repeticoes: int = 5):
+    print('{:<32} {:>8} {:>16} {:>12} {:>9}'.format('cenário', 'linhas', 'conversão (ms)', 'encoder (ms)', 'speedup'))
+    for nome, body in cenarios(qtdDias):
+        # Os dois caminhos devem produzir exatamente o mesmo JSON
+        assert serializar_conversao(body) == serializar_encoder(body), 'Divergência entre os serializadores'
+        tempoConversao = min(timeit.repeat(lambda: serializar_conversao(body), number=1, repeat=repeticoes))
+        tempoEncoder = min(timeit.repeat(lambda: serializar_encoder(body), number=1, repeat=repeticoes))
+        print('{:<32} {:>8} {:>16.2f} {:>12.2f} {:>8.1f}x'.format(nome, qtdDias, tempoConversao * 1000, tempoEncoder * 1000, tempoConversao / tempoEncoder))
+
+if __name__ == '__main__':
+    executar()
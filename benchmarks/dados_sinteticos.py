@@ -0,0 +1,75 @@
+"""Dados sintéticos e determinísticos (séries de índices, feriados e indexadores) para os benchmarks,
+gravados em um banco de dados SQLite em memória, sem acesso à API do Banco Central ou ao Datastore.
+"""
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulo para tratamento de data/hora
+from datetime import date, timedelta
+# Importa módulo para geração de dados
+import random
+# Importa o web framework Flask (contexto de aplicação para o model)
+from flask import Flask
+# Importa o model e as classes de negócio
+from model import cache_feriados, cache_indices, model_sqlite
+from negocio.indexador import Indexador
+from negocio.indice import Indice
+from benchmarks.benchmark_motorcalculo import gerar_serie
+
+# Banco de dados em memória compartilhado pelas threads do processo
+SQLITE_DATABASE = 'file:benchmarks?mode=memory&cache=shared'
+# Feriados nacionais de data fixa (dia, mês, descrição)
+FERIADOS_FIXOS = [(1, 1, 'Confraternização Universal'), (21, 4, 'Tiradentes'), (1, 5, 'Dia do Trabalho'),
+                  (7, 9, 'Independência do Brasil'), (12, 10, 'Nossa Sr.a Aparecida - Padroeira do Brasil'),
+                  (2, 11, 'Finados'), (15, 11, 'Proclamação da República'), (25, 12, 'Natal')]
+
+def gerar_serie_mensal(qtdMeses: int, dataInicial: date = date(2001, 1, 1), semente: int = 2001):
+    """Gera uma série sintética de índices mensais (em percentual, dia 01 de cada mês) semelhante ao IPCA.
+    """
+    gerador = random.Random(semente)
+    datas = [date(dataInicial.year + (dataInicial.month - 1 + mes) // 12, (dataInicial.month - 1 + mes) % 12 + 1, 1) for mes in range(qtdMeses)]
+    valores = [round(gerador.uniform(-0.2, 1.2), 2) for _ in range(qtdMeses)]
+    return datas, valores
+
+def gerar_feriados(anoInicial: int, anoFinal: int):
+    """Gera a tabela de feriados (formato do model) com os feriados nacionais de data fixa do período.
+    """
+    feriados = []
+    for ano in range(anoInicial, anoFinal + 1):
+        for dia, mes, descricao in FERIADOS_FIXOS:
+            dtFeriado = date(ano, mes, dia)
+            feriados.append({'id': int(dtFeriado.strftime('%Y%m%d')), 'dt_feriado': dtFeriado, 'descricao': descricao})
+    return feriados
+
+def criar_indexador(id: str, dataUltReferencia: date, serie: str = None, periodicidade: str = 'Diário', tipoAtualizacao: str = 'automatica',
+                    idReferenciado: str = None, valUltimoIndice: float = None):
+    return Indexador(id=id, nome=id.upper(), dt_ult_referencia=dataUltReferencia, periodicidade=periodicidade, tipo_atualizacao=tipoAtualizacao,
+                     id_indexador_referenciado=idReferenciado, serie=serie, qtd_regs_ult_atualiz=None, dth_ult_atualiz=None,
+                     val_ultimo_indice=valUltimoIndice)
+
+def criar_indices(tpIndice: str, datas: list, valores: list):
+    return [Indice(tp_indice=tpIndice, dt_referencia=data, val_indice=float(valor), dth_inclusao=None) for data, valor in zip(datas, valores)]
+
+def criar_app(qtdDias: int = 5040):
+    """Cria a aplicação com o banco de dados em memória carregado com as séries sintéticas:
+    cdi (diário, qtdDias dias úteis), ipca (diário, valores menores) e feriados de 2001 a 2078.
+
+    Retorno:
+        Aplicação Flask (utilizar app.app_context() para executar os benchmarks).
+    """
+    app = Flask(__name__)
+    app.config['DATA_BACKEND'] = 'sqlite'
+    app.config['SQLITE_DATABASE'] = SQLITE_DATABASE
+    # Descarta conexões e caches de execuções anteriores no mesmo processo
+    model_sqlite._conexoes.__dict__.clear()
+    model_sqlite.init_app(app)
+    cache_indices.invalidar()
+    cache_feriados.invalidar()
+
+    datas, valores = gerar_serie(qtdDias)
+    valoresIpca = [valor / Decimal(8) for valor in valores]
+    TipoEntidade = model_sqlite.TipoEntidade
+    model_sqlite.update_multi(TipoEntidade.FERIADOS, gerar_feriados(2001, 2078))
+    model_sqlite.update_multi(TipoEntidade.INDEXADORES, [criar_indexador('cdi', datas[-1], '12', valUltimoIndice=float(valores[-1])),
+                                                         criar_indexador('ipca', datas[-1], '433', valUltimoIndice=float(valoresIpca[-1]))])
+    model_sqlite.update_multi(TipoEntidade.INDICES, criar_indices('cdi', datas, valores) + criar_indices('ipca', datas, valoresIpca))
+    return app
@@ -0,0 +1,157 @@
+"""Suíte de benchmarks dos caminhos críticos de cálculo e ingestão, executada offline sobre séries sintéticas
+e determinísticas em um banco de dados SQLite em memória (ver benchmarks/dados_sinteticos.py).
+
+Casos: cálculo de investimento (pre, pos e hibrido em horizontes de 1, 5 e 20 anos), lista de dias úteis
+(Calendario.listDiasUteis), serialização de respostas extensas (_converter_formatos x JSONEncoderAPI),
+cálculo de índices diários a partir de índices mensais e gravação de índices (put_indices).
+
+O relatório JSON registra, para cada caso, as estatísticas de tempo (segundos) de cada repetição e pode ser
+comparado com um relatório anterior. Execução (a partir da raiz do projeto):
+
+    python -m benchmarks.suite                              # executa e imprime o resultado
+    python -m benchmarks.suite --saida base.json            # grava o relatório JSON
+    python -m benchmarks.suite --comparar base.json         # compara com um relatório anterior (retorno 1 se houver regressão)
+    python -m benchmarks.suite --filtro investimento        # executa somente os casos cujo nome contém o filtro
+"""
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulo para tratamento de data/hora
+from datetime import date, datetime
+# Importa módulos para serialização, estatísticas, medição de tempo e identificação do ambiente
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+# Importa as classes de negócio e o tratamento de formatos da API
+from negocio.calendario import Calendario
+from negocio.gestaocadastro import GestaoCadastro
+from negocio.investimento import Investimento
+from utils.helper import _converter_formatos
+from utils.helper import JSONEncoderAPI
+from benchmarks import dados_sinteticos
+
+# Versão do formato do relatório JSON
+VERSAO_RELATORIO = 1
+# Horizontes (anos) dos cálculos de investimento
+HORIZONTES = (1, 5, 20)
+# Variação da mediana acima da qual um caso é considerado regressão na comparação
+LIMITE_REGRESSAO = 0.10
+
+def _investimento(tipoRendimento: str, anos: int):
+    """Retorna a função que calcula um investimento de 1.000,00 no horizonte informado."""
+    indexador, taxa, taxaPrefixada = {'pre': ('cdi', Decimal(0), Decimal(7)), 'pos': ('cdi', Decimal(120), Decimal(0)),
+                                      'hibrido': ('ipca', Decimal(100), Decimal(5))}[tipoRendimento]
+    def calcular():
+        objInvest = Investimento(tipoInvestimento='cdb', tipoRendimento=tipoRendimento, valInvestimentoInicial=Decimal(1000), indexador=indexador,
+                                 taxa=taxa, taxaPrefixada=taxaPrefixada, dataInicial=date(2001, 1, 2), dataFinal=date(2001 + anos, 1, 2))
+        return objInvest.calcular_investimento()
+    return calcular
+
+def casos(horizontes: tuple = HORIZONTES):
+    """Retorna a lista de casos da suíte: (nome, função preparada, quantidade de itens processados por execução).
+    As funções são executadas dentro do contexto da aplicação criada por dados_sinteticos.criar_app.
+    """
+    lista = []
+    for tipoRendimento in ('pre', 'pos', 'hibrido'):
+        for anos in horizontes:
+            lista.append(('investimento.{0}.{1}a'.format(tipoRendimento, anos), _investimento(tipoRendimento, anos), anos * 252))
+
+    lista.append(('calendario.listDiasUteis.20a', lambda: Calendario.listDiasUteis(date(2001, 1, 1), date(2020, 12, 31)), 7305))
+
+    # Resposta extensa: investimento de 20 anos com evolução diária
+    anos = max(horizontes)
+    resultado = {'mensagem': 'Cálculo do investimento realizado com sucesso!', 'resultadoInvestimento': _investimento('pos', anos)()}
+    qtdLinhas = len(resultado['resultadoInvestimento'].evolucao)
+    lista.append(('serializacao.converter_formatos.{}a'.format(anos), lambda: json.dumps(_converter_formatos(resultado), sort_keys=True), qtdLinhas))
+    lista.append(('serializacao.encoder.{}a'.format(anos), lambda: json.dumps(resultado, cls=JSONEncoderAPI, sort_keys=True), qtdLinhas))
+
+    objCadastro = GestaoCadastro()
+    datas, valores = dados_sinteticos.gerar_serie_mensal(240)
+    indicesMensais = dados_sinteticos.criar_indices('ipca', datas, valores)
+    indexadorDiario = dados_sinteticos.criar_indexador('ipca-diario', datas[0], periodicidade='Diário', tipoAtualizacao='calculada', idReferenciado='ipca')
+    qtdDiarios = len(objCadastro.calcular_indices_diarios_lote(indexadorDiario, indicesMensais))
+    lista.append(('indices.calcular_indices_diarios.240m', lambda: objCadastro.calcular_indices_diarios_lote(indexadorDiario, indicesMensais), qtdDiarios))
+
+    datas, valores = dados_sinteticos.gerar_serie(5040, semente=2011)
+    indices = dados_sinteticos.criar_indices('selic', datas, valores)
+    indexador = dados_sinteticos.criar_indexador('selic', datas[0], '11')
+    lista.append(('indices.put_indices.5040', lambda: objCadastro.put_indices(indexador, indices), len(indices)))
+    return lista
+
+def medir(funcao, repeticoes: int):
+    """Executa a função uma vez para aquecimento e retorna os tempos (segundos) das repetições seguintes."""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        instanteInicial = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - instanteInicial)
+    return tempos
+
+def executar(repeticoes: int = 5, filtro: str = None, horizontes: tuple = HORIZONTES):
+    """Executa os casos da suíte e retorna o relatório (dictionary serializável em JSON).
+    """
+    app = dados_sinteticos.criar_app()
+    resultados = {}
+    with app.app_context():
+        for nome, funcao, qtdItens in casos(horizontes):
+            if filtro is not None and filtro not in nome:
+                continue
+            tempos = medir(funcao, repeticoes)
+            mediana = statistics.median(tempos)
+            resultados[nome] = {'repeticoes': repeticoes, 'min': min(tempos), 'mediana': mediana, 'media': statistics.mean(tempos),
+                                'max': max(tempos), 'qtdItens': qtdItens, 'itensPorSegundo': qtdItens / mediana if mediana > 0 else None}
+    return {'versao': VERSAO_RELATORIO, 'dataExecucao': datetime.now().isoformat(timespec='seconds'),
+            'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(), 'processador': platform.processor()},
+            'casos': resultados}
+
+def comparar(relatorio: dict, base: dict, limite: float = LIMITE_REGRESSAO):
+    """Compara as medianas do relatório com as de um relatório anterior (base).
+
+    Retorno:
+        Dictionary com a variação (atual / base - 1) de cada caso presente nos dois relatórios e a lista
+        de casos cuja variação ultrapassa o limite informado (regressões).
+    """
+    variacoes = {}
+    for nome, caso in relatorio['casos'].items():
+        casoBase = base.get('casos', {}).get(nome)
+        if casoBase is not None and casoBase['mediana'] > 0:
+            variacoes[nome] = caso['mediana'] / casoBase['mediana'] - 1
+    return {'variacoes': variacoes, 'regressoes': sorted(nome for nome, variacao in variacoes.items() if variacao > limite)}
+
+def imprimir(relatorio: dict, comparacao: dict = None):
+    print('{:<40} {:>10} {:>10} {:>14} {:>10}'.format('caso', 'min (ms)', 'med. (ms)', 'itens/s', 'variação'))
+    for nome, caso in relatorio['casos'].items():
+        variacao = ''
+        if comparacao is not None and nome in comparacao['variacoes']:
+            variacao = '{:+.1%}'.format(comparacao['variacoes'][nome])
+        print('{:<40} {:>10.2f} {:>10.2f} {:>14.0f} {:>10}'.format(nome, caso['min'] * 1000, caso['mediana'] * 1000, caso['itensPorSegundo'] or 0, variacao))
+
+def main(argumentos: list = None):
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks do comparador de investimentos')
+    parser.add_argument('--repeticoes', type=int, default=5, help='quantidade de repetições de cada caso (padrão: 5)')
+    parser.add_argument('--filtro', help='executa somente os casos cujo nome contém o texto informado')
+    parser.add_argument('--saida', help='arquivo onde o relatório JSON será gravado')
+    parser.add_argument('--comparar', help='relatório JSON anterior a ser comparado')
+    parser.add_argument('--limite', type=float, default=LIMITE_REGRESSAO, help='variação da mediana considerada regressão (padrão: 0.10)')
+    argumentos = parser.parse_args(argumentos)
+
+    relatorio = executar(argumentos.repeticoes, argumentos.filtro)
+    comparacao = None
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='UTF8') as f:
+            comparacao = comparar(relatorio, json.load(f), argumentos.limite)
+        relatorio['comparacao'] = comparacao
+    imprimir(relatorio, comparacao)
+    if argumentos.saida:
+        with open(argumentos.saida, 'w', encoding='UTF8') as f:
+            json.dump(relatorio, f, indent=2, sort_keys=True)
+    if comparacao is not None and comparacao['regressoes']:
+        print('Regressões acima de {:.0%}: {}'.format(argumentos.limite, ', '.join(comparacao['regressoes'])))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import json
+
+from benchmarks import suite
+
+
+def test_suite_gera_relatorio_comparavel():
+    relatorio = suite.executar(repeticoes=1, horizontes=(1,))
+    assert 'investimento.hibrido.1a' in relatorio['casos']
+    assert 'indices.put_indices.5040' in relatorio['casos']
+    assert all(caso['mediana'] > 0 for caso in relatorio['casos'].values())
+    # Relatório serializável e comparável com ele mesmo (sem regressões)
+    base = json.loads(json.dumps(relatorio))
+    comparacao = suite.comparar(relatorio, base)
+    assert comparacao['regressoes'] == []
+    assert set(comparacao['variacoes']) == set(relatorio['casos'])
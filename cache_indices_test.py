@@ -0,0 +1,32 @@
+from datetime import date
+from decimal import Decimal
+
+from model.cache_indices import SerieIndices
+
+
+def _registro(data, valor):
+    return {'id': 'cdi-' + data.strftime('%Y%m%d'), 'tp_indice': 'cdi', 'dt_referencia': data, 'val_indice': Decimal(valor)}
+
+
+def test_fatia_e_mesclagem():
+    serie = SerieIndices('cdi', [_registro(date(2019, 1, d), '0.02') for d in (2, 3, 4, 7, 8)], 0)
+    assert [r['dt_referencia'].day for r in serie.fatia(date(2019, 1, 3), date(2019, 1, 7))] == [3, 4, 7]
+    assert serie.fatia(date(2019, 1, 5), date(2019, 1, 6)) == []
+
+    # Inclusão de índices posteriores e substituição de um índice existente
+    nova = serie.mesclar([_registro(date(2019, 1, 9), '0.03'), _registro(date(2019, 1, 8), '0.01')], 1)
+    assert len(serie) == 5 and len(nova) == 6
+    assert nova.ultima_data() == date(2019, 1, 9)
+    assert nova.fatia(date(2019, 1, 8), date(2019, 1, 8))[0]['val_indice'] == Decimal('0.01')
+    assert list(nova.valoresFloat)[-1] == 0.03
+
+
+def test_fatores_acumulados():
+    registros = [_registro(date(2019, 1, d), v) for d, v in ((2, '0.02'), (3, '0.03'), (4, '0.025'), (7, '0.02'))]
+    serie = SerieIndices('cdi', registros[:2], 0).mesclar(registros[2:], 0)
+    inicio, fim = serie.posicoes(date(2019, 1, 3), date(2019, 1, 7))
+    esperado = 1.0003 * 1.00025 * 1.0002
+    assert abs(serie.fator(inicio, fim) - esperado) < 1e-12
+    assert abs(serie.fator(inicio, fim, 120.0, exato=True) - 1.00036 * 1.0003 * 1.00024) < 1e-12
+    assert abs(serie.fator(inicio, fim, 120.0) - 1.00036 * 1.0003 * 1.00024) < 1e-7
+    assert list(serie.fatoresAcumulados) == list(SerieIndices('cdi', registros, 0).fatoresAcumulados)
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from model import get_model
+from negocio.indice import Indice
+from utils.cache import CacheLRU
+
+
+def test_descarte_lru_por_tamanho():
+    cache = CacheLRU('teste', 30)
+    cache.armazenar('a', b'x' * 10, 10)
+    cache.armazenar('b', b'x' * 10, 10)
+    cache.armazenar('c', b'x' * 10, 10)
+    # Consulta 'a' tornando 'b' o item menos recentemente utilizado
+    assert cache.obter('a') == b'x' * 10
+    cache.armazenar('d', b'x' * 10, 10)
+    assert cache.obter('b') is None
+    assert cache.obter('c') is not None and cache.obter('d') is not None
+    # Itens maiores que a capacidade não são armazenados
+    cache.armazenar('e', b'x' * 40, 40)
+    assert cache.obter('e') is None
+
+    estatisticas = cache.to_dict()
+    assert (estatisticas['qtdAcertos'], estatisticas['qtdFalhas'], estatisticas['qtdDescartes']) == (3, 2, 1)
+    assert estatisticas['tamanhoBytes'] == 30 and estatisticas['qtdItens'] == 3
+
+
+def test_respostas_invalidadas_pela_carga_de_outro_processo(app_memoria, monkeypatch):
+    # Cache de respostas do processo criado com a capacidade padrão
+    monkeypatch.setattr('api.api._cacheInvestimentos', None)
+    app = app_memoria()
+    client = app.test_client()
+    url = ('/api/investimento?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi&taxa=100'
+           '&dataInicial={0}&dataFinal={1}&detalhe=none')
+    with app.app_context():
+        modelo = get_model()
+        indexador = modelo.read(modelo.TipoEntidade.INDEXADORES, 'cdi')
+    dataNovoIndice = indexador['dt_ult_referencia'] + timedelta(days=1)
+    url = url.format(indexador['dt_ult_referencia'] - timedelta(days=90), indexador['dt_ult_referencia'] + timedelta(days=90))
+    primeira = client.get(url)
+    assert client.get(url).headers['X-Cache'] == 'HIT'
+
+    # Outro processo grava um índice e o checkpoint do indexador no banco de dados sem passar pela série em memória
+    with app.app_context():
+        modelo.update_multi(modelo.TipoEntidade.INDICES, [Indice(tp_indice='cdi', dt_referencia=dataNovoIndice, val_indice=1.0, dth_inclusao=None)])
+        modelo.update(modelo.TipoEntidade.INDEXADORES, dict(indexador, dt_ult_referencia=dataNovoIndice, dth_ult_atualiz=datetime.now()), 'cdi')
+    segunda = client.get(url)
+    assert segunda.headers['X-Cache'] == 'MISS'
+    saldo = lambda resposta: resposta.get_json()['body']['resultadoInvestimento']['valSaldoBruto']
+    assert saldo(segunda) > saldo(primeira)
@@ -0,0 +1,52 @@
+from datetime import date
+
+from model import cache_feriados
+from negocio.calendario import Calendario
+
+
+def test_dias_uteis_entre(app_memoria):
+    with app_memoria().app_context():
+        # 25/12/2019 (Natal) é feriado e 28-29/12/2019 é final de semana
+        diasUteis = Calendario.diasUteisEntre(date(2019, 12, 23), date(2019, 12, 31))
+        assert diasUteis == [date(2019, 12, 23), date(2019, 12, 24), date(2019, 12, 26),
+                             date(2019, 12, 27), date(2019, 12, 30), date(2019, 12, 31)]
+        assert Calendario.contarDiasUteis(date(2019, 12, 23), date(2019, 12, 31)) == 6
+        assert Calendario.diasUteisEntre(date(2019, 12, 28), date(2019, 12, 29)) == []
+
+
+def test_adicionar_dias_uteis(app_memoria):
+    with app_memoria().app_context():
+        assert Calendario.adicionarDiasUteis(date(2019, 12, 24), 1) == date(2019, 12, 26)
+        assert Calendario.adicionarDiasUteis(date(2019, 12, 28), 2) == date(2019, 12, 31)
+        assert Calendario.isDiaUtil(date(2019, 12, 25)) is False
+
+
+def test_dias_uteis_com_feriados_em_memoria(monkeypatch):
+    consultas = []
+    feriados = [{'id': 20190101, 'dt_feriado': date(2019, 1, 1), 'descricao': 'Confraternização Universal'},
+                {'id': 20190305, 'dt_feriado': date(2019, 3, 5), 'descricao': 'Carnaval'}]
+
+    class ModelFalso(object):
+        @staticmethod
+        def list_feriados(dataInicial, dataFinal):
+            consultas.append((dataInicial, dataFinal))
+            return list(feriados)
+
+    monkeypatch.setattr(cache_feriados, 'get_model', lambda: ModelFalso)
+    cache_feriados.invalidar()
+    cache_feriados.metricas.reiniciar()
+
+    # Primeira consulta carrega os feriados (e monta o calendário), as demais são atendidas em memória
+    for _ in range(12):
+        diasUteis = Calendario.listDiasUteis(date(2019, 1, 1), date(2019, 1, 4))
+    assert diasUteis == [date(2019, 1, 2), date(2019, 1, 3), date(2019, 1, 4)]
+    assert [f['id'] for f in cache_feriados.list_feriados(date(2019, 3, 1), date(2019, 12, 31))] == [20190305]
+    assert len(consultas) == 1
+    assert cache_feriados.get_estatisticas()['contadores'] == {'qtdCargas': 1, 'qtdConsultasEvitadas': 12}
+
+    # Calendário remontado junto com os feriados recarregados (ex.: put_feriados)
+    feriados.append({'id': 20190102, 'dt_feriado': date(2019, 1, 2), 'descricao': 'Feriado de teste'})
+    cache_feriados.invalidar()
+    assert Calendario.listDiasUteis(date(2019, 1, 1), date(2019, 1, 4)) == [date(2019, 1, 3), date(2019, 1, 4)]
+    assert Calendario.isDiaUtil(date(2019, 1, 2)) is False and len(consultas) == 2
+    cache_feriados.invalidar()
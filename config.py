@@ -30,6 +30,66 @@ SECRET_KEY = 'Tic@lacaTic@'
 # 'datastore' as it does not require any additional configuration.
 DATA_BACKEND = 'datastore'
 
+# Arquivo do banco de dados local SQLite (DATA_BACKEND = 'sqlite'). Aceita também URIs
+# (ex.: 'file:comparador?mode=memory&cache=shared')
+SQLITE_DATABASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'comparador.db')
+
+# Carga do banco de dados em memória (DATA_BACKEND = 'memory', utilizado em testes e geração de carga):
+# indexadores e feriados dos arquivos em static e índices sintéticos até a data atual
+MEMORY_CARGA_CADASTROS = True
+MEMORY_INDICES_SINTETICOS = True
+
+# Tempo (em segundos) em que as séries de índices mantidas em memória são consideradas
+# atualizadas. Após esse tempo a série é revalidada incrementalmente no banco de dados.
+# Em /investimento a série também é revalidada quando o registro do indexador (data do último
+# índice e data/hora da última atualização) muda, mesmo que a carga tenha ocorrido em outro processo.
+CACHE_INDICES_TTL = 3600
+
+# URL da API de séries do Banco Central ({0}: série, {1}: data inicial, {2}: data final) e tempo máximo
+# (em segundos) de espera pela resposta. A URL pode apontar para um servidor local em testes.
+BCB_API_URL = 'http://api.bcb.gov.br/dados/serie/bcdata.sgs.{0}/dados?formato=json&dataInicial={1}&dataFinal={2}'
+BCB_API_TIMEOUT = 30
+
+# Quantidade máxima de consultas simultâneas à API do Banco Central na atualização de índices
+ATUALIZACAO_MAX_CONCORRENCIA = 4
+
+# Quantidade de índices por gravação em lote (o Datastore aceita até 500 entidades por gravação)
+# e quantidade máxima de lotes gravados simultaneamente na inclusão de índices
+INGESTAO_TAMANHO_LOTE = 200
+INGESTAO_MAX_CONCORRENCIA = 4
+
+# Backfill de índices: tamanho (em meses) de cada janela consultada na API do Banco Central e tempo máximo
+# (em segundos) de uma execução. Execuções interrompidas são retomadas a partir do último checkpoint.
+BACKFILL_JANELA_MESES = 12
+BACKFILL_TEMPO_MAXIMO = 480
+
+# Tamanho máximo (em bytes) do cache de respostas de /investimento mantido em memória por processo.
+# As respostas são identificadas pela versão do indexador lida do banco de dados a cada requisição,
+# portanto uma carga de índices em qualquer processo invalida as respostas de todos. Utilize 0 para
+# desabilitar o cache.
+CACHE_INVESTIMENTOS_MAX_BYTES = 64 * 1024 * 1024
+
+# Quantidade máxima de investimentos por requisição de comparação (/api/investimentos/comparacao)
+COMPARACAO_MAX_INVESTIMENTOS = 20
+
+# Projeção de investimentos (/api/investimento/projecao): quantidade máxima de cenários por requisição e
+# quantidade de processos da simulação. O padrão (1) executa a simulação no próprio processo do servidor.
+# Valores maiores habilitam um pool de processos por worker (ver negocio.projecao), que deve ser dimensionado
+# junto com a quantidade de workers do servidor (ex.: 4 workers gunicorn x 4 processos = 16 processos de
+# simulação). Os processos do pool são criados por fork a partir de um worker que executa múltiplas threads
+# (requisições, escrita em lotes), e o fork copia somente a thread que o realiza: locks mantidos por outras
+# threads no momento do fork permanecem bloqueados no processo filho. Habilitar somente em servidores com
+# workers de thread única ou após validar o ambiente.
+PROJECAO_MAX_CENARIOS = 50000
+PROJECAO_PROCESSOS = 1
+
+# Instrumentação das requisições: tempo por etapa (consulta, conversao, calculo, serializacao) no cabeçalho
+# Server-Timing e histograma em /api/metricas/requisicoes. Fração das requisições perfiladas com cProfile
+# (0 desabilita) e diretório dos arquivos de perfil gerados (padrão: diretório temporário do sistema).
+INSTRUMENTACAO_ATIVA = False
+INSTRUMENTACAO_PERFIL_AMOSTRAGEM = 0.0
+INSTRUMENTACAO_PERFIL_DIRETORIO = None
+
 # Google Cloud Project ID. This can be found on the 'Overview' page at
 # https://console.developers.google.com
 # PROJECT_ID = 'Comparador-Investimentos'
@@ -0,0 +1,23 @@
+import pytest
+
+import api
+import config
+from model import cache_feriados, cache_indices
+
+
+@pytest.fixture
+def app_memoria():
+    """Fábrica de aplicações da API com o banco de dados em memória (DATA_BACKEND = 'memory').
+    As séries de índices e os feriados em memória são descartados antes e depois do teste, mesmo em caso de falha.
+
+    Uso: app = app_memoria(CACHE_INVESTIMENTOS_MAX_BYTES=0)
+    """
+    cache_indices.invalidar()
+    cache_feriados.invalidar()
+
+    def criar(**configuracao):
+        return api.create_app(config, testing=True, config_overrides=dict({'DATA_BACKEND': 'memory'}, **configuracao))
+
+    yield criar
+    cache_indices.invalidar()
+    cache_feriados.invalidar()
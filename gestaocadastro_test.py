@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal, localcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from dateutil.relativedelta import relativedelta
+from flask import Flask, has_app_context
+
+from model import cache_feriados, cache_indices, model_sqlite
+from negocio.calendario import Calendario
+from negocio.gestaocadastro import GestaoCadastro
+from negocio.indexador import Indexador
+from negocio.indice import Indice
+from negocio.motorcalculo import CONTEXTO
+from utils.helper import ServerException
+
+ATRASO = 0.3
+
+
+class BancoCentralFalso(BaseHTTPRequestHandler):
+    """Simula a API de séries do Banco Central retornando o índice 0.02 para os dias úteis do período.
+    Registra o intervalo (início, fim) de cada consulta e retorna erro para as séries em seriesComFalha."""
+    intervalos = []
+    seriesComFalha = set()
+
+    def do_GET(self):
+        inicio = time.perf_counter()
+        time.sleep(ATRASO)
+        BancoCentralFalso.intervalos.append((inicio, time.perf_counter()))
+        if urlparse(self.path).path.strip('/') in BancoCentralFalso.seriesComFalha:
+            self.send_response(500)
+            self.end_headers()
+            return
+        parametros = parse_qs(urlparse(self.path).query)
+        dia, mes, ano = map(int, parametros['dataInicial'][0].split('/'))
+        data = date(ano, mes, dia)
+        dados = [{'data': (data + timedelta(days=d)).strftime('%d/%m/%Y'), 'valor': '0.02'} for d in range(3)]
+        corpo = json.dumps(dados).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _preparar_atualizacao(tmpdir, seriesComFalha=()):
+    BancoCentralFalso.intervalos = []
+    BancoCentralFalso.seriesComFalha = set(seriesComFalha)
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), BancoCentralFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    app = Flask(__name__)
+    app.config['DATA_BACKEND'] = 'sqlite'
+    app.config['SQLITE_DATABASE'] = str(tmpdir.join('teste.db'))
+    app.config['BCB_API_URL'] = 'http://127.0.0.1:{0}/{{0}}?dataInicial={{1}}&dataFinal={{2}}'.format(servidor.server_port)
+    model_sqlite._conexoes.__dict__.clear()
+    model_sqlite.init_app(app)
+    cache_indices.invalidar()
+    dataUltReferencia = date.today() - timedelta(days=10)
+    indexadores = [{'id': id, 'nome': id.upper(), 'dt_ult_referencia': dataUltReferencia, 'periodicidade': 'Diário',
+                    'tipo_atualizacao': 'automatica', 'serie': serie} for id, serie in (('cdi', '12'), ('selic', '11'), ('tr', '226'))]
+    model_sqlite.update_multi(model_sqlite.TipoEntidade.INDEXADORES, indexadores)
+    return servidor, app, dataUltReferencia
+
+
+def test_atualizacao_concorrente(tmpdir):
+    servidor, app, dataUltReferencia = _preparar_atualizacao(tmpdir)
+    try:
+        with app.app_context():
+            atualizacao = GestaoCadastro().atualizar_indices()
+    finally:
+        servidor.shutdown()
+
+    assert atualizacao['contador'] == 9
+    assert sorted(atualizacao['tempos']) == ['cdi', 'selic', 'tr']
+    assert all(tempo['tempoConsulta'] >= ATRASO for tempo in atualizacao['tempos'].values())
+    # Consultas simultâneas: todas as consultas em andamento ao mesmo tempo em algum instante
+    assert len(BancoCentralFalso.intervalos) == 3
+    assert max(inicio for inicio, fim in BancoCentralFalso.intervalos) < min(fim for inicio, fim in BancoCentralFalso.intervalos)
+    indexador = model_sqlite.read(model_sqlite.TipoEntidade.INDEXADORES, 'selic')
+    assert indexador['dt_ult_referencia'] == dataUltReferencia + timedelta(days=2)
+    assert len(model_sqlite.list_indices('cdi', dataUltReferencia, date.today())) == 3
+
+
+def test_atualizacao_com_falha(tmpdir):
+    servidor, app, dataUltReferencia = _preparar_atualizacao(tmpdir, seriesComFalha=('226',))
+    try:
+        with app.app_context():
+            try:
+                GestaoCadastro().atualizar_indices()
+                assert False, 'ServerException esperada'
+            except ServerException as se:
+                mensagem = se.mensagem
+    finally:
+        servidor.shutdown()
+
+    # Indexadores com falha e tempos dos demais informados na mensagem
+    assert "['tr']" in mensagem and "'cdi': {'qtdIndices': 3" in mensagem
+    assert len(model_sqlite.list_indices('selic', dataUltReferencia, date.today())) == 3
+
+
+def test_ingestao_em_lotes(tmpdir, monkeypatch):
+    # Gravações com contexto da aplicação e atualizações da série em memória registradas
+    gravacoes, atualizacoes = [], []
+    update_multi, atualizar = model_sqlite.update_multi, cache_indices.atualizar
+
+    def gravar(tipoEntidade, *args):
+        if tipoEntidade == model_sqlite.TipoEntidade.INDICES:
+            gravacoes.append(has_app_context())
+        return update_multi(tipoEntidade, *args)
+    monkeypatch.setattr(model_sqlite, 'update_multi', gravar)
+    monkeypatch.setattr(cache_indices, 'atualizar', lambda indexador, indices: atualizacoes.append(len(indices)) or atualizar(indexador, indices))
+    app = Flask(__name__)
+    app.config['DATA_BACKEND'] = 'sqlite'
+    app.config['SQLITE_DATABASE'] = str(tmpdir.join('teste.db'))
+    model_sqlite._conexoes.__dict__.clear()
+    model_sqlite.init_app(app)
+    cache_indices.invalidar()
+    indexador = Indexador(id='cdi', nome='CDI', dt_ult_referencia=date(2001, 1, 1), periodicidade='Diário', tipo_atualizacao='automatica',
+                          id_indexador_referenciado=None, serie='12', qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+    indices = [Indice(tp_indice='cdi', dt_referencia=date(2001, 1, 2) + timedelta(days=d), val_indice=0.02, dth_inclusao=None) for d in range(1050)]
+
+    with app.app_context():
+        estatisticas = GestaoCadastro().ingerir_indices(indexador, indices, tamanhoLote=100, concorrencia=4)
+        assert estatisticas['qtdIndices'] == 1050 and estatisticas['qtdLotes'] == 11
+        assert estatisticas['qtdGravacoesIndexador'] == 1
+        assert len(indices) == 1050
+        assert len(model_sqlite.list_indices('cdi', date(2001, 1, 1), date(2010, 1, 1))) == 1050
+        assert model_sqlite.read(model_sqlite.TipoEntidade.INDEXADORES, 'cdi')['dt_ult_referencia'] == indices[-1].dt_referencia
+
+        estatisticas = GestaoCadastro().ingerir_indices(indexador, indices[:250], tamanhoLote=100, checkpointPorLote=True)
+        assert estatisticas['qtdGravacoesIndexador'] == 3
+        assert indexador.dt_ult_referencia == indices[249].dt_referencia and indexador.qtd_regs_ult_atualiz == 50
+    assert len(gravacoes) == 14 and all(gravacoes)
+    assert atualizacoes == [1050, 250]
+
+
+class BancoCentralJanelas(BaseHTTPRequestHandler):
+    """Simula a API de séries do Banco Central retornando os dias de semana do período consultado."""
+    consultas = []
+    falhar = False
+
+    def do_GET(self):
+        parametros = parse_qs(urlparse(self.path).query)
+        dataInicial, dataFinal = [date(*reversed(list(map(int, parametros[nome][0].split('/'))))) for nome in ('dataInicial', 'dataFinal')]
+        BancoCentralJanelas.consultas.append((dataInicial, dataFinal))
+        if BancoCentralJanelas.falhar and dataInicial.year == 2017:
+            self.send_response(500)
+            self.end_headers()
+            return
+        dias = [dataInicial + timedelta(days=d) for d in range((dataFinal - dataInicial).days + 1)]
+        corpo = json.dumps([{'data': dia.strftime('%d/%m/%Y'), 'valor': '0.02'} for dia in dias if dia.weekday() < 5]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_backfill_em_janelas_com_retomada(tmpdir):
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), BancoCentralJanelas)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    app = Flask(__name__)
+    app.config['DATA_BACKEND'] = 'sqlite'
+    app.config['SQLITE_DATABASE'] = str(tmpdir.join('teste.db'))
+    app.config['BCB_API_URL'] = 'http://127.0.0.1:{0}/{{0}}?dataInicial={{1}}&dataFinal={{2}}'.format(servidor.server_port)
+    model_sqlite._conexoes.__dict__.clear()
+    model_sqlite.init_app(app)
+    cache_indices.invalidar()
+    indexador = Indexador(id='cdi', nome='CDI', dt_ult_referencia=date(2016, 1, 1), periodicidade='Diário', tipo_atualizacao='automatica',
+                          id_indexador_referenciado=None, serie='12', qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+
+    try:
+        with app.app_context():
+            # Falha na segunda janela: checkpoint registrado ao final da primeira janela
+            BancoCentralJanelas.falhar = True
+            try:
+                GestaoCadastro().backfill_indexador(indexador, date(2018, 12, 31), 12)
+                assert False, 'ServerException esperada'
+            except ServerException:
+                pass
+            checkpoint = model_sqlite.read(model_sqlite.TipoEntidade.INDEXADORES, 'cdi')['dt_ult_referencia']
+            assert checkpoint == date(2016, 12, 30)
+
+            # Retomada a partir do checkpoint
+            BancoCentralJanelas.falhar = False
+            BancoCentralJanelas.consultas = []
+            estatisticas = GestaoCadastro().backfill_indexador(Indexador.fromDict(model_sqlite.read(model_sqlite.TipoEntidade.INDEXADORES, 'cdi')), date(2018, 12, 31), 12)
+    finally:
+        servidor.shutdown()
+
+    assert BancoCentralJanelas.consultas[0] == (date(2016, 12, 30), date(2017, 12, 29))
+    assert estatisticas['concluido'] and estatisticas['qtdJanelas'] == 3
+    assert estatisticas['dtUltReferencia'] == date(2018, 12, 31)
+    assert len(model_sqlite.list_indices('cdi', date(2016, 1, 1), date(2018, 12, 31))) == 782
+
+
+class BancoCentralMensal(BaseHTTPRequestHandler):
+    """Simula a API de séries do Banco Central retornando um índice mensal (dia 01) por mês do período consultado."""
+
+    def do_GET(self):
+        parametros = parse_qs(urlparse(self.path).query)
+        dataInicial, dataFinal = [date(*reversed(list(map(int, parametros[nome][0].split('/'))))) for nome in ('dataInicial', 'dataFinal')]
+        meses = [dataInicial + relativedelta(day=1, months=m) for m in range((dataFinal.year - dataInicial.year) * 12 + dataFinal.month - dataInicial.month + 1)]
+        corpo = json.dumps([{'data': mes.strftime('%d/%m/%Y'), 'valor': '0.4'} for mes in meses if dataInicial <= mes]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_backfill_mensal_informa_consultas_de_feriados_evitadas(tmpdir):
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), BancoCentralMensal)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    app = Flask(__name__)
+    app.config['DATA_BACKEND'] = 'sqlite'
+    app.config['SQLITE_DATABASE'] = str(tmpdir.join('teste.db'))
+    app.config['BCB_API_URL'] = 'http://127.0.0.1:{0}/{{0}}?dataInicial={{1}}&dataFinal={{2}}'.format(servidor.server_port)
+    model_sqlite._conexoes.__dict__.clear()
+    model_sqlite.init_app(app)
+    cache_indices.invalidar()
+    cache_feriados.invalidar()
+    indexador = Indexador(id='ipca', nome='IPCA', dt_ult_referencia=date(2017, 1, 1), periodicidade='Mensal', tipo_atualizacao='automatica',
+                          id_indexador_referenciado='ipca-diario', serie='433', qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+    indexadorDiario = Indexador(id='ipca-diario', nome='IPCA Diário', dt_ult_referencia=date(2017, 1, 1), periodicidade='Diário',
+                                tipo_atualizacao='calculada', id_indexador_referenciado='ipca', serie=None, qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+
+    try:
+        with app.app_context():
+            GestaoCadastro().put_indexador(indexadorDiario)
+            estatisticas = GestaoCadastro().backfill_indexador(indexador, date(2018, 12, 31), 12)
+    finally:
+        servidor.shutdown()
+        cache_feriados.invalidar()
+
+    # Um mês por índice mensal: a primeira consulta carrega os feriados, as demais são atendidas em memória
+    assert estatisticas['concluido'] and estatisticas['qtdIndices'] > 24
+    assert estatisticas['qtdConsultasFeriadosEvitadas'] == 23
+
+
+def test_calculo_indices_diarios_em_lote(app_memoria):
+    app = app_memoria()
+    valores = [0.29, 0.32, 0.09, 0.22, 0.40, 1.26, 0.33, -0.09, 0.48, 0.45, -0.21, 0.15]
+    indicesMensais = [Indice(tp_indice='ipca', dt_referencia=date(2018 + mes // 12, mes % 12 + 1, 1), val_indice=valores[mes % 12], dth_inclusao=None)
+                      for mes in range(24)]
+    indexadorDiario = Indexador(id='ipca-diario', nome='IPCA Diário', dt_ult_referencia=date(2018, 1, 1), periodicidade='Diário',
+                                tipo_atualizacao='calculada', id_indexador_referenciado='ipca', serie=None, qtd_regs_ult_atualiz=None, dth_ult_atualiz=None)
+
+    with app.app_context():
+        # Dias úteis de cada mês obtidos do calendário montado a partir dos feriados em memória
+        cache_feriados.get_repositorio()
+        qtdConsultasEvitadas = cache_feriados.get_qtd_consultas_evitadas()
+        diarios = GestaoCadastro().calcular_indices_diarios_lote(indexadorDiario, indicesMensais)
+        assert cache_feriados.get_qtd_consultas_evitadas() - qtdConsultasEvitadas == 24
+
+        # Mesma taxa diária do cálculo dia a dia: (1 + mensal/100) ** (1/qtdDiasUteis) - 1
+        esperado = []
+        with localcontext(CONTEXTO):
+            for indiceMensal in indicesMensais:
+                diasUteis = Calendario.diasUteisEntre(indiceMensal.dt_referencia, indiceMensal.dt_referencia + relativedelta(day=31))
+                for dia in diasUteis:
+                    valor = ((Decimal(1) + (Decimal(indiceMensal.val_indice) / Decimal(100))) ** (Decimal(1) / Decimal(len(diasUteis))) - 1) * Decimal(100)
+                    esperado.append((dia, float(valor)))
+    assert [(indice.dt_referencia, indice.val_indice) for indice in diarios] == esperado
+    assert set(indice.tp_indice for indice in diarios) == {'ipca-diario'}
@@ -0,0 +1,37 @@
+import time
+
+from utils import instrumentacao
+from utils.instrumentacao import etapa
+
+
+def test_tempo_exclusivo_das_etapas():
+    medicao = instrumentacao.MedicaoRequisicao()
+    instrumentacao._local.medicao = medicao
+    try:
+        with etapa('calculo'):
+            with etapa('consulta'):
+                time.sleep(0.02)
+    finally:
+        instrumentacao._local.medicao = None
+    assert medicao.etapas['consulta'] >= 0.02
+    assert medicao.etapas['calculo'] < 0.01
+    # Sem requisição instrumentada não há efeito
+    with etapa('calculo'):
+        pass
+
+
+def test_server_timing_e_histograma(tmpdir, app_memoria):
+    instrumentacao.histograma.reiniciar()
+    app = app_memoria(INSTRUMENTACAO_ATIVA=True, INSTRUMENTACAO_PERFIL_AMOSTRAGEM=1.0,
+                      INSTRUMENTACAO_PERFIL_DIRETORIO=str(tmpdir), CACHE_INVESTIMENTOS_MAX_BYTES=0)
+    client = app.test_client()
+    r = client.get('/api/investimento?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi'
+                   '&taxa=100&dataInicial=2019-01-02&dataFinal=2020-01-02')
+    assert r.status_code == 200
+    etapas = [item.split(';')[0] for item in r.headers['Server-Timing'].split(', ')]
+    assert etapas == ['consulta', 'conversao', 'calculo', 'serializacao', 'total']
+    assert tmpdir.join(r.headers['X-Perfil']).check()
+
+    metricas = client.get('/api/metricas/requisicoes').get_json()['body']['metricas']
+    total = metricas['rotas']['GET /api/investimento']['total']
+    assert total['qtd'] == 1 and sum(faixa['qtd'] for faixa in total['faixas']) == 1
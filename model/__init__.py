@@ -19,6 +19,12 @@ def get_model():
     if model_backend == 'datastore':
         from . import model_datastore
         model = model_datastore
+    elif model_backend == 'sqlite':
+        from . import model_sqlite
+        model = model_sqlite
+    elif model_backend == 'memory':
+        from . import model_memory
+        model = model_memory
     # elif model_backend == 'cloudsql':
     #     from . import model_cloudsql
     #     model = model_cloudsql
@@ -28,6 +34,6 @@ def get_model():
     else:
         raise ValueError(
             "Banco de dados não configurado. "
-            "Por favor especifique datastore")
+            "Por favor especifique datastore, sqlite ou memory")
 
     return model
\ No newline at end of file
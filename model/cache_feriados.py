@@ -0,0 +1,100 @@
+# Importa módulo para tratamento de data/hora
+from datetime import datetime, date
+# Importa módulos para arrays compactos e busca binária
+from array import array
+from bisect import bisect_left, bisect_right
+# Importa módulo para controle de concorrência
+import threading
+# Importa o módulo de log
+import logging
+# Importa o módulo responsável por selecionar o banco de dados conforme configuração no pacote model
+from model import get_model
+# Importa o módulo de métricas
+from utils.metricas import Metricas
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Cache Feriados')
+logger.setLevel(logging.INFO)
+
+# Período de feriados carregado em memória
+DATA_INICIAL = date(1900, 1, 1)
+DATA_FINAL = date(2199, 12, 31)
+
+class RepositorioFeriados(object):
+    """Tabela completa de feriados mantida em memória e ordenada por data. Instâncias são imutáveis:
+    a recarga gera um novo repositório, permitindo leituras concorrentes sem bloqueio.
+
+    Atributos:
+        ordinais: datas dos feriados (date.toordinal) em ordem crescente
+        registros: feriados no formato retornado pelo model (dictionary)
+    """
+    def __init__(self, registros: list):
+        self.registros = sorted(registros, key=lambda registro: registro['dt_feriado'])
+        self.ordinais = array('l', (registro['dt_feriado'].toordinal() for registro in self.registros))
+
+    def __len__(self):
+        return len(self.ordinais)
+
+    def fatia(self, dataInicial: datetime.date, dataFinal: datetime.date):
+        """Retorna os feriados (dictionary) do período informado (inclusive) através de busca binária.
+        Os dictionaries são compartilhados com o repositório e não devem ser alterados.
+        """
+        inicio = bisect_left(self.ordinais, dataInicial.toordinal())
+        fim = bisect_right(self.ordinais, dataFinal.toordinal(), inicio)
+        return self.registros[inicio:fim]
+
+# Repositório do processo e métricas de consultas ao banco de dados evitadas
+_repositorio = None
+_lock = threading.Lock()
+metricas = Metricas('cache_feriados')
+
+def get_repositorio(consulta: bool = False):
+    """Retorna o repositório de feriados do processo, carregando a tabela completa do banco de dados
+    na primeira consulta (ou na primeira consulta após invalidar).
+
+    Argumentos:
+        consulta: se verdadeiro a chamada corresponde a uma consulta de feriados (list_feriados ou calendário de 
+        dias úteis, ver Calendario), contabilizada como consulta evitada ao banco de dados quando atendida sem carga
+    """
+    global _repositorio
+    repositorio = _repositorio
+    if repositorio is None:
+        with _lock:
+            if _repositorio is None:
+                with metricas.medir('carga'):
+                    _repositorio = RepositorioFeriados(get_model().list_feriados(DATA_INICIAL, DATA_FINAL))
+                metricas.incrementar('qtdCargas')
+                logger.info("Feriados carregados em memória. Qtd. feriados: {}".format(len(_repositorio)))
+                return _repositorio
+            repositorio = _repositorio
+    if consulta:
+        metricas.incrementar('qtdConsultasEvitadas')
+    return repositorio
+
+def list_feriados(dataInicial: datetime.date, dataFinal: datetime.date):
+    """Retorna os feriados do período informado a partir do repositório em memória. Mesmo contrato
+    de list_feriados do model, porém os dictionaries retornados não devem ser alterados.
+    """
+    return get_repositorio(consulta=True).fatia(dataInicial, dataFinal)
+
+def get_qtd_consultas_evitadas():
+    """Retorna a quantidade de consultas de feriados atendidas pelo repositório sem carga do banco de dados.
+    """
+    return metricas.to_dict()['contadores'].get('qtdConsultasEvitadas', 0)
+
+def invalidar():
+    """Descarta o repositório em memória (recarregado na próxima consulta). Chamado por put_feriados. O calendário 
+    de dias úteis (ver Calendario) é montado a partir do repositório e também é remontado na próxima consulta.
+    """
+    global _repositorio
+    with _lock:
+        _repositorio = None
+
+def get_estatisticas():
+    """Retorna as métricas do repositório: quantidade de cargas, consultas ao banco de dados evitadas
+    e quantidade de feriados em memória.
+    """
+    estatisticas = metricas.to_dict()
+    repositorio = _repositorio
+    estatisticas['qtdFeriados'] = len(repositorio) if repositorio is not None else None
+    return estatisticas
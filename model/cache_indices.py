@@ -0,0 +1,251 @@
+# Importanto web framework Flask
+from flask import current_app
+# Importa módulo para tratamento de data/hora
+from datetime import datetime, date, timedelta
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulos para arrays compactos e busca binária
+from array import array
+from bisect import bisect_left, bisect_right
+# Importa módulos para controle de concorrência e tempo
+import threading
+import time
+# Importa módulos para cálculos matemáticos e vetorizados
+import math
+import numpy
+# Importa o módulo de log
+import logging
+# Importa o módulo responsável por selecionar o banco de dados conforme configuração no pacote model
+from model import get_model
+# Importa a instrumentação das requisições (tempo por etapa)
+from utils.instrumentacao import etapa
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Cache Indices')
+logger.setLevel(logging.INFO)
+
+# Período máximo de índices mantido em memória
+DATA_INICIAL = date(2001, 1, 1)
+DATA_FINAL = date(2078, 12, 31)
+# Tempo (em segundos) após o qual a série em memória é revalidada no banco de dados
+TTL_PADRAO = 3600
+
+class SerieIndices(object):
+    """Série de índices de um indexador armazenada de forma colunar e ordenada por data de referência.
+    Instâncias são imutáveis após criadas: atualizações geram uma nova série (cópia na escrita),
+    permitindo leituras concorrentes sem bloqueio. Cada nova série copia todas as colunas (O(n) por
+    mesclagem), portanto atualizações devem ser agrupadas (ex.: uma mesclagem por carga de índices).
+
+    Atributos:
+        indexador: código identificador do indexador. Ex.: ipca, cdi.
+        ordinais: datas de referência (date.toordinal) em ordem crescente
+        valores: valores dos índices (Decimal)
+        valoresFloat: valores dos índices (float64)
+        registros: índices no formato retornado pelo model (dictionary)
+        fatoresAcumulados: produto acumulado dos fatores diários (1 + índice/100), onde fatoresAcumulados[k] 
+        é o produto dos k primeiros fatores (tamanho = qtd. índices + 1)
+        logFatoresAcumulados: soma acumulada do logaritmo dos fatores diários (mesma indexação)
+        instanteCarga: instante (time.monotonic) da última carga/revalidação no banco de dados
+        versao: versão do indexador (ver get_serie) na última carga/revalidação ou None quando desconhecida
+    """
+    def __init__(self, indexador: str, registros: list, instanteCarga: float, anterior=None, versao=None):
+        self.indexador = indexador
+        self.registros = registros
+        self.instanteCarga = instanteCarga
+        self.versao = versao
+        # Quando a série anterior é prefixo desta série as colunas são copiadas da série anterior (cópia em bloco, O(n))
+        # e somente a recorrência dos fatores acumulados dos novos índices é calculada
+        if anterior is not None:
+            novos = registros[len(anterior.registros):]
+            self.ordinais = anterior.ordinais + array('l', (registro['dt_referencia'].toordinal() for registro in novos))
+            self.valores = anterior.valores + [registro['val_indice'] for registro in novos]
+            self.valoresFloat = anterior.valoresFloat + array('d', (float(registro['val_indice']) for registro in novos))
+            self.fatoresAcumulados = array('d', anterior.fatoresAcumulados)
+            self.logFatoresAcumulados = array('d', anterior.logFatoresAcumulados)
+        else:
+            self.ordinais = array('l', (registro['dt_referencia'].toordinal() for registro in registros))
+            self.valores = [registro['val_indice'] for registro in registros]
+            self.valoresFloat = array('d', map(float, self.valores))
+            self.fatoresAcumulados = array('d', [1.0])
+            self.logFatoresAcumulados = array('d', [0.0])
+        # Estende as tabelas de fatores acumulados até o último índice da série
+        fatorAcumulado = self.fatoresAcumulados[-1]
+        logFatorAcumulado = self.logFatoresAcumulados[-1]
+        for valor in self.valoresFloat[len(self.fatoresAcumulados) - 1:]:
+            fatorAcumulado *= 1.0 + valor / 100.0
+            logFatorAcumulado += math.log1p(valor / 100.0)
+            self.fatoresAcumulados.append(fatorAcumulado)
+            self.logFatoresAcumulados.append(logFatorAcumulado)
+
+    def __len__(self):
+        return len(self.ordinais)
+
+    def ultima_data(self):
+        """Retorna a data de referência do último índice da série ou None se a série estiver vazia.
+        """
+        if len(self.ordinais) == 0:
+            return None
+        return date.fromordinal(self.ordinais[-1])
+
+    def posicoes(self, dataInicial: datetime.date, dataFinal: datetime.date):
+        """Retorna as posições inicial (inclusive) e final (exclusive) dos índices do período
+        através de busca binária.
+        """
+        inicio = bisect_left(self.ordinais, dataInicial.toordinal())
+        fim = bisect_right(self.ordinais, dataFinal.toordinal(), inicio)
+        return inicio, fim
+
+    def fatia(self, dataInicial: datetime.date, dataFinal: datetime.date):
+        """Retorna os índices (dictionary) do período informado sem nenhuma conversão por registro.
+        Os dictionaries são compartilhados com o cache e não devem ser alterados.
+        """
+        inicio, fim = self.posicoes(dataInicial, dataFinal)
+        return self.registros[inicio:fim]
+
+    def fator(self, inicio: int, fim: int, taxa: float = 100.0, exato: bool = False):
+        """Retorna o fator acumulado (produto de 1 + taxa% * índice/100) dos índices entre as posições 
+        inicial (inclusive) e final (exclusive).
+
+        Argumentos:
+            inicio: posição inicial (ver posicoes)
+            fim: posição final (ver posicoes)
+            taxa: percentual aplicado sobre o índice (ex.: 120 (120% do cdi))
+            exato: para taxa diferente de 100% calcula o produto dos fatores do período (O(n)) ao invés 
+            da aproximação pela soma acumulada dos logaritmos (O(1))
+        Retorno:
+            Fator acumulado do período (float). Ex.: 1.0523 para rentabilidade de 5,23%.
+        """
+        if taxa == 100.0:
+            # Duas consultas e uma divisão
+            return self.fatoresAcumulados[fim] / self.fatoresAcumulados[inicio]
+        elif not exato:
+            # Aproximação: log(1 + t*r) ~ t*log(1 + r) para índices diários pequenos
+            return math.exp((taxa / 100.0) * (self.logFatoresAcumulados[fim] - self.logFatoresAcumulados[inicio]))
+        else:
+            valores = numpy.frombuffer(self.valoresFloat, dtype=numpy.float64)[inicio:fim]
+            return float(numpy.prod(1.0 + valores * (taxa / 10000.0)))
+
+    def fatores(self, inicios, fins, taxa: float = 100.0, taxaPrefixadaDiaria: float = 0.0):
+        """Retorna os fatores acumulados exatos de vários períodos da série. A soma acumulada dos logaritmos
+        dos fatores diários (com taxa e taxa prefixada aplicadas) é calculada uma única vez (O(n)) e cada
+        período é obtido pela diferença de duas posições (O(1)).
+
+        Argumentos:
+            inicios: array numpy com as posições iniciais (inclusive) dos períodos (ver posicoes)
+            fins: array numpy com as posições finais (exclusive) dos períodos
+            taxa: percentual aplicado sobre o índice (ex.: 120 (120% do cdi))
+            taxaPrefixadaDiaria: taxa diária (em percentual) somada a cada índice
+        Retorno:
+            Array numpy com o fator acumulado (float) de cada período.
+        """
+        if taxa == 100.0 and taxaPrefixadaDiaria == 0.0:
+            logAcumulados = numpy.frombuffer(self.logFatoresAcumulados, dtype=numpy.float64)
+        else:
+            valores = numpy.frombuffer(self.valoresFloat, dtype=numpy.float64)
+            logAcumulados = numpy.empty(len(valores) + 1)
+            logAcumulados[0] = 0.0
+            numpy.cumsum(numpy.log1p((valores * (taxa / 100.0) + taxaPrefixadaDiaria) / 100.0), out=logAcumulados[1:])
+        return numpy.exp(logAcumulados[fins] - logAcumulados[inicios])
+
+    def mesclar(self, registros: list, instanteCarga: float, versao=None):
+        """Retorna uma nova série com os registros informados incluídos/atualizados e a versão informada.
+        """
+        if len(registros) == 0:
+            return SerieIndices(self.indexador, self.registros, instanteCarga, anterior=self, versao=versao)
+        registros = sorted(registros, key=lambda registro: registro['dt_referencia'])
+        # Caso mais comum: novos índices posteriores ao último índice da série
+        if len(self.ordinais) == 0 or registros[0]['dt_referencia'].toordinal() > self.ordinais[-1]:
+            return SerieIndices(self.indexador, self.registros + registros, instanteCarga, anterior=self, versao=versao)
+        # Caso contrário substitui os índices de mesma data de referência e reordena
+        porData = dict((registro['dt_referencia'], registro) for registro in self.registros)
+        porData.update((registro['dt_referencia'], registro) for registro in registros)
+        return SerieIndices(self.indexador, [porData[data] for data in sorted(porData)], instanteCarga, versao=versao)
+
+# Séries em memória por indexador
+_series = {}
+_lock = threading.Lock()
+
+def _ttl():
+    try:
+        return current_app.config.get('CACHE_INDICES_TTL', TTL_PADRAO)
+    except RuntimeError:
+        # Fora de um contexto de aplicação Flask
+        return TTL_PADRAO
+
+def _desatualizada(serie: SerieIndices, agora: float, versao):
+    """Indica se a série deve ser revalidada: tempo CACHE_INDICES_TTL expirado ou versão do indexador diferente 
+    da versão da série (índices gravados por outro processo).
+    """
+    return agora - serie.instanteCarga >= _ttl() or (versao is not None and serie.versao != versao)
+
+def get_serie(indexador: str, versao=None):
+    """Retorna a série em memória do indexador, carregando-a do banco de dados na primeira consulta
+    (read-through) e revalidando-a incrementalmente (somente índices posteriores ao último índice
+    em memória) após expirado o tempo definido em CACHE_INDICES_TTL ou quando a versão informada difere
+    da versão da série.
+
+    Argumentos:
+        indexador: código identificador do indexador. Ex.: ipca, cdi, poupanca.
+        versao: (opcional) versão do indexador gravada no banco de dados (ex.: data do último índice e data/hora 
+        da última atualização do indexador). Permite que um processo perceba os índices gravados por outro 
+        processo sem aguardar CACHE_INDICES_TTL.
+    Retorno:
+        Objeto SerieIndices do indexador.
+    """
+    serie = _series.get(indexador)
+    agora = time.monotonic()
+    if serie is not None and not _desatualizada(serie, agora, versao):
+        return serie
+    with _lock:
+        serie = _series.get(indexador)
+        if serie is None:
+            # Carga completa da série
+            registros = get_model().list_indices(indexador, DATA_INICIAL, DATA_FINAL)
+            with etapa('conversao'):
+                serie = SerieIndices(indexador, registros, agora, versao=versao)
+            logger.info("Série de índices carregada em memória: {0}, qtd. índices: {1}".format(indexador, len(serie)))
+        elif _desatualizada(serie, agora, versao):
+            # Revalidação incremental da série
+            ultimaData = serie.ultima_data()
+            dataInicial = DATA_INICIAL if ultimaData is None else ultimaData + timedelta(days=1)
+            registros = get_model().list_indices(indexador, dataInicial, DATA_FINAL) if dataInicial <= DATA_FINAL else []
+            with etapa('conversao'):
+                serie = serie.mesclar(registros, agora, versao)
+            logger.info("Série de índices revalidada em memória: {0}, qtd. novos índices: {1}".format(indexador, len(registros)))
+        _series[indexador] = serie
+    return serie
+
+def list_indices(indexador: str, dataInicial: datetime.date, dataFinal: datetime.date):
+    """Retorna os índices do indexador referentes ao período informado a partir da série em memória.
+    Mesmo contrato de list_indices do model, porém os dictionaries retornados são compartilhados
+    com o cache e não devem ser alterados.
+    """
+    return get_serie(indexador).fatia(dataInicial, dataFinal)
+
+def atualizar(indexador: str, indices: list):
+    """Inclui/atualiza na série em memória do indexador os índices gravados no banco de dados.
+    Caso a série ainda não tenha sido carregada não há o que atualizar (será carregada na próxima consulta).
+
+    Argumentos:
+        indexador: código identificador do indexador. Ex.: ipca, cdi, poupanca.
+        indices: lista de objetos Indice (ou dictionaries) gravados no banco de dados.
+    """
+    with _lock:
+        serie = _series.get(indexador)
+        if serie is None:
+            return
+        registros = []
+        for indice in indices:
+            registro = dict((atributo, indice[atributo]) for atributo in indice.keys())
+            registro['val_indice'] = Decimal(registro['val_indice'])
+            registros.append(registro)
+        _series[indexador] = serie.mesclar(registros, serie.instanteCarga)
+
+def invalidar(indexador: str = None):
+    """Descarta a série em memória do indexador informado (ou de todos quando não informado).
+    """
+    with _lock:
+        if indexador is None:
+            _series.clear()
+        else:
+            _series.pop(indexador, None)
@@ -21,10 +21,25 @@ from enum import Enum
 # Importa módulo para tratamento de data/hora
 from datetime import datetime
 # Importanto módulo para tratamento de números decimais
-from decimal import Decimal, getcontext
+from decimal import Decimal
+# Importa módulos para controle de concorrência
+import os
+import threading
+# Importa o módulo de métricas
+from utils.metricas import Metricas
+# Importa a instrumentação das requisições (tempo por etapa)
+from utils.instrumentacao import etapa
 
 builtin_list = list
 
+# Cliente do Datastore compartilhado pelas requisições do processo (criado sob demanda)
+_cliente = None
+# Processo que criou o cliente (após um fork, ex.: workers do gunicorn, cada processo cria o seu)
+_pidCliente = None
+_lockCliente = threading.Lock()
+# Métricas de criação de clientes e de latência das operações no Datastore
+metricas = Metricas('datastore', etapa='consulta')
+
 class TipoEntidade(Enum):
     ''' Enum que define os tipos das entidades do banco de dados
     '''
@@ -44,8 +59,26 @@ def init_app(app):
     pass
 
 def get_client():
-    # return datastore.Client(current_app.config['PROJECT_ID'])
-    return datastore.Client()
+    """Retorna o cliente do Datastore do processo, criando-o na primeira chamada. O cliente (e o 
+    respectivo canal de comunicação com o Datastore) é reutilizado por todas as requisições e threads 
+    do processo, evitando a descoberta de credenciais e abertura de conexões a cada consulta.
+    """
+    global _cliente, _pidCliente
+    pid = os.getpid()
+    if _cliente is None or _pidCliente != pid:
+        with _lockCliente:
+            if _cliente is None or _pidCliente != pid:
+                with metricas.medir('criacao_cliente'):
+                    # _cliente = datastore.Client(current_app.config['PROJECT_ID'])
+                    _cliente = datastore.Client()
+                _pidCliente = pid
+                metricas.incrementar('qtdClientesCriados')
+    return _cliente
+
+def get_estatisticas():
+    """Retorna as métricas do processo: quantidade de clientes criados e latência das operações.
+    """
+    return metricas.to_dict()
 
 def list_indexadores(dt_referencia :datetime.date=None, tipo_atualizacao: str=None):
     # Instancia o cliente do banco de dados NOSQL GCloud DataStore
@@ -61,9 +94,11 @@ def list_indexadores(dt_referencia :datetime.date=None, tipo_atualizacao: str=No
     query.order = ['dt_ult_referencia']
     # Executa a consulta e armazena num dictionary 
     #lista = list(query.fetch())
-    lista = query.fetch()
+    with metricas.medir('list_indexadores'):
+        lista = builtin_list(query.fetch())
 
-    entities = builtin_list(map(from_datastore, lista))
+    with etapa('conversao'):
+        entities = builtin_list(map(from_datastore, lista))
     
     return entities
 
@@ -80,10 +115,12 @@ def list_indices(indexador :str, dataInicial :datetime.date, dataFinal : datetim
     query.order = ['dt_referencia']
     # Executa a consulta e armazena num dictionary 
     # indices = list(query.fetch())
-    indices = query.fetch()
+    with metricas.medir('list_indices'):
+        indices = builtin_list(query.fetch())
     # Trata os formatos retornados da lista de entidades
     # indices = list(map(lambda e: _tratar_formatos(e), indices))
-    indices = builtin_list(map(from_datastore, indices))
+    with etapa('conversao'):
+        indices = builtin_list(map(from_datastore, indices))
     return indices
 
 def list_feriados(dataInicial :datetime.date, dataFinal : datetime.date):
@@ -97,21 +134,25 @@ def list_feriados(dataInicial :datetime.date, dataFinal : datetime.date):
     #Define ordenação da consulta
     query.order = ['dt_feriado']
     # Executa a consulta e armazena num dictionary 
-    feriados = query.fetch()
+    with metricas.medir('list_feriados'):
+        feriados = builtin_list(query.fetch())
     # Trata os formatos retornados da lista de entidades
-    feriados = builtin_list(map(from_datastore, feriados))
+    with etapa('conversao'):
+        feriados = builtin_list(map(from_datastore, feriados))
     return feriados
 
 def read(kind: TipoEntidade, id: str):
     ds = get_client()
     key = ds.key(kind.value, id)
-    results = ds.get(key)
+    with metricas.medir('read'):
+        results = ds.get(key)
     return from_datastore(results)
 
 def update(kind: TipoEntidade, data: dict, id: str = None):
     ds = get_client()
     entidade = to_datastore(ds, kind, data)
-    ds.put(entidade)
+    with metricas.medir('update'):
+        ds.put(entidade)
     return
 
 create = update
@@ -119,7 +160,8 @@ create = update
 def delete(kind: TipoEntidade, id: str):
     ds = get_client()
     key = ds.key(kind.value, id)
-    ds.delete(key)
+    with metricas.medir('delete'):
+        ds.delete(key)
     return key
 
 def update_multi(kind: TipoEntidade, lista: list):
@@ -128,7 +170,8 @@ def update_multi(kind: TipoEntidade, lista: list):
     for item in lista:
         entidade = to_datastore(ds, kind, item)
         entidades.append(entidade)
-    ds.put_multi(entidades)
+    with metricas.medir('update_multi'):
+        ds.put_multi(entidades)
     return
 
 # Lista com paginação
@@ -181,8 +224,6 @@ def _tratar_formatos(entidade: dict):
     Retorno:
         entidade com os tipos de dados convertidos.
     """
-    # Define a precisão da classe Decimal para 9 casas decimais
-    getcontext().prec = 9
     # Varre os atributos da entidade
     for atributo in entidade.keys():
         # Tratamento de campos data e data
@@ -204,8 +245,11 @@ def to_datastore(ds: datastore.Client, kind: TipoEntidade, entidade: dict):
     """
     if not entidade:
         return None
+    # Trabalha sobre uma cópia para não alterar o objeto/dictionary recebido
     elif type(entidade) != dict:
-        entidade = entidade.__dict__
+        entidade = dict(entidade.to_dict())
+    else:
+        entidade = dict(entidade)
 
     # Varre os atributos da entidade atualizando os padrões de tipos de dados
     for atributo in entidade.keys():
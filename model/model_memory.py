@@ -0,0 +1,289 @@
+# Importa classe para Enumeradores
+from enum import Enum
+# Importa módulo para tratamento de data/hora
+from datetime import datetime, date, timedelta
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulos para busca binária, geração de dados, leitura dos arquivos de carga e controle de concorrência
+from bisect import bisect_left, bisect_right
+import csv
+import json
+import os
+import random
+import threading
+# Importa o módulo de log
+import logging
+# Importa o módulo de métricas
+from utils.metricas import Metricas
+
+builtin_list = list
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Model Memory')
+logger.setLevel(logging.INFO)
+
+class TipoEntidade(Enum):
+    ''' Enum que define os tipos das entidades do banco de dados
+    '''
+    INDEXADORES = 'Indexadores'
+    INDICES = 'Indices'
+    FERIADOS = 'Feriados'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+            lista.append(item.value)
+        lista.sort()
+        return lista
+
+# Atributos de cada entidade (mesmas colunas do model_sqlite). Tipos armazenados de acordo com o prefixo do atributo:
+#   dt_  -> datetime.date
+#   dth_ -> datetime
+#   val_ -> Decimal (a partir do float, mesmo valor retornado pelos demais bancos de dados)
+ATRIBUTOS = {
+    TipoEntidade.INDEXADORES: ('id', 'nome', 'dt_ult_referencia', 'periodicidade', 'tipo_atualizacao', 'id_indexador_referenciado',
+                               'serie', 'qtd_regs_ult_atualiz', 'dth_ult_atualiz', 'val_ultimo_indice'),
+    TipoEntidade.INDICES: ('id', 'tp_indice', 'dt_referencia', 'val_indice', 'dth_inclusao'),
+    TipoEntidade.FERIADOS: ('id', 'dt_feriado', 'descricao'),
+}
+
+# Ordenação mantida para as consultas por período: (atributo de agrupamento, atributo data)
+ORDENACAO = {
+    TipoEntidade.INDICES: ('tp_indice', 'dt_referencia'),
+    TipoEntidade.FERIADOS: (None, 'dt_feriado'),
+}
+
+# Arquivos da carga inicial (mesma origem das cargas de GestaoCadastro)
+DIRETORIO_STATIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+ARQUIVO_INDEXADORES = os.path.join(DIRETORIO_STATIC, 'json', 'indexadores.json')
+ARQUIVO_FERIADOS = os.path.join(DIRETORIO_STATIC, 'csv', 'feriados.csv')
+# Semente da geração de índices sintéticos (mesma série a cada inicialização)
+SEMENTE_INDICES = 2001
+
+# Entidades por tipo e id e, para as entidades consultadas por período, listas ordenadas por data de
+# cada grupo (ex.: índices de cada indexador) com os ordinais (date.toordinal) e os ids correspondentes
+_entidades = dict((kind, {}) for kind in TipoEntidade)
+_ordenacao = dict((kind, {}) for kind in ORDENACAO)
+_lock = threading.RLock()
+# Métricas de latência das operações
+metricas = Metricas('memory', etapa='consulta')
+
+def init_app(app):
+    """Reinicia o banco de dados em memória e realiza a carga inicial conforme configuração:
+    MEMORY_CARGA_CADASTROS (indexadores e feriados dos arquivos em static) e MEMORY_INDICES_SINTETICOS
+    (índices sintéticos desde a última referência de cada indexador até a data atual).
+    """
+    limpar()
+    if app.config.get('MEMORY_CARGA_CADASTROS', True):
+        carregar_indexadores()
+        carregar_feriados()
+        if app.config.get('MEMORY_INDICES_SINTETICOS', True):
+            gerar_indices_sinteticos()
+
+def get_client():
+    return None
+
+def get_estatisticas():
+    """Retorna as métricas do processo: quantidade de entidades em memória e latência das operações.
+    """
+    estatisticas = metricas.to_dict()
+    with _lock:
+        estatisticas['qtdEntidades'] = dict((kind.value, len(entidades)) for kind, entidades in _entidades.items())
+    return estatisticas
+
+def limpar():
+    """Descarta todas as entidades em memória.
+    """
+    with _lock:
+        for kind in TipoEntidade:
+            _entidades[kind].clear()
+        for grupos in _ordenacao.values():
+            grupos.clear()
+
+def list_indexadores(dt_referencia :datetime.date=None, tipo_atualizacao: str=None):
+    with metricas.medir('list_indexadores'), _lock:
+        indexadores = builtin_list(_entidades[TipoEntidade.INDEXADORES].values())
+    # Inclui filtros da consulta caso passados
+    if dt_referencia is not None:
+        ordinal = dt_referencia.toordinal()
+        indexadores = [indexador for indexador in indexadores
+                       if indexador['dt_ult_referencia'] is not None and indexador['dt_ult_referencia'].toordinal() < ordinal]
+    if tipo_atualizacao is not None:
+        indexadores = [indexador for indexador in indexadores if indexador['tipo_atualizacao'] == tipo_atualizacao]
+    indexadores.sort(key=lambda indexador: -1 if indexador['dt_ult_referencia'] is None else indexador['dt_ult_referencia'].toordinal())
+    return builtin_list(map(dict, indexadores))
+
+def list_indices(indexador :str, dataInicial :datetime.date, dataFinal : datetime.date):
+    with metricas.medir('list_indices'):
+        return _consultar_periodo(TipoEntidade.INDICES, indexador, dataInicial, dataFinal)
+
+def list_feriados(dataInicial :datetime.date, dataFinal : datetime.date):
+    with metricas.medir('list_feriados'):
+        return _consultar_periodo(TipoEntidade.FERIADOS, None, dataInicial, dataFinal)
+
+def read(kind: TipoEntidade, id: str):
+    with metricas.medir('read'), _lock:
+        entidade = _entidades[kind].get(id)
+    return dict(entidade) if entidade is not None else None
+
+def update(kind: TipoEntidade, data: dict, id: str = None):
+    update_multi(kind, [data])
+    return
+
+create = update
+
+def delete(kind: TipoEntidade, id: str):
+    with metricas.medir('delete'), _lock:
+        entidade = _entidades[kind].pop(id, None)
+        if entidade is not None and kind in ORDENACAO:
+            _remover_ordenacao(kind, entidade)
+    return id
+
+def update_multi(kind: TipoEntidade, lista: list):
+    """Inclui/atualiza as entidades em lote mantendo a ordenação por data das entidades consultadas por período.
+    """
+    entidades = builtin_list(map(lambda entidade: to_memory(kind, entidade), lista))
+    with metricas.medir('update_multi'), _lock:
+        for entidade in entidades:
+            anterior = _entidades[kind].get(entidade['id'])
+            _entidades[kind][entidade['id']] = entidade
+            if kind in ORDENACAO:
+                if anterior is not None:
+                    _remover_ordenacao(kind, anterior)
+                _incluir_ordenacao(kind, entidade)
+    return
+
+#######################################################################################################
+# Carga inicial do banco de dados em memória
+#######################################################################################################
+
+def carregar_indexadores(arquivo: str = ARQUIVO_INDEXADORES):
+    """Inclui os indexadores do arquivo JSON da carga inicial (ver GestaoCadastro.put_indexadores).
+    """
+    with open(arquivo, encoding='UTF8') as f:
+        indexadores = json.load(f)
+    for indexador in indexadores:
+        for atributo in ('dt_ult_referencia', 'dth_ult_atualiz'):
+            if indexador.get(atributo):
+                indexador[atributo] = datetime.strptime(indexador[atributo], '%d/%m/%Y')
+    update_multi(TipoEntidade.INDEXADORES, indexadores)
+    return len(indexadores)
+
+def carregar_feriados(arquivo: str = ARQUIVO_FERIADOS):
+    """Inclui os feriados bancários do arquivo CSV da carga inicial (ver GestaoCadastro.put_feriados).
+    """
+    feriados = []
+    with open(arquivo, encoding='cp1252') as f:
+        for linha in csv.reader(f, delimiter=';'):
+            dtFeriado = datetime.strptime(linha[0], '%d/%m/%Y').date()
+            feriados.append({'id': int(dtFeriado.strftime('%Y%m%d')), 'dt_feriado': dtFeriado, 'descricao': linha[2]})
+    update_multi(TipoEntidade.FERIADOS, feriados)
+    return len(feriados)
+
+def gerar_indices_sinteticos(dataFinal: datetime.date = None, semente: int = SEMENTE_INDICES):
+    """Gera índices sintéticos e determinísticos para cada indexador cadastrado, desde o dia seguinte à última
+    data de referência do indexador até a data final, atualizando o indexador (última referência e último índice).
+    Indexadores mensais recebem um índice no dia 01 de cada mês (entre -0,2% e 1,2%) e indexadores diários um
+    índice por dia útil (entre 0,007% e 0,07%, alterado a cada ~30 dias úteis, como o CDI).
+
+    Retorno:
+        Quantidade de índices gerados.
+    """
+    if dataFinal is None:
+        dataFinal = date.today()
+    with _lock:
+        feriados = set(feriado['dt_feriado'] for feriado in _entidades[TipoEntidade.FERIADOS].values())
+        indexadores = builtin_list(map(dict, _entidades[TipoEntidade.INDEXADORES].values()))
+    contador = 0
+    for indexador in indexadores:
+        gerador = random.Random('{0}-{1}'.format(semente, indexador['id']))
+        mensal = (indexador['periodicidade'] or '').lower() == 'mensal'
+        data = (indexador['dt_ult_referencia'] or date(2001, 1, 1)) + timedelta(days=1)
+        indices = []
+        valIndice = None
+        while data <= dataFinal:
+            if mensal:
+                if data.day == 1:
+                    valIndice = round(gerador.uniform(-0.2, 1.2), 2)
+                    indices.append({'id': '{0}-{1}'.format(indexador['id'], data.strftime('%Y%m%d')), 'tp_indice': indexador['id'],
+                                    'dt_referencia': data, 'val_indice': valIndice})
+            elif data.weekday() not in (5, 6) and data not in feriados:
+                if len(indices) % 30 == 0:
+                    valIndice = round(gerador.uniform(0.007, 0.07), 6)
+                indices.append({'id': '{0}-{1}'.format(indexador['id'], data.strftime('%Y%m%d')), 'tp_indice': indexador['id'],
+                                'dt_referencia': data, 'val_indice': valIndice})
+            data += timedelta(days=1)
+        if len(indices) > 0:
+            update_multi(TipoEntidade.INDICES, indices)
+            indexador.update({'dt_ult_referencia': indices[-1]['dt_referencia'], 'val_ultimo_indice': indices[-1]['val_indice'],
+                              'qtd_regs_ult_atualiz': len(indices), 'dth_ult_atualiz': datetime.now()})
+            update(TipoEntidade.INDEXADORES, indexador)
+            contador+= len(indices)
+    logger.info('Índices sintéticos gerados em memória. Qtd. índices: {}'.format(contador))
+    return contador
+
+#######################################################################################################
+# Funções auxiliares para tratamento dos dados armazenados em memória
+#######################################################################################################
+
+def _consultar_periodo(kind: TipoEntidade, grupo, dataInicial: datetime.date, dataFinal: datetime.date):
+    """Retorna cópias das entidades do grupo com data no período informado (inclusive) através de busca binária.
+    """
+    with _lock:
+        ordenacao = _ordenacao[kind].get(grupo)
+        if ordenacao is None:
+            return []
+        ordinais, ids = ordenacao
+        inicio = bisect_left(ordinais, dataInicial.toordinal())
+        fim = bisect_right(ordinais, dataFinal.toordinal(), inicio)
+        entidades = _entidades[kind]
+        return [dict(entidades[id]) for id in ids[inicio:fim]]
+
+def _chave_ordenacao(kind: TipoEntidade, entidade: dict):
+    atributoGrupo, atributoData = ORDENACAO[kind]
+    return (entidade[atributoGrupo] if atributoGrupo is not None else None), entidade[atributoData].toordinal()
+
+def _incluir_ordenacao(kind: TipoEntidade, entidade: dict):
+    grupo, ordinal = _chave_ordenacao(kind, entidade)
+    ordinais, ids = _ordenacao[kind].setdefault(grupo, ([], []))
+    # Inclusões em ordem cronológica (ex.: atualização de índices) apenas acrescentam ao final das listas
+    if len(ordinais) == 0 or ordinal >= ordinais[-1]:
+        ordinais.append(ordinal)
+        ids.append(entidade['id'])
+    else:
+        posicao = bisect_right(ordinais, ordinal)
+        ordinais.insert(posicao, ordinal)
+        ids.insert(posicao, entidade['id'])
+
+def _remover_ordenacao(kind: TipoEntidade, entidade: dict):
+    grupo, ordinal = _chave_ordenacao(kind, entidade)
+    ordinais, ids = _ordenacao[kind][grupo]
+    for posicao in range(bisect_left(ordinais, ordinal), bisect_right(ordinais, ordinal)):
+        if ids[posicao] == entidade['id']:
+            del ordinais[posicao]
+            del ids[posicao]
+            return
+
+# Tratamento de dados a serem consistidos no banco de dados
+def to_memory(kind: TipoEntidade, entidade):
+    """Converte uma entidade (dictionary ou objeto de negócio) no dictionary armazenado em memória com todos
+    os atributos da entidade (atributos não informados são armazenados como None).
+    """
+    if not isinstance(entidade, dict):
+        entidade = dict((atributo, entidade[atributo]) for atributo in entidade.keys())
+    desconhecidos = set(entidade.keys()) - set(ATRIBUTOS[kind])
+    if desconhecidos:
+        raise ValueError('Atributos não previstos na entidade {0}: {1}'.format(kind.value, sorted(desconhecidos)))
+    if entidade.get('id') is None:
+        raise ValueError('Entidade {0} sem id: {1}'.format(kind.value, entidade))
+    registro = {}
+    for atributo in ATRIBUTOS[kind]:
+        valor = entidade.get(atributo)
+        if valor is not None:
+            if atributo.startswith('dt_') and isinstance(valor, datetime):
+                valor = valor.date()
+            elif atributo.startswith('val_'):
+                valor = Decimal(float(valor))
+        registro[atributo] = valor
+    return registro
@@ -1,47 +1,219 @@
-# @app.route('/api/v1/resources/percursos', methods=['GET'])
-# def api_filter():
-#     query_parameters = request.args
-
-#     id = query_parameters.get('id')
-#     nome = query_parameters.get('published')
-#     descricao = query_parameters.get('author')
-
-#     query = "SELECT * FROM percursos WHERE"
-#     to_filter = []
-
-#     if id:
-#         query += ' id=? AND'
-#         to_filter.append(id)
-#     if nome:
-#         query += ' nome=? AND'
-#         to_filter.append(nome)
-#     if descricao:
-#         query += ' descricao=? AND'
-#         to_filter.append(descricao)
-#     if not (id or nome or descricao):
-#         return page_not_found(404)
-
-#     query = query[:-4] + ';'
-
-#     conn = sqlite3.connect('twt.db')
-#     conn.row_factory = dict_factory
-#     cur = conn.cursor()
-
-#     results = cur.execute(query, to_filter).fetchall()
-
-#     return jsonify(results)
-
-# @app.route('/api/v1/resources/percursos/all', methods=['GET'])
-# def api_all():
-#     conn = sqlite3.connect('twt.db')
-#     conn.row_factory = dict_factory
-#     cur = conn.cursor()
-#     all_books = cur.execute('SELECT * FROM percursos;').fetchall()
-
-#     return jsonify(all_books)
-
-# def dict_factory(cursor, row):
-#     d = {}
-#     for idx, col in enumerate(cursor.description):
-#         d[col[0]] = row[idx]
-#     return d
\ No newline at end of file
+# Importa o módulo do banco de dados SQLite
+import sqlite3
+# Importa classe para Enumeradores
+from enum import Enum
+# Importa módulo para tratamento de data/hora
+from datetime import datetime, date, timedelta
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa módulos para controle de concorrência
+import os
+import threading
+# Importa o módulo de métricas
+from utils.metricas import Metricas
+# Importa a instrumentação das requisições (tempo por etapa)
+from utils.instrumentacao import etapa
+
+builtin_list = list
+
+class TipoEntidade(Enum):
+    ''' Enum que define os tipos das entidades do banco de dados
+    '''
+    INDEXADORES = 'Indexadores'
+    INDICES = 'Indices'
+    FERIADOS = 'Feriados'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+	        lista.append(item.value)
+        lista.sort()
+        return lista
+
+# Colunas de cada entidade. Tipos armazenados de acordo com o prefixo do atributo:
+#   dt_  -> INTEGER com o ordinal da data (date.toordinal)
+#   dth_ -> INTEGER com os microssegundos desde 01/01/1970 (data/hora sem fuso horário)
+#   val_ -> REAL
+COLUNAS = {
+    TipoEntidade.INDEXADORES: (('id', 'TEXT PRIMARY KEY'), ('nome', 'TEXT'), ('dt_ult_referencia', 'INTEGER'),
+                               ('periodicidade', 'TEXT'), ('tipo_atualizacao', 'TEXT'), ('id_indexador_referenciado', 'TEXT'),
+                               ('serie', 'TEXT'), ('qtd_regs_ult_atualiz', 'INTEGER'), ('dth_ult_atualiz', 'INTEGER'),
+                               ('val_ultimo_indice', 'REAL')),
+    TipoEntidade.INDICES: (('id', 'TEXT PRIMARY KEY'), ('tp_indice', 'TEXT NOT NULL'), ('dt_referencia', 'INTEGER NOT NULL'),
+                           ('val_indice', 'REAL'), ('dth_inclusao', 'INTEGER')),
+    TipoEntidade.FERIADOS: (('id', 'INTEGER PRIMARY KEY'), ('dt_feriado', 'INTEGER NOT NULL'), ('descricao', 'TEXT')),
+}
+
+ESQUEMA = ['CREATE TABLE IF NOT EXISTS {0} ({1})'.format(kind.value, ', '.join('{0} {1}'.format(*coluna) for coluna in colunas))
+           for kind, colunas in COLUNAS.items()] + [
+    'CREATE INDEX IF NOT EXISTS ix_indices_tp_indice_dt_referencia ON Indices (tp_indice, dt_referencia)',
+    'CREATE INDEX IF NOT EXISTS ix_feriados_dt_feriado ON Feriados (dt_feriado)',
+    'CREATE INDEX IF NOT EXISTS ix_indexadores_tipo_atualizacao_dt_ult_referencia ON Indexadores (tipo_atualizacao, dt_ult_referencia)',
+]
+
+# Data/hora de referência para armazenamento dos campos data/hora
+EPOCA = datetime(1970, 1, 1)
+MICROSSEGUNDO = timedelta(microseconds=1)
+
+# Caminho do banco de dados (definido em init_app a partir de SQLITE_DATABASE)
+_caminho = None
+# Conexões por thread (sqlite3 não permite compartilhar conexões entre threads ou processos)
+_conexoes = threading.local()
+# SQLite admite um único escritor por vez: gravações concorrentes (ex.: lotes gravados em paralelo) são serializadas
+_lockGravacao = threading.Lock()
+# Métricas de abertura de conexões e de latência das operações no banco de dados
+metricas = Metricas('sqlite', etapa='consulta')
+
+def init_app(app):
+    global _caminho
+    _caminho = app.config.get('SQLITE_DATABASE', 'comparador.db')
+    conexao = get_client()
+    with conexao:
+        for comando in ESQUEMA:
+            conexao.execute(comando)
+
+def get_client():
+    """Retorna a conexão com o banco de dados da thread corrente, abrindo-a na primeira chamada.
+    Conexões em arquivo utilizam journal WAL, permitindo leituras concorrentes às gravações.
+    """
+    pid = os.getpid()
+    conexao = getattr(_conexoes, 'conexao', None)
+    if conexao is None or _conexoes.pid != pid:
+        with metricas.medir('abertura_conexao'):
+            conexao = sqlite3.connect(_caminho, uri=_caminho.startswith('file:'))
+            if _caminho != ':memory:' and 'mode=memory' not in _caminho:
+                conexao.execute('PRAGMA journal_mode=WAL')
+                conexao.execute('PRAGMA synchronous=NORMAL')
+        _conexoes.conexao = conexao
+        _conexoes.pid = pid
+        metricas.incrementar('qtdConexoesAbertas')
+    return conexao
+
+def get_estatisticas():
+    """Retorna as métricas do processo: quantidade de conexões abertas e latência das operações.
+    """
+    return metricas.to_dict()
+
+def list_indexadores(dt_referencia :datetime.date=None, tipo_atualizacao: str=None):
+    filtros = []
+    argumentos = []
+    # Inclui filtros da consulta caso passados
+    if dt_referencia is not None:
+        filtros.append('dt_ult_referencia < ?')
+        argumentos.append(dt_referencia.toordinal())
+    if tipo_atualizacao is not None:
+        filtros.append('tipo_atualizacao = ?')
+        argumentos.append(tipo_atualizacao)
+    comando = 'SELECT * FROM Indexadores'
+    if filtros:
+        comando += ' WHERE ' + ' AND '.join(filtros)
+    comando += ' ORDER BY dt_ult_referencia'
+    return _consultar('list_indexadores', TipoEntidade.INDEXADORES, comando, argumentos)
+
+def list_indices(indexador :str, dataInicial :datetime.date, dataFinal : datetime.date):
+    comando = 'SELECT * FROM Indices WHERE tp_indice = ? AND dt_referencia BETWEEN ? AND ? ORDER BY dt_referencia'
+    return _consultar('list_indices', TipoEntidade.INDICES, comando, (indexador, dataInicial.toordinal(), dataFinal.toordinal()))
+
+def list_feriados(dataInicial :datetime.date, dataFinal : datetime.date):
+    comando = 'SELECT * FROM Feriados WHERE dt_feriado BETWEEN ? AND ? ORDER BY dt_feriado'
+    return _consultar('list_feriados', TipoEntidade.FERIADOS, comando, (dataInicial.toordinal(), dataFinal.toordinal()))
+
+def read(kind: TipoEntidade, id: str):
+    comando = 'SELECT * FROM {} WHERE id = ?'.format(kind.value)
+    entidades = _consultar('read', kind, comando, (id,))
+    return entidades[0] if entidades else None
+
+def update(kind: TipoEntidade, data: dict, id: str = None):
+    update_multi(kind, [data])
+    return
+
+create = update
+
+def delete(kind: TipoEntidade, id: str):
+    conexao = get_client()
+    with _lockGravacao, metricas.medir('delete'), conexao:
+        conexao.execute('DELETE FROM {} WHERE id = ?'.format(kind.value), (id,))
+    return id
+
+def update_multi(kind: TipoEntidade, lista: list):
+    """Inclui/atualiza as entidades em lote (INSERT OR REPLACE via executemany em uma única transação).
+    """
+    colunas = [nome for nome, _ in COLUNAS[kind]]
+    comando = 'INSERT OR REPLACE INTO {0} ({1}) VALUES ({2})'.format(kind.value, ', '.join(colunas), ', '.join('?' * len(colunas)))
+    linhas = builtin_list(map(lambda entidade: to_sqlite(kind, entidade), lista))
+    conexao = get_client()
+    with _lockGravacao, metricas.medir('update_multi'), conexao:
+        conexao.executemany(comando, linhas)
+    return
+
+#######################################################################################################
+# Funções auxiliares para tratamento dos dados retornados do banco de dados ou a serem consistidos
+# no banco de dados
+#######################################################################################################
+
+def _consultar(operacao: str, kind: TipoEntidade, comando: str, argumentos):
+    with metricas.medir(operacao):
+        cursor = get_client().execute(comando, argumentos)
+        linhas = cursor.fetchall()
+    colunas = [descricao[0] for descricao in cursor.description]
+    with etapa('conversao'):
+        return builtin_list(map(lambda linha: from_sqlite(colunas, linha), linhas))
+
+def _conversor_leitura(coluna: str):
+    if coluna.startswith('dt_'):
+        return date.fromordinal
+    elif coluna.startswith('dth_'):
+        return lambda valor: EPOCA + valor * MICROSSEGUNDO
+    elif coluna.startswith('val_'):
+        return Decimal
+    return None
+
+def _conversor_gravacao(coluna: str):
+    if coluna.startswith('dt_'):
+        return lambda valor: valor.toordinal()
+    elif coluna.startswith('dth_'):
+        return lambda valor: (valor - EPOCA) // MICROSSEGUNDO
+    elif coluna.startswith('val_'):
+        return float
+    return None
+
+# Conversores por coluna (calculados uma única vez)
+_conversoresLeitura = {}
+_conversoresGravacao = {}
+for _colunas in COLUNAS.values():
+    for _coluna, _ in _colunas:
+        _conversoresLeitura[_coluna] = _conversor_leitura(_coluna)
+        _conversoresGravacao[_coluna] = _conversor_gravacao(_coluna)
+
+# Tratamento de dados recebidos do banco de dados para os padrões da api
+def from_sqlite(colunas: list, linha: tuple):
+    """Converte uma linha retornada do banco de dados no formato esperado (dictionary) com os tipos de
+    dados esperados pela API (mesmo formato do model_datastore).
+    """
+    entidade = {}
+    for coluna, valor in zip(colunas, linha):
+        conversor = _conversoresLeitura.get(coluna)
+        if valor is not None and conversor is not None:
+            valor = conversor(valor)
+        entidade[coluna] = valor
+    return entidade
+
+# Tratamento de dados a serem consistidos no banco de dados
+def to_sqlite(kind: TipoEntidade, entidade):
+    """Converte uma entidade (dictionary ou objeto de negócio) na tupla de valores das colunas da tabela.
+    Atributos não informados são gravados como NULL.
+    """
+    if not isinstance(entidade, dict):
+        entidade = dict((atributo, entidade[atributo]) for atributo in entidade.keys())
+    desconhecidos = set(entidade.keys()) - set(nome for nome, _ in COLUNAS[kind])
+    if desconhecidos:
+        raise ValueError('Atributos não previstos na entidade {0}: {1}'.format(kind.value, sorted(desconhecidos)))
+    valores = []
+    for coluna, _ in COLUNAS[kind]:
+        valor = entidade.get(coluna)
+        conversor = _conversoresGravacao[coluna]
+        if valor is not None and conversor is not None:
+            valor = conversor(valor)
+        valores.append(valor)
+    return tuple(valores)
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from model import model_datastore
+
+
+class ClienteFalso(object):
+    def __init__(self):
+        # Simula o custo de descoberta de credenciais/abertura de canal
+        time.sleep(0.01)
+
+
+def test_cliente_unico_por_processo(monkeypatch):
+    monkeypatch.setattr(model_datastore.datastore, 'Client', ClienteFalso)
+    monkeypatch.setattr(model_datastore, '_cliente', None)
+    model_datastore.metricas.reiniciar()
+
+    clientes = []
+    threads = [threading.Thread(target=lambda: clientes.append(model_datastore.get_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, clientes))) == 1
+    estatisticas = model_datastore.get_estatisticas()
+    assert estatisticas['contadores']['qtdClientesCriados'] == 1
+    assert estatisticas['operacoes']['criacao_cliente']['qtd'] == 1
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Flask
+
+from model import model_memory
+from model.model_memory import TipoEntidade
+from negocio.indice import Indice
+
+
+def _iniciar(**configuracao):
+    app = Flask(__name__)
+    app.config.update(configuracao)
+    model_memory.init_app(app)
+
+
+def test_indices_por_periodo():
+    _iniciar(MEMORY_CARGA_CADASTROS=False)
+    inclusao = datetime(2019, 1, 10, 8, 30, 15, 123456)
+    # Inclusão fora de ordem cronológica
+    indices = [Indice(tp_indice='cdi', dt_referencia=date(2019, 1, d), val_indice=0.02, dth_inclusao=inclusao) for d in (7, 2, 4, 3)]
+    indices.append(Indice(tp_indice='ipca', dt_referencia=date(2019, 1, 3), val_indice=0.3, dth_inclusao=inclusao))
+    model_memory.update_multi(TipoEntidade.INDICES, indices)
+    # Upsert de um índice existente
+    model_memory.update(TipoEntidade.INDICES, Indice(tp_indice='cdi', dt_referencia=date(2019, 1, 4), val_indice=0.03, dth_inclusao=inclusao))
+
+    lista = model_memory.list_indices('cdi', date(2019, 1, 3), date(2019, 1, 7))
+    assert [indice['dt_referencia'] for indice in lista] == [date(2019, 1, 3), date(2019, 1, 4), date(2019, 1, 7)]
+    assert lista[1]['val_indice'] == Decimal(0.03)
+    assert lista[0]['dth_inclusao'] == inclusao
+    # Entidades retornadas são cópias
+    lista[0]['val_indice'] = None
+    assert model_memory.read(TipoEntidade.INDICES, 'cdi-20190103')['val_indice'] == Decimal(0.02)
+
+    model_memory.delete(TipoEntidade.INDICES, 'cdi-20190104')
+    assert model_memory.read(TipoEntidade.INDICES, 'cdi-20190104') is None
+    assert len(model_memory.list_indices('cdi', date(2019, 1, 1), date(2019, 1, 31))) == 3
+    assert model_memory.list_indices('selic', date(2019, 1, 1), date(2019, 1, 31)) == []
+
+
+def test_carga_inicial_e_calculo_investimento(app_memoria):
+    app = app_memoria()
+    with app.app_context():
+        indexadores = model_memory.list_indexadores()
+        assert len(indexadores) == 8
+        assert all(indexador['dt_ult_referencia'] > date(2001, 1, 1) for indexador in indexadores)
+        assert model_memory.read(TipoEntidade.FERIADOS, 20011225)['dt_feriado'] == date(2001, 12, 25)
+        # Índices diários somente em dias úteis
+        datas = [indice['dt_referencia'] for indice in model_memory.list_indices('cdi', date(2001, 12, 20), date(2001, 12, 31))]
+        assert date(2001, 12, 25) not in datas and date(2001, 12, 22) not in datas and date(2001, 12, 24) in datas
+
+    client = app.test_client()
+    r = client.get('/api/investimento?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi'
+                   '&taxa=100&taxaPrefixada=0&dataInicial=2019-01-02&dataFinal=2020-01-02')
+    assert r.status_code == 200
+    assert r.get_json()['body']['resultadoInvestimento']['qtdDiasUteis'] == 254
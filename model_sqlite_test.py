@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Flask
+
+from model import model_sqlite
+from model.model_sqlite import TipoEntidade
+from negocio.indice import Indice
+
+
+def _iniciar(tmpdir):
+    app = Flask(__name__)
+    app.config['SQLITE_DATABASE'] = str(tmpdir.join('teste.db'))
+    model_sqlite._conexoes.__dict__.clear()
+    model_sqlite.init_app(app)
+
+
+def test_indices_por_periodo(tmpdir):
+    _iniciar(tmpdir)
+    inclusao = datetime(2019, 1, 10, 8, 30, 15, 123456)
+    indices = [Indice(tp_indice='cdi', dt_referencia=date(2019, 1, d), val_indice=0.02, dth_inclusao=inclusao) for d in (2, 3, 4, 7)]
+    indices.append(Indice(tp_indice='ipca', dt_referencia=date(2019, 1, 3), val_indice=0.3, dth_inclusao=inclusao))
+    model_sqlite.update_multi(TipoEntidade.INDICES, indices)
+    # Upsert de um índice existente
+    model_sqlite.update(TipoEntidade.INDICES, Indice(tp_indice='cdi', dt_referencia=date(2019, 1, 4), val_indice=0.03, dth_inclusao=inclusao))
+
+    lista = model_sqlite.list_indices('cdi', date(2019, 1, 3), date(2019, 1, 7))
+    assert [indice['dt_referencia'] for indice in lista] == [date(2019, 1, 3), date(2019, 1, 4), date(2019, 1, 7)]
+    assert lista[1]['val_indice'] == Decimal(0.03)
+    assert lista[0]['dth_inclusao'] == inclusao
+    assert model_sqlite.read(TipoEntidade.INDICES, 'ipca-20190103')['tp_indice'] == 'ipca'
+
+    model_sqlite.delete(TipoEntidade.INDICES, 'ipca-20190103')
+    assert model_sqlite.read(TipoEntidade.INDICES, 'ipca-20190103') is None
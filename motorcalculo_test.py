@@ -0,0 +1,54 @@
+from decimal import Decimal, getcontext, localcontext, ROUND_HALF_EVEN
+
+from benchmarks.benchmark_motorcalculo import gerar_serie
+from negocio.motorcalculo import MotorCalculo
+
+
+def test_vetorizado_reproduz_iterativo():
+    datas, indices = gerar_serie(1260)
+    for taxa, taxaPrefixadaDiaria in ((Decimal(100), Decimal(0)), (Decimal(135), Decimal('0.0235'))):
+        iterativo = MotorCalculo.compor('iterativo', Decimal(1000), datas, indices, taxa, taxaPrefixadaDiaria)
+        vetorizado = MotorCalculo.compor('vetorizado', Decimal(1000), datas, indices, taxa, taxaPrefixadaDiaria, True)
+        assert vetorizado == iterativo
+
+
+def test_vetorizado_sem_arredondamento():
+    datas, indices = gerar_serie(252)
+    saldo, evolucao = MotorCalculo.compor('vetorizado', Decimal(1000), datas, indices, Decimal(100), Decimal(0), False)
+    saldoIterativo, _ = MotorCalculo.compor('iterativo', Decimal(1000), datas, indices, Decimal(100), Decimal(0))
+    assert len(evolucao) == len(datas)
+    assert evolucao[-1]['dtReferencia'] == datas[-1]
+    assert abs(saldo - saldoIterativo) < Decimal('0.5')
+
+
+def test_detalhe_mensal_e_none():
+    datas, indices = gerar_serie(300)
+    for motor, arredondamentoDiario in (('iterativo', True), ('vetorizado', True), ('vetorizado', False)):
+        saldo, diario = MotorCalculo.compor(motor, Decimal(1000), datas, indices, Decimal(100), Decimal(0), arredondamentoDiario, 'diario')
+        saldoMensal, mensal = MotorCalculo.compor(motor, Decimal(1000), datas, indices, Decimal(100), Decimal(0), arredondamentoDiario, 'mensal')
+        saldoNone, nenhum = MotorCalculo.compor(motor, Decimal(1000), datas, indices, Decimal(100), Decimal(0), arredondamentoDiario, 'none')
+        assert saldo == saldoMensal == saldoNone
+        assert nenhum == []
+        # Último dia útil de cada mês
+        assert mensal == [linha for posicao, linha in enumerate(diario) if posicao == len(diario) - 1 or diario[posicao + 1]['dtReferencia'].month != linha['dtReferencia'].month]
+
+
+def test_gerar_transmite_evolucao_e_retorna_saldo():
+    datas, indices = gerar_serie(300)
+    for motor in ('iterativo', 'vetorizado'):
+        saldo, evolucao = MotorCalculo.compor(motor, Decimal(1000), datas, indices, Decimal(100), Decimal(0), True, 'diario')
+        transmitida = []
+        assert MotorCalculo.consumir(MotorCalculo.gerar(motor, Decimal(1000), datas, indices, Decimal(100), Decimal(0), True, 'diario'), transmitida.append) == saldo
+        assert transmitida == evolucao
+
+
+def test_independente_do_contexto_da_thread():
+    datas, indices = gerar_serie(252)
+    esperado = MotorCalculo.compor('iterativo', Decimal(1000), datas, indices, Decimal(120), Decimal('0.0235'), True, 'diario')
+    with localcontext() as contexto:
+        contexto.prec = 28
+        contexto.rounding = ROUND_HALF_EVEN
+        for motor in ('iterativo', 'vetorizado'):
+            assert MotorCalculo.compor(motor, Decimal(1000), datas, indices, Decimal(120), Decimal('0.0235'), True, 'diario') == esperado
+        # O contexto da thread não é alterado pelos motores de cálculo
+        assert (getcontext().prec, getcontext().rounding) == (28, ROUND_HALF_EVEN)
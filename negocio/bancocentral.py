@@ -4,6 +4,8 @@ from decimal import Decimal, getcontext
 from datetime import datetime
 # Importando classes para tratamento de Json e requests HTTP
 import json, requests
+# Importanto web framework Flask
+from flask import current_app
 # Importa o módulo Helper
 import utils.helper
 from utils.helper import _is_number
@@ -19,6 +21,11 @@ from negocio.baseobject import BaseObject
 logger = logging.getLogger('Classe BancoCentral')
 logger.setLevel(logging.INFO)
 
+# Padrão de consulta da API (pode ser substituído através da configuração BCB_API_URL, ex.: servidor local para testes)
+URL_API = 'http://api.bcb.gov.br/dados/serie/bcdata.sgs.{0}/dados?formato=json&dataInicial={1}&dataFinal={2}'
+# Tempo máximo (em segundos) de espera pela resposta da API
+TIMEOUT_API = 30
+
 class BancoCentral(BaseObject):
     """Classe que representa a entidade Banco Central e dispobiliza os métodos para consulta de índices via APIs do Banco Central.
     """
@@ -66,10 +73,11 @@ class BancoCentral(BaseObject):
             dataInicial = datetime.strftime(dataInicial, "%d/%m/%Y")
             dataFinal = datetime.strftime(dataFinal, "%d/%m/%Y")
             # Montando a API
-            urlAPI = 'http://api.bcb.gov.br/dados/serie/bcdata.sgs.{0}/dados?formato=json&dataInicial={1}&dataFinal={2}'.format(serie,dataInicial,dataFinal)
+            urlAPI, timeout = self._configuracao_api()
+            urlAPI = urlAPI.format(serie,dataInicial,dataFinal)
             logger.info('Chamada à API de índices: {}'.format(urlAPI))   
             # Chamando e obtendo a resposta da API
-            response = requests.get(urlAPI)
+            response = requests.get(urlAPI, timeout=timeout)
             # Validando o retorno
             if response.status_code == 200:
                 logger.info('Retorno da API de índices: {}'.format(response.json()))
@@ -87,4 +95,13 @@ class BancoCentral(BaseObject):
             raise ServerException(e)
         else:
             # Retorna JSON dos índices recuperados da API
-            return indices
\ No newline at end of file
+            return indices
+
+    def _configuracao_api(self):
+        """Retorna o padrão de URL e o timeout da API do Banco Central definidos na configuração da aplicação
+        (BCB_API_URL e BCB_API_TIMEOUT) ou os valores padrão quando fora de um contexto de aplicação Flask.
+        """
+        try:
+            return current_app.config.get('BCB_API_URL', URL_API), current_app.config.get('BCB_API_TIMEOUT', TIMEOUT_API)
+        except RuntimeError:
+            return URL_API, TIMEOUT_API
@@ -6,18 +6,37 @@ def jsonDefault(OrderedDict):
 
 class BaseObject(object):
     """Classe base com alguns métodos padrão para dar suporte as integrações com o banco de dados.
+    Subclasses podem declarar __slots__ com os seus atributos (ex.: Indice, mantido em grande quantidade
+    em memória) dispensando o dictionary de cada instância; os métodos abaixo atendem os dois casos.
     """
+    __slots__ = ()
+
     def __init__(self,*args,**kwargs):
        pass
-    
+
     # Datastore chama essa função pra buscar o conteúdo do argumento
     def __getitem__(self, key):
-        return self.__dict__[key]
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
 
-    # Datastore utiliza essa função para retornar a lista de chaves (keys) que se referem 
+    # Datastore utiliza essa função para retornar a lista de chaves (keys) que se referem
     # a cada atributo da classe
     def keys(self):
-        return self.__dict__.keys()
+        try:
+            return self.__dict__.keys()
+        except AttributeError:
+            return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def to_dict(self):
+        """Retorna os atributos do objeto em um dictionary. Objetos sem __slots__ retornam o próprio
+        __dict__ (sem cópia), que não deve ser alterado.
+        """
+        try:
+            return self.__dict__
+        except AttributeError:
+            return dict((key, getattr(self, key)) for key in self.__slots__ if hasattr(self, key))
 
     # Método para facilitar a serialização da classe em formato JSON
     @classmethod
@@ -28,7 +47,7 @@ class BaseObject(object):
             self = object.__new__(cls)
             # self._hashcode = -1
             for key in dados.keys():
-                self.__dict__[key] = dados[key]
+                setattr(self, key, dados[key])
             return self
         except Exception:
-            raise ValueError('Formato inválido de dados de entrada: {}'.format(dados))
\ No newline at end of file
+            raise ValueError('Formato inválido de dados de entrada: {}'.format(dados))
@@ -1,11 +1,15 @@
 # Importanto módulo para tratamento de números decimais
 from decimal import Decimal, getcontext
 # Importa módulo para tratamento de data/hora
-from datetime import datetime, timedelta
+from datetime import datetime, date
+# Importa módulo para controle de concorrência
+import threading
+# Importa módulos para arrays compactos
+from array import array
 # Importa o módulo de log
 import logging
-# Importa o módulo responsável por selecionar o banco de dados conforme configuração no pacote model
-from model import get_model
+# Importa os feriados mantidos em memória (carregados do banco de dados uma única vez, origem do calendário)
+from model import cache_feriados
 # Importa a classe base
 from negocio.baseobject import BaseObject
 from negocio.feriado import Feriado
@@ -17,20 +21,140 @@ logger.setLevel(logging.INFO)
 class Calendario(BaseObject):
     """Classe que representa um Calendario.
     """
+    # Período coberto pelo calendário de dias úteis em memória
+    DATA_INICIAL = datetime(2001, 1, 1).date()
+    DATA_FINAL = datetime(2078, 12, 31).date()
+
+    # Calendário em memória montado a partir dos feriados mantidos em memória (ver model.cache_feriados), 
+    # substituído por inteiro quando os feriados são recarregados. Tupla contendo:
+    #   repositorio: repositório de feriados a partir do qual o calendário foi montado
+    #   bitmapDiasUteis: um byte por dia do período (1 = dia útil)
+    #   acumuladoDiasUteis: qtd. de dias úteis anteriores a cada dia do período (tamanho = qtd. dias + 1)
+    #   ordinaisDiasUteis: ordinais (date.toordinal) dos dias úteis em ordem crescente
+    _calendario = None
+    _lock = threading.Lock()
+
     # Método criador
     def __init__(self):
         return None
-    
+
     @classmethod
-    def listDiasUteis(cls, dataInicial:datetime.date, dataFinal:datetime.date):
-        """Lista os dias úteis referente ao período solicitado.
+    def carregarCalendario(cls):
+        """Retorna o calendário de dias úteis em memória, montando-o a partir dos feriados mantidos em memória 
+        (ver model.cache_feriados). O calendário é remontado somente quando os feriados são recarregados 
+        (ex.: após put_feriados), portanto ambos são sempre consistentes.
+
+        Retorno:
+            Tupla (repositorio, bitmapDiasUteis, acumuladoDiasUteis, ordinaisDiasUteis).
+        """
+        repositorio = cache_feriados.get_repositorio(consulta=True)
+        calendario = cls._calendario
+        if calendario is not None and calendario[0] is repositorio:
+            return calendario
+        with cls._lock:
+            calendario = cls._calendario
+            if calendario is not None and calendario[0] is repositorio:
+                return calendario
+            ordinalInicial = cls.DATA_INICIAL.toordinal()
+            qtdDias = cls.DATA_FINAL.toordinal() - ordinalInicial + 1
+            # Marca os dias de semana como úteis (sábado (5) e domingo (6) não são dias úteis)
+            bitmap = bytearray(qtdDias)
+            for posicao in range(qtdDias):
+                if (ordinalInicial + posicao) % 7 not in (6, 0):
+                    bitmap[posicao] = 1
+            # Desmarca os feriados
+            for feriado in repositorio.fatia(cls.DATA_INICIAL, cls.DATA_FINAL):
+                bitmap[feriado['dt_feriado'].toordinal() - ordinalInicial] = 0
+            # Monta a contagem acumulada e a lista ordenada de dias úteis
+            acumulado = array('l', [0]) * (qtdDias + 1)
+            ordinais = array('l')
+            for posicao in range(qtdDias):
+                acumulado[posicao + 1] = acumulado[posicao] + bitmap[posicao]
+                if bitmap[posicao]:
+                    ordinais.append(ordinalInicial + posicao)
+            logger.info("Calendário de dias úteis carregado em memória. Qtd. dias úteis: {}".format(len(ordinais)))
+            cls._calendario = calendario = (repositorio, bitmap, acumulado, ordinais)
+            return calendario
+
+    @classmethod
+    def _posicao(cls, data: datetime.date, argumento: str):
+        """Retorna a posição da data no calendário em memória validando o tipo e o período coberto.
+        """
+        if not type(data).__name__ == 'date':
+            raise TypeError('Calendario: argumento {} deve ser do tipo datetime.date'.format(argumento))
+        elif data < cls.DATA_INICIAL or data > cls.DATA_FINAL:
+            raise ValueError('Calendario: argumento {0} fora do período coberto pelo calendário ({1} a {2})'.format(argumento, cls.DATA_INICIAL, cls.DATA_FINAL))
+        return data.toordinal() - cls.DATA_INICIAL.toordinal()
+
+    @classmethod
+    def isDiaUtil(cls, data: datetime.date):
+        """Indica se a data informada é um dia útil. Complexidade O(1), sem acesso ao banco de dados.
+        """
+        posicao = cls._posicao(data, 'data')
+        _, bitmapDiasUteis, _, _ = cls.carregarCalendario()
+        return bitmapDiasUteis[posicao] == 1
+
+    @classmethod
+    def contarDiasUteis(cls, dataInicial: datetime.date, dataFinal: datetime.date):
+        """Retorna a quantidade de dias úteis entre as datas informadas (inclusive).
+        Complexidade O(1), sem acesso ao banco de dados.
+        """
+        posicaoInicial = cls._posicao(dataInicial, 'dataInicial')
+        posicaoFinal = cls._posicao(dataFinal, 'dataFinal')
+        if posicaoFinal < posicaoInicial:
+            raise ValueError("Data final do período deve ser maior ou igual à data inicial.")
+        _, _, acumuladoDiasUteis, _ = cls.carregarCalendario()
+        return acumuladoDiasUteis[posicaoFinal + 1] - acumuladoDiasUteis[posicaoInicial]
+
+    @classmethod
+    def diasUteisEntre(cls, dataInicial: datetime.date, dataFinal: datetime.date):
+        """Lista os dias úteis entre as datas informadas (inclusive) a partir do calendário em memória,
+        sem acesso ao banco de dados.
 
         Argumentos: 
             - dataInicial: data inicial do período
             - dataFinal: data final do período
         Retorno:
-            - Lista com itens no formato dict contendo os dias úteis do período solicitado. 
-            Ex. retorno: [{"data": datetime.date(2019, 4, 30)}, {"data": datetime.date(2019, 5, 2)}, ... ]
+            - Lista de datas (datetime.date) dos dias úteis do período solicitado. 
+        """
+        posicaoInicial = cls._posicao(dataInicial, 'dataInicial')
+        posicaoFinal = cls._posicao(dataFinal, 'dataFinal')
+        if posicaoFinal < posicaoInicial:
+            raise ValueError("Data final do período deve ser maior ou igual à data inicial.")
+        _, _, acumuladoDiasUteis, ordinaisDiasUteis = cls.carregarCalendario()
+        inicio = acumuladoDiasUteis[posicaoInicial]
+        fim = acumuladoDiasUteis[posicaoFinal + 1]
+        return list(map(date.fromordinal, ordinaisDiasUteis[inicio:fim]))
+
+    @classmethod
+    def adicionarDiasUteis(cls, data: datetime.date, qtdDiasUteis: int):
+        """Retorna o N-ésimo dia útil posterior à data informada. Complexidade O(1), sem acesso ao banco de dados.
+
+        Argumentos: 
+            - data: data de referência (não precisa ser dia útil)
+            - qtdDiasUteis: quantidade de dias úteis a avançar (maior ou igual a 1)
+        Retorno:
+            - Data (datetime.date) do dia útil correspondente.
+        """
+        if qtdDiasUteis < 1:
+            raise ValueError("Quantidade de dias úteis deve ser maior ou igual a 1.")
+        posicao = cls._posicao(data, 'data')
+        _, _, acumuladoDiasUteis, ordinaisDiasUteis = cls.carregarCalendario()
+        indice = acumuladoDiasUteis[posicao + 1] + qtdDiasUteis - 1
+        if indice >= len(ordinaisDiasUteis):
+            raise ValueError('Calendario: dia útil solicitado fora do período coberto pelo calendário ({0} a {1})'.format(cls.DATA_INICIAL, cls.DATA_FINAL))
+        return date.fromordinal(ordinaisDiasUteis[indice])
+    
+    @classmethod
+    def listDiasUteis(cls, dataInicial:datetime.date, dataFinal:datetime.date):
+        """Lista os dias úteis referente ao período solicitado a partir do calendário em memória (ver diasUteisEntre).
+
+        Argumentos: 
+            - dataInicial: data inicial do período (a partir de DATA_INICIAL)
+            - dataFinal: data final do período (até DATA_FINAL)
+        Retorno:
+            - Lista de datas (datetime.date) dos dias úteis do período solicitado. 
+            Ex. retorno: [datetime.date(2019, 4, 30), datetime.date(2019, 5, 2), ... ]
         """
         if not type(dataInicial).__name__ == 'date':
             raise TypeError('listDiasUteis: argumento dataInicial deve ser do tipo datetime.date')
@@ -38,27 +162,5 @@ class Calendario(BaseObject):
             raise TypeError('listDiasUteis: argumento dataFinal deve ser do tipo datetime.date')
         elif dataFinal < dataInicial:
             raise ValueError("Data final do período deve ser maior ou igual à data inicial.")
-        
-        # Obtém a lista de feriados do período solicitado
-        feriados = list(map(lambda e: e["dt_feriado"], get_model().list_feriados(dataInicial, dataFinal)))
-        # Define a variável que armazenará a lista de dias úteis do período solicitado
-        diasUteis = []
-
-        try:
-            data = dataInicial
-            while data <= dataFinal:
-                # Se dia da semana for sábado (5) ou domingo (6)
-                if (data.weekday() not in (5,6)) and (data not in feriados):
-                    diasUteis.append(data)
-                # Acrescenta 1 dia
-                data+= timedelta(days=1)
-
-        except Exception:
-            raise ValueError('Formato inválido de dados de entrada - dataInicial: {0}, dataFinal: {1}'.format(dataInicial, dataFinal))
-        
-        return diasUteis
-
-
-
-
 
+        return cls.diasUteisEntre(dataInicial, dataFinal)
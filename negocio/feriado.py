@@ -16,6 +16,8 @@ class Feriado(BaseObject):
         dt_feriado: data do feriado (formato datetime.date)
         descricao: nome do feriado
     """
+    __slots__ = ('id', 'dt_feriado', 'descricao')
+
     # Método criador
     def __init__(self, dt_feriado: datetime.date, descricao: str):
         # Define chave única para o índice
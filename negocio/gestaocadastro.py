@@ -1,11 +1,19 @@
 # Importanto módulo para tratamento de números decimais
-from decimal import Decimal, getcontext, ROUND_HALF_UP
+from decimal import Decimal, localcontext
 # Importa módulo para tratamento de data/hora
 from datetime import datetime
+# Importa módulos para execução concorrente e medição de tempo
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+# Importanto web framework Flask
+from flask import current_app
 # Importa módulo para operações com datas
 from dateutil.relativedelta import relativedelta
 # Importa o módulo responsável por selecionar o banco de dados conforme configuração no pacote model
 from model import get_model
+# Importa os caches em memória das séries de índices e dos feriados
+from model import cache_indices
+from model import cache_feriados
 # Importa módulo para tratamento de arquivos json
 import json
 # Importa módulo para tratamento de arquivos csv
@@ -25,11 +33,26 @@ from negocio.indice import Indice
 from negocio.indexador import Indexador, TipoIndexador, TipoAtualizacao
 from negocio.calendario import Calendario
 from negocio.feriado import Feriado
+from negocio.motorcalculo import CONTEXTO
 
 # Inicializa o objeto para gravação de logs
 logger = logging.getLogger('Classe GestaoCadastro')
 logger.setLevel(logging.INFO)
 
+# Quantidade máxima padrão de consultas simultâneas à API do Banco Central na atualização de índices
+ATUALIZACAO_MAX_CONCORRENCIA = 4
+# Quantidade padrão de índices por gravação em lote e de lotes gravados simultaneamente
+INGESTAO_TAMANHO_LOTE = 200
+INGESTAO_MAX_CONCORRENCIA = 4
+# Tamanho padrão (em meses) das janelas de consulta do backfill e tempo máximo (em segundos) de uma execução
+BACKFILL_JANELA_MESES = 12
+BACKFILL_TEMPO_MAXIMO = 480
+
+def _data(valor):
+    """Retorna a data (datetime.date) de um valor datetime.date ou datetime.datetime.
+    """
+    return valor.date() if isinstance(valor, datetime) else valor
+
 class GestaoCadastro(BaseObject):
     """Classe que gerencia os cadastros que dão suporte aos cálculos de investimento.
     """
@@ -75,6 +98,8 @@ class GestaoCadastro(BaseObject):
 
             # Loga os estado atual do indicador
             logger.info("Carga inicial de feriados. Qtd. feriados carregada: {}".format(contador))
+            # Descarta os feriados mantidos em memória (recarregados na próxima consulta)
+            cache_feriados.invalidar()
 
         return contador
 
@@ -87,8 +112,8 @@ class GestaoCadastro(BaseObject):
         Retorno:
             - lista de feriados referente ao período solicitado.
         """
-        # Obtém a lista de feriados do período solicitado
-        feriados = list(map(Feriado.fromDict, get_model().list_feriados(dataInicial, dataFinal)))
+        # Obtém a lista de feriados do período solicitado a partir dos feriados mantidos em memória
+        feriados = list(map(Feriado.fromDict, cache_feriados.list_feriados(dataInicial, dataFinal)))
 
         return feriados
 
@@ -169,43 +194,104 @@ class GestaoCadastro(BaseObject):
             raise ServerException(e)
 
     def put_indices(self, indexador: Indexador, indices: list):
-        """Inclui/atualiza índices em lote.
+        """Inclui/atualiza índices em lote (ver ingerir_indices).
+
+        Retorno:
+            Quantidade de índices incluídos/atualizados.
+        """
+        return self.ingerir_indices(indexador, indices)['qtdIndices']
+
+    def ingerir_indices(self, indexador: Indexador, indices: list, tamanhoLote: int = None, concorrencia: int = None, checkpointPorLote: bool = False):
+        """Inclui/atualiza índices em lote. Os índices são divididos em lotes gravados de forma concorrente e 
+        a data do último índice gravado é registrada no indexador (checkpoint para as próximas atualizações).
+
+        Argumentos:
+            indexador: indexador dos índices a serem gravados.
+            indices: lista de objetos Indice ordenada por data de referência (a lista não é alterada).
+            tamanhoLote: quantidade de índices por gravação no banco de dados (padrão: INGESTAO_TAMANHO_LOTE).
+            concorrencia: quantidade máxima de lotes gravados simultaneamente (padrão: INGESTAO_MAX_CONCORRENCIA).
+            checkpointPorLote: se verdadeiro atualiza o indexador após cada lote gravado (somente quando todos os 
+            lotes anteriores também foram gravados), permitindo retomar uma carga interrompida a partir do último 
+            lote gravado. Caso contrário o indexador é atualizado uma única vez ao final da carga. Em ambos os casos 
+            a série em memória (ver model.cache_indices) é atualizada uma única vez com os lotes contíguos gravados.
+        Retorno:
+            Dictionary com as estatísticas da carga. Ex.: {'qtdIndices': 5000, 'qtdLotes': 25, 'tamanhoLote': 200, 
+            'qtdGravacoesIndexador': 1, 'tempoTotal': 1.52, 'indicesPorSegundo': 3289.5}
         """
         if not isinstance(indexador, Indexador):
             raise TypeError('put_indices: argumento indexador deve ser do tipo Indexador')
         if not isinstance(indices, list):
             raise TypeError('put_indices: argumento indices deve ser do tipo list contendo objetos do tipo Indice')
+        if tamanhoLote is None:
+            tamanhoLote = current_app.config.get('INGESTAO_TAMANHO_LOTE', INGESTAO_TAMANHO_LOTE)
+        if concorrencia is None:
+            concorrencia = current_app.config.get('INGESTAO_MAX_CONCORRENCIA', INGESTAO_MAX_CONCORRENCIA)
         try:
-            
-            tipoEntidade = get_model().TipoEntidade.INDICES
-            contador = 0
-            while(len(indices) > 0):
-                # Limita em 200 a quantidade de índices a consistir
-                if len(indices) >= 200:
-                    qtd = 200
+            instanteInicial = time.perf_counter()
+            modelo = get_model()
+            tipoEntidade = modelo.TipoEntidade.INDICES
+            # Divide os índices em lotes (fatias da lista original)
+            lotes = [indices[posicao:posicao + tamanhoLote] for posicao in range(0, len(indices), tamanhoLote)]
+            qtdGravacoesIndexador = 0
+            # Quantidade de índices dos lotes contíguos gravados (desde o primeiro lote)
+            qtdGravados = 0
+
+            try:
+                if len(lotes) > 1 and concorrencia > 1:
+                    # As threads de gravação precisam do contexto da aplicação (configuração e banco de dados)
+                    app = current_app._get_current_object()
+                    with ThreadPoolExecutor(max_workers=min(concorrencia, len(lotes))) as executor:
+                        futuros = [executor.submit(self._gravar_lote_em_thread, app, modelo, tipoEntidade, lote) for lote in lotes]
+                        # Aguarda os lotes na ordem da série: o checkpoint avança somente sobre lotes contíguos gravados
+                        for futuro, lote in zip(futuros, lotes):
+                            futuro.result()
+                            qtdGravados+= len(lote)
+                            if checkpointPorLote:
+                                self._registrar_checkpoint(indexador, lote, len(lote))
+                                qtdGravacoesIndexador+= 1
                 else:
-                    qtd = len(indices)
-                indicesConsistir = indices[0:qtd]
-                # Inclui/atualiza índices em lote
-                get_model().update_multi(tipoEntidade, indicesConsistir)
-                # Atualiza contador de inserções
-                contador+= qtd
-                # Limpa índices consistidos
-                for i in range(qtd):
-                    ult_indice_removido = indices.pop(0)
-                # Atualiza a data do último índice armazenado na entidade do indexador correspondente 
-                # para controle de próximas atualizações
-                indexador.dt_ult_referencia = ult_indice_removido.dt_referencia
-                indexador.dth_ult_atualiz = datetime.now()
-                indexador.qtd_regs_ult_atualiz = qtd
-                indexador.val_ultimo_indice = ult_indice_removido.val_indice
-                self.put_indexador(indexador)
-            
-            return contador
+                    for lote in lotes:
+                        modelo.update_multi(tipoEntidade, lote)
+                        qtdGravados+= len(lote)
+                        if checkpointPorLote:
+                            self._registrar_checkpoint(indexador, lote, len(lote))
+                            qtdGravacoesIndexador+= 1
+            finally:
+                # Série em memória atualizada uma única vez (cada atualização copia a série, ver SerieIndices)
+                if qtdGravados > 0:
+                    cache_indices.atualizar(indexador.id, indices[:qtdGravados])
+
+            if len(lotes) > 0 and not checkpointPorLote:
+                self._registrar_checkpoint(indexador, indices, len(indices))
+                qtdGravacoesIndexador+= 1
+
+            tempoTotal = time.perf_counter() - instanteInicial
+            estatisticas = {'qtdIndices': len(indices), 'qtdLotes': len(lotes), 'tamanhoLote': tamanhoLote, 
+                            'qtdGravacoesIndexador': qtdGravacoesIndexador, 'tempoTotal': round(tempoTotal, 3), 
+                            'indicesPorSegundo': round(len(indices) / tempoTotal, 1) if tempoTotal > 0 else None}
+            if len(lotes) > 0:
+                logger.info('Índices gravados: {0}, estatísticas: {1}'.format(indexador.id, estatisticas))
+            return estatisticas
             
         except Exception as e:
             raise ServerException(e)
 
+    def _gravar_lote_em_thread(self, app, modelo, tipoEntidade, lote: list):
+        """Grava um lote de índices no contexto da aplicação (threads de gravação de ingerir_indices).
+        """
+        with app.app_context():
+            modelo.update_multi(tipoEntidade, lote)
+
+    def _registrar_checkpoint(self, indexador: Indexador, indices: list, qtd: int):
+        """Registra no indexador a data do último índice armazenado para controle de próximas atualizações.
+        """
+        ultimoIndice = indices[-1]
+        indexador.dt_ult_referencia = ultimoIndice.dt_referencia
+        indexador.dth_ult_atualiz = datetime.now()
+        indexador.qtd_regs_ult_atualiz = qtd
+        indexador.val_ultimo_indice = ultimoIndice.val_indice
+        self.put_indexador(indexador)
+
     def list_indices(self, indexador: str, dataInicial: datetime.date, dataFinal: datetime.date):
         """Retorna o indexador de acordo com o id solicitado
 
@@ -214,107 +300,334 @@ class GestaoCadastro(BaseObject):
             dataInicial: data inicial do período de índices a ser consultado.
             dataFinal: data final do período de índices a ser consultado.
         """
-        # Obtém os dados dos índices solicitados 
-        # Executa a consulta e armazena num dictionary 
-        indices = get_model().list_indices(indexador, dataInicial, dataFinal)
+        # Obtém os dados dos índices solicitados a partir da série do indexador mantida em memória
+        # (carregada do banco de dados na primeira consulta)
+        indices = cache_indices.list_indices(indexador, dataInicial, dataFinal)
 
         return indices
 
+    def get_serie_indices(self, indexador: str, versao=None):
+        """Retorna a série completa de índices do indexador mantida em memória (ver model.cache_indices).
+        Permite que vários cálculos compartilhem a mesma série sem novas consultas.
+
+        Argumentos:
+            indexador: código identificador do indexador. Ex.: ipca, cdi, poupanca.
+            versao: (opcional) versão do indexador (ver versao_indexador). A série é revalidada quando difere da 
+            versão da série em memória.
+        """
+        return cache_indices.get_serie(indexador.lower(), versao)
+
+    def versao_indexador(self, indexador: Indexador):
+        """Retorna a versão dos índices gravados de um indexador: data do último índice e data/hora da última 
+        atualização registradas pela carga de índices (ver _registrar_checkpoint) no banco de dados, 
+        compartilhado por todos os processos.
+        """
+        return (indexador.dt_ult_referencia, indexador.dth_ult_atualiz)
+
+    def fator_acumulado(self, indexador: str, dataInicial: datetime.date, dataFinal: datetime.date, taxa: Decimal = Decimal(100), exato: bool = False):
+        """Retorna o fator acumulado dos índices do indexador no período informado a partir da tabela de 
+        fatores acumulados mantida em memória (atualizada a cada inclusão de índices por atualizar_indices).
+
+        Argumentos:
+            indexador: código identificador do indexador. Ex.: ipca, cdi, poupanca.
+            dataInicial: data inicial do período (inclusive)
+            dataFinal: data final do período (inclusive)
+            taxa: percentual aplicado sobre o índice (ex.: 120 (120% do cdi)). Para 100% o resultado é exato e 
+            obtido em O(1), para demais taxas é aproximado em O(1) a partir da soma acumulada dos logaritmos
+            exato: para taxa diferente de 100% calcula o valor exato percorrendo os índices do período
+        Retorno:
+            Fator acumulado do período (float). Ex.: 1.0523 para rentabilidade bruta de 5,23%.
+        """
+        serie = self.get_serie_indices(indexador)
+        inicio, fim = serie.posicoes(dataInicial, dataFinal)
+        return serie.fator(inicio, fim, float(taxa), exato)
+
     def atualizar_indices(self):
         """Atualiza os índices dos indexadores cadastrados. Obtém os índices atualizados desde a 
         última data de referência importada da API do Banco Central.
+
+        As consultas à API do Banco Central são realizadas de forma concorrente (no máximo 
+        ATUALIZACAO_MAX_CONCORRENCIA consultas simultâneas) e os índices de cada indexador são gravados 
+        assim que a respectiva consulta é concluída, enquanto as demais consultas ainda estão em andamento.
+        Indexadores cuja última atualização é anterior a uma janela de BACKFILL_JANELA_MESES são atualizados 
+        em janelas (ver backfill_indexador) limitadas a BACKFILL_TEMPO_MAXIMO segundos.
+        Caso a atualização de algum indexador falhe os demais indexadores são atualizados normalmente e 
+        ao final é lançada uma ServerException (as próximas execuções retomam a partir da última data gravada).
+
+        Retorno:
+            Dictionary contendo a quantidade total de índices incluídos/atualizados (contador) e os tempos 
+            (em segundos) de cada indexador (tempos). Ex.: {'contador': 3, 'tempos': {'cdi': {'qtdIndices': 3, 
+            'tempoConsulta': 0.41, 'tempoGravacao': 0.05, 'tempoTotal': 0.46}}}
         """
         try:
+            instanteInicial = time.perf_counter()
             # Define a data para referência da consulta (utiliza fromisoformat para buscar data com hora/minuto/segundo 
             # zerados caso contrário datastore não reconhece)
             dataAtual = datetime.fromisoformat(datetime.now().date().isoformat())
             contador = 0
+            tempos = {}
+            erros = []
             
             # Obtém a lista de indexadores com tipo e atualizaçaõ AUTOMÁTICA 
             # cuja data de última atualização é anterior à data atual
             indexadores = self.get_indexadores(dataAtual, TipoAtualizacao.AUTOMATICA)
-            
-            # Percorre os indexadores para consulta e atualização
-            for indexador in indexadores:
-                # Loga os estado atual do indexador
-                logger.info('Indexador a receber atualização de índices: {}'.format(indexador))
-                # Caso o índicador seja de peridicidade mensal e o mês da última atualização é igual ao 
-                # mês atual pula para o próximo indexador
-                # if (periodicidade.lower() == 'mensal') and (datetime.strftime(dataAtual, "%Y%m") == datetime.strftime(dataUltReferencia, "%Y%m")):
-                #     # Pula para o próximo indexador
-                #     continue
-                # Recupera o índice diário referenciado em caso de índice Mensal
-                if (indexador.periodicidade.lower() == "mensal"):
-                    indexadorReferenciado = self.get_indexador(indexador.id_indexador_referenciado)
-                # Instancia a classe de negócios responsável pela consulta à API do Banco Central
-                objBC = BancoCentral()
-                # Recupera indices disponíveis do indexador desde a última atualização até hoje 
-                indicesBC = objBC.list_indices(indexador.serie, indexador.dt_ult_referencia, dataAtual)
-                # Inicializa coleção e contador de inserções/atualizações
-                indices = []
-                indicesDiarios = []
-                # Varre a lista de índices retornadas pela API
-                for indiceBC in indicesBC:
-                    logger.info('Índice a ser atualizado Banco Central: {0}, qtd: {1}, dados: {2}'.format(indexador.nome, len(indiceBC), indiceBC))
-                    # Recupera as propriedades do índice (data e valor)
-                    dataReferencia = indiceBC['data']
-                    valorIndice = float(indiceBC['valor'])
-                    # Verifica se data de referência do índice é anterior à data da última atualização 
-                    # e caso positivo pula para o próximo (API do BC retornar sempre um dia pra tras)]
-                    # if (dataReferencia.isocalendar() <= dataUltReferencia.isocalendar()):
-                    #     logger.info('Índice descartado por ser anterior a última atualização')
-                    #     continue      
-                    # Popula uma instancia de índice a ser consistida
-                    indice = Indice(tp_indice = indexador.id, dt_referencia = dataReferencia, val_indice = valorIndice, dth_inclusao = datetime.now())
-                    # Inclui o índice na coleção de índices a ser consistida em banco de dados
-                    indices.append(indice)
-                    if (indexador.periodicidade.lower() == "mensal"):
-                        # Calcula índices diários a partir do índice Mensal
-                        indicesDiarios+= self.calcular_indices_diarios(indexadorReferenciado, indice)
-                
-                # Inclui / Atualiza os índices mensais em lote
-                contador+= self.put_indices(indexador, indices)
-                if (indexador.periodicidade.lower() == "mensal"):
-                    # Inclui / Atualiza os índices diários em lote
-                    contador+= self.put_indices(indexadorReferenciado, indicesDiarios)
+            if len(indexadores) == 0:
+                return {'contador': contador, 'tempos': tempos}
+
+            # As threads de consulta precisam do contexto da aplicação (configuração e banco de dados)
+            app = current_app._get_current_object()
+            maxConcorrencia = current_app.config.get('ATUALIZACAO_MAX_CONCORRENCIA', ATUALIZACAO_MAX_CONCORRENCIA)
+            tamanhoJanelaMeses = current_app.config.get('BACKFILL_JANELA_MESES', BACKFILL_JANELA_MESES)
+            tempoMaximo = current_app.config.get('BACKFILL_TEMPO_MAXIMO', BACKFILL_TEMPO_MAXIMO)
+            with ThreadPoolExecutor(max_workers=min(maxConcorrencia, len(indexadores))) as executor:
+                # Dispara as consultas de todos os indexadores (indexadores desatualizados há mais de uma janela 
+                # são consultados e gravados janela a janela na própria thread)
+                futuros = {}
+                for indexador in indexadores:
+                    if _data(indexador.dt_ult_referencia) + relativedelta(months=tamanhoJanelaMeses) <= dataAtual.date():
+                        futuro = executor.submit(self._backfill_em_thread, app, indexador, dataAtual.date(), tamanhoJanelaMeses, tempoMaximo)
+                    else:
+                        futuro = executor.submit(self._consultar_indices_indexador, app, indexador, dataAtual)
+                    futuros[futuro] = indexador
+                # Grava os índices de cada indexador à medida que as consultas são concluídas
+                for futuro in as_completed(futuros):
+                    indexador = futuros[futuro]
+                    try:
+                        resultado = futuro.result()
+                        if isinstance(resultado, dict):
+                            # Backfill: índices já gravados janela a janela
+                            contador+= resultado['qtdIndices']
+                            tempos[indexador.id] = resultado
+                            continue
+                        indices, indexadorReferenciado, indicesDiarios, tempoConsulta = resultado
+                        instanteGravacao = time.perf_counter()
+                        # Inclui / Atualiza os índices do indexador em lote
+                        qtdIndices = self.put_indices(indexador, indices)
+                        if indexadorReferenciado is not None:
+                            # Inclui / Atualiza os índices diários calculados em lote
+                            qtdIndices+= self.put_indices(indexadorReferenciado, indicesDiarios)
+                        tempoGravacao = time.perf_counter() - instanteGravacao
+                    except Exception as e:
+                        logger.error('Erro na atualização dos índices do indexador {0}: {1}'.format(indexador.id, e))
+                        erros.append(indexador.id)
+                        tempos[indexador.id] = {'erro': str(e)}
+                        continue
+                    contador+= qtdIndices
+                    tempos[indexador.id] = {'qtdIndices': qtdIndices, 'tempoConsulta': round(tempoConsulta, 3), 
+                                            'tempoGravacao': round(tempoGravacao, 3), 'tempoTotal': round(tempoConsulta + tempoGravacao, 3)}
+                    logger.info('Indexador {0} atualizado: {1}'.format(indexador.id, tempos[indexador.id]))
+
+            if len(erros) > 0:
+                raise ServerException(mensagem='Falha na atualização dos índices dos indexadores: {0}. Tempos: {1}'.format(erros, tempos))
+            logger.info('Atualização de índices concluída em {0:.3f}s'.format(time.perf_counter() - instanteInicial))
 
-            return contador
+            return {'contador': contador, 'tempos': tempos}
 
         except BusinessException as be:
             raise be
+        except ServerException as se:
+            raise se
         except Exception as e:
             raise ServerException(e)
+
+    def _consultar_indices_indexador(self, app, indexador: Indexador, dataAtual: datetime):
+        """Consulta na API do Banco Central os índices do indexador desde a última atualização e prepara os 
+        índices a serem gravados (incluindo os índices diários calculados no caso de indexadores mensais).
+        Executado nas threads de consulta de atualizar_indices.
+
+        Retorno:
+            Tupla contendo a lista de índices do indexador, o indexador referenciado (ou None), a lista de 
+            índices diários calculados e o tempo (em segundos) de consulta.
+        """
+        with app.app_context():
+            instanteInicial = time.perf_counter()
+            # Loga os estado atual do indexador
+            logger.info('Indexador a receber atualização de índices: {}'.format(indexador))
+            # Recupera o índice diário referenciado em caso de índice Mensal
+            indexadorReferenciado = self._get_indexador_referenciado(indexador)
+            # Recupera indices disponíveis do indexador desde a última atualização até hoje 
+            indices, indicesDiarios = self._obter_indices_banco_central(indexador, indexadorReferenciado, indexador.dt_ult_referencia, dataAtual)
+
+            return indices, indexadorReferenciado, indicesDiarios, time.perf_counter() - instanteInicial
+
+    def _backfill_em_thread(self, app, indexador: Indexador, dataFinal: datetime.date, tamanhoJanelaMeses: int, tempoMaximo: float):
+        """Executa backfill_indexador no contexto da aplicação (threads de consulta de atualizar_indices).
+        """
+        with app.app_context():
+            instanteLimite = None if tempoMaximo is None else time.perf_counter() + tempoMaximo
+            return self.backfill_indexador(indexador, dataFinal, tamanhoJanelaMeses, instanteLimite)
+
+    def _get_indexador_referenciado(self, indexador: Indexador):
+        """Retorna o indexador diário referenciado por um indexador mensal (ou None para indexadores diários).
+        """
+        if (indexador.periodicidade.lower() == "mensal"):
+            return self.get_indexador(indexador.id_indexador_referenciado)
+        return None
+
+    def _obter_indices_banco_central(self, indexador: Indexador, indexadorReferenciado: Indexador, dataInicial: datetime.date, dataFinal: datetime.date):
+        """Consulta na API do Banco Central os índices do indexador no período informado e prepara os índices 
+        a serem gravados (incluindo os índices diários calculados no caso de indexadores mensais).
+
+        Retorno:
+            Tupla contendo a lista de índices do indexador e a lista de índices diários calculados.
+        """
+        # Instancia a classe de negócios responsável pela consulta à API do Banco Central
+        objBC = BancoCentral()
+        indicesBC = objBC.list_indices(indexador.serie, dataInicial, dataFinal)
+        # Inicializa coleção e contador de inserções/atualizações
+        indices = []
+        indicesDiarios = []
+        # Data/hora de inclusão compartilhada pelos índices da consulta
+        dthInclusao = datetime.now()
+        # Varre a lista de índices retornadas pela API
+        for indiceBC in indicesBC:
+            # Recupera as propriedades do índice (data e valor)
+            dataReferencia = indiceBC['data']
+            valorIndice = float(indiceBC['valor'])
+            # Popula uma instancia de índice a ser consistida
+            indice = Indice(tp_indice = indexador.id, dt_referencia = dataReferencia, val_indice = valorIndice, dth_inclusao = dthInclusao)
+            # Inclui o índice na coleção de índices a ser consistida em banco de dados
+            indices.append(indice)
+        if indexadorReferenciado is not None:
+            # Calcula em lote os índices diários a partir dos índices mensais
+            indicesDiarios = self.calcular_indices_diarios_lote(indexadorReferenciado, indices)
+        logger.info('Índices obtidos do Banco Central: {0}, período: {1} a {2}, qtd: {3}'.format(indexador.nome, dataInicial, dataFinal, len(indices)))
+
+        return indices, indicesDiarios
+
+    def backfill_indices(self, id: str = None, tamanhoJanelaMeses: int = None, tempoMaximo: float = None):
+        """Atualiza em janelas (ver backfill_indexador) os índices dos indexadores de atualização automática, 
+        um indexador por vez, até a data atual ou até esgotar o tempo máximo informado.
+
+        Argumentos:
+            id: código identificador do indexador a ser atualizado (quando não informado atualiza todos)
+            tamanhoJanelaMeses: tamanho (em meses) de cada janela consultada (padrão: BACKFILL_JANELA_MESES)
+            tempoMaximo: tempo máximo (em segundos) da execução, após o qual nenhuma nova janela é iniciada 
+            (padrão: BACKFILL_TEMPO_MAXIMO). A próxima execução retoma a partir do último checkpoint.
+        Retorno:
+            Dictionary contendo a quantidade de índices incluídos/atualizados (contador), se todos os indexadores 
+            foram atualizados até a data atual (concluido) e as estatísticas de cada indexador (indexadores).
+        """
+        if tamanhoJanelaMeses is None:
+            tamanhoJanelaMeses = current_app.config.get('BACKFILL_JANELA_MESES', BACKFILL_JANELA_MESES)
+        if tempoMaximo is None:
+            tempoMaximo = current_app.config.get('BACKFILL_TEMPO_MAXIMO', BACKFILL_TEMPO_MAXIMO)
+        instanteLimite = None if tempoMaximo is None else time.perf_counter() + tempoMaximo
+        dataAtual = datetime.now().date()
+
+        if id is not None:
+            dados = get_model().read(get_model().TipoEntidade.INDEXADORES, id.lower())
+            if dados is None:
+                mensagem = "Indexador [{0}] não cadastrado.".format(id.lower())
+                raise BusinessException('BE012', mensagem)
+            indexadores = [Indexador.fromDict(dados)]
+            if indexadores[0].tipo_atualizacao != TipoAtualizacao.AUTOMATICA.value:
+                mensagem = "Indexador [{0}] é calculado a partir do indexador [{1}], utilize o indexador de origem.".format(indexadores[0].id, indexadores[0].id_indexador_referenciado)
+                raise BusinessException('BE013', mensagem)
+        else:
+            indexadores = self.get_indexadores(datetime.fromisoformat(dataAtual.isoformat()), TipoAtualizacao.AUTOMATICA)
+
+        contador = 0
+        estatisticas = {}
+        for indexador in indexadores:
+            estatisticas[indexador.id] = self.backfill_indexador(indexador, dataAtual, tamanhoJanelaMeses, instanteLimite)
+            contador+= estatisticas[indexador.id]['qtdIndices']
+
+        return {'contador': contador, 'concluido': all(item['concluido'] for item in estatisticas.values()), 'indexadores': estatisticas}
+
+    def backfill_indexador(self, indexador: Indexador, dataFinal: datetime.date, tamanhoJanelaMeses: int = BACKFILL_JANELA_MESES, instanteLimite: float = None):
+        """Atualiza os índices do indexador desde a última data de referência até a data final em janelas de 
+        tamanho fixo. Cada janela é consultada na API do Banco Central e gravada antes da consulta da próxima 
+        (memória limitada aos índices de uma janela) e a data do último índice gravado é registrada no indexador 
+        ao final de cada janela (checkpoint). Uma execução interrompida (erro ou timeout da requisição) é retomada 
+        a partir do último checkpoint.
+
+        Argumentos:
+            indexador: indexador de atualização automática a ser atualizado
+            dataFinal: data final da atualização (normalmente a data atual)
+            tamanhoJanelaMeses: tamanho (em meses) de cada janela consultada
+            instanteLimite: instante (time.perf_counter) após o qual nenhuma nova janela é iniciada
+        Retorno:
+            Dictionary com as estatísticas do backfill. Ex.: {'qtdIndices': 5040, 'qtdJanelas': 20, 'concluido': True, 
+            'dtUltReferencia': date(2020, 12, 30), 'qtdConsultasFeriadosEvitadas': 240, 'tempoTotal': 12.3}. 
+            qtdConsultasFeriadosEvitadas: consultas de feriados do processo atendidas em memória durante o backfill 
+            (ex.: dias úteis de cada mês no cálculo dos índices diários, ver calcular_indices_diarios_lote)
+        """
+        instanteInicial = time.perf_counter()
+        qtdConsultasFeriadosEvitadas = cache_feriados.get_qtd_consultas_evitadas()
+        indexadorReferenciado = self._get_indexador_referenciado(indexador)
+        dataInicial = _data(indexador.dt_ult_referencia)
+        qtdIndices = 0
+        qtdJanelas = 0
+        while dataInicial <= dataFinal:
+            if instanteLimite is not None and time.perf_counter() >= instanteLimite:
+                logger.info('Backfill do indexador {0} interrompido por tempo em {1}'.format(indexador.id, dataInicial))
+                break
+            fimJanela = min(dataInicial + relativedelta(months=tamanhoJanelaMeses, days=-1), dataFinal)
+            indices, indicesDiarios = self._obter_indices_banco_central(indexador, indexadorReferenciado, dataInicial, fimJanela)
+            # Grava primeiro os índices diários calculados: o checkpoint que controla a retomada é o do indexador consultado
+            if len(indicesDiarios) > 0:
+                qtdIndices+= self.put_indices(indexadorReferenciado, indicesDiarios)
+            if len(indices) > 0:
+                qtdIndices+= self.put_indices(indexador, indices)
+            elif fimJanela < dataFinal:
+                # Janela sem índices (ex.: período anterior ao início da série): avança o checkpoint para não consultá-la novamente
+                indexador.dt_ult_referencia = fimJanela
+                indexador.dth_ult_atualiz = datetime.now()
+                indexador.qtd_regs_ult_atualiz = 0
+                self.put_indexador(indexador)
+            qtdJanelas+= 1
+            dataInicial = fimJanela + relativedelta(days=1)
+
+        estatisticas = {'qtdIndices': qtdIndices, 'qtdJanelas': qtdJanelas, 'concluido': dataInicial > dataFinal, 
+                        'dtUltReferencia': indexador.dt_ult_referencia, 
+                        'qtdConsultasFeriadosEvitadas': cache_feriados.get_qtd_consultas_evitadas() - qtdConsultasFeriadosEvitadas, 
+                        'tempoTotal': round(time.perf_counter() - instanteInicial, 3)}
+        logger.info('Backfill do indexador {0}: {1}'.format(indexador.id, estatisticas))
+        return estatisticas
                 
     def calcular_indices_diarios(self, indexadorDiario: Indexador, indiceMensal: Indice):
         """Atualiza os índices dos indexadores cujo tipo de atualização é calculada para periodicidade Diária 
         a partir dos índices de periodicidade Mensal. 
         """
+        return self.calcular_indices_diarios_lote(indexadorDiario, [indiceMensal])
+
+    def calcular_indices_diarios_lote(self, indexadorDiario: Indexador, indicesMensais: list):
+        """Calcula em uma única passagem os índices diários de uma série de índices mensais (ex.: ipca, igpm, 
+        poupanca) a partir do calendário de dias úteis em memória. A taxa diária equivalente de cada mês 
+        ((1 + mensal/100) ** (1/qtdDiasUteis) - 1) é calculada uma única vez por combinação de índice mensal e 
+        quantidade de dias úteis e aplicada a todos os dias úteis do mês.
+
+        Argumentos:
+            indexadorDiario: indexador diário calculado (ex.: ipca-diario)
+            indicesMensais: lista de índices mensais (dt_referencia no dia 01 de cada mês)
+        Retorno:
+            Lista de índices diários (Indice) dos dias úteis de cada mês, na ordem dos índices mensais.
+        """
         try:
-            # Define a precisão para 9 casas decimais
-            getcontext().prec = 9
-            getcontext().rounding = ROUND_HALF_UP
-            # Inicializa coleção e contador de inserções/atualizações
+            # Inicializa coleção de índices diários e taxas diárias já calculadas
             indices = []
-            # Define data inicial de pesquisa de dias úteis
-            dataInicial = indiceMensal.dt_referencia
-            # Define data final de pesquisa de dias úteis
-            dataFinal = dataInicial + relativedelta(day=31)
-            # Obtém a lista de dias úteis no mês
-            diasUteis = Calendario.listDiasUteis(dataInicial, dataFinal)
-            # Obtém a qtd de dias úteis no mês
-            qtdDiasUteis = Decimal(len(diasUteis))
-
-            for dataReferencia in diasUteis:
-                # Obtém o valor do índice diário partindo do indice mensal com base na qtd de dias úteis
-                valorIndice = ((Decimal(1)+(Decimal(indiceMensal.val_indice) / Decimal(100)))**(Decimal(1)/qtdDiasUteis)-1) * Decimal(100)
-                # logger.info('Índice Diário calculado: {0}, taxa Mensal: {1}, taxa Diária: {2}'.format(indexadorDiario.nome, indiceMensal.val_indice, valorIndice))
-                # Popula uma instancia de índice a ser consistida
-                indice = Indice(tp_indice = indexadorDiario.id, dt_referencia = dataReferencia, val_indice = float(valorIndice), dth_inclusao = datetime.now())
-                # Inclui o índice na coleção de índices a ser consistida em banco de dados
-                indices.append(indice)
-            
-            # Inclui / Atualiza os índices em lote
-            # self.put_indices(indexadorDiario, indices)
+            taxasDiarias = {}
+            # Data/hora de inclusão compartilhada pelos índices diários da série
+            dthInclusao = datetime.now()
+            # Cálculos no contexto dos cálculos financeiros (ver MotorCalculo)
+            with localcontext(CONTEXTO):
+                for indiceMensal in indicesMensais:
+                    # Obtém a lista de dias úteis do mês (calendário em memória)
+                    dataInicial = _data(indiceMensal.dt_referencia)
+                    diasUteis = Calendario.diasUteisEntre(dataInicial, dataInicial + relativedelta(day=31))
+                    if len(diasUteis) == 0:
+                        continue
+                    # Obtém o valor do índice diário partindo do índice mensal com base na qtd de dias úteis
+                    chave = (indiceMensal.val_indice, len(diasUteis))
+                    valorIndice = taxasDiarias.get(chave)
+                    if valorIndice is None:
+                        qtdDiasUteis = Decimal(len(diasUteis))
+                        valorIndice = float(((Decimal(1)+(Decimal(indiceMensal.val_indice) / Decimal(100)))**(Decimal(1)/qtdDiasUteis)-1) * Decimal(100))
+                        taxasDiarias[chave] = valorIndice
+                    # Popula as instâncias de índice a serem consistidas
+                    indices.extend(Indice(tp_indice = indexadorDiario.id, dt_referencia = dataReferencia, val_indice = valorIndice, dth_inclusao = dthInclusao)
+                                   for dataReferencia in diasUteis)
 
             return indices
 
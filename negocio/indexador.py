@@ -24,7 +24,11 @@ class Indexador(BaseObject):
         serie: Número da série histórica do indexador na API do Banco Central.
         qtd_regs_ult_atualiz: quantidade de índices incluida/atualizada na última atualização.
         dth_ult_atualiz: data/hora da da última atualização de índices na base de dados de índices (formato datetime)
+        val_ultimo_indice: valor do último índice importado
     """
+    __slots__ = ('id', 'nome', 'dt_ult_referencia', 'periodicidade', 'tipo_atualizacao', 'id_indexador_referenciado', 'serie',
+                 'qtd_regs_ult_atualiz', 'dth_ult_atualiz', 'val_ultimo_indice')
+
     # Método criador
     def __init__(self, id: str, nome: str, dt_ult_referencia: datetime.date, periodicidade: str, tipo_atualizacao: str, id_indexador_referenciado: str, serie: str, qtd_regs_ult_atualiz: int, dth_ult_atualiz: datetime, val_ultimo_indice: float = None):
         # Atualiza os atributos com os valores informados na instanciação da classe
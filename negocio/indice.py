@@ -1,7 +1,9 @@
 # Importanto módulo para tratamento de números decimais
-from decimal import Decimal, getcontext
+from decimal import Decimal
 # Importa módulo para tratamento de data/hora
 from datetime import datetime
+# Importa módulo para compartilhamento de strings repetidas (tipo de índice)
+import sys
 # Importa o módulo de log
 import logging
 # Importa a classe base
@@ -20,14 +22,17 @@ class Indice(BaseObject):
         val_indice: valor do índice em percentual. Ex.: 0.0123
         dth_inclusao: data/hora da inclusão do índice na base de dados de índices (formato datetime)
     """
+    # Atributos fixos sem dictionary por instância (backfills mantêm dezenas de milhares de índices em memória)
+    __slots__ = ('id', 'tp_indice', 'dt_referencia', 'val_indice', 'dth_inclusao')
+
     # Método criador
     def __init__(self, tp_indice: str, dt_referencia: datetime.date, val_indice: float, dth_inclusao: datetime):
-        # Define a precisão para 9 casas decimais
-        getcontext().prec = 9
-        # Define chave única para o índice
-        self.id = tp_indice.lower() + '-' + datetime.strftime(dt_referencia,"%Y%m%d")
+        # Tipo de índice compartilhado entre as instâncias do mesmo indexador
+        tp_indice = sys.intern(tp_indice.lower())
+        # Define chave única para o índice (tipo-AAAAMMDD)
+        self.id = '{0}-{1:04d}{2:02d}{3:02d}'.format(tp_indice, dt_referencia.year, dt_referencia.month, dt_referencia.day)
         # Atualiza os atributos com os valores informados na instanciação da classe
-        self.tp_indice = tp_indice.lower()
+        self.tp_indice = tp_indice
         self.dt_referencia = dt_referencia
         self.val_indice = val_indice
         self.dth_inclusao = dth_inclusao
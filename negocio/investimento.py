@@ -1,7 +1,7 @@
 # Importanto módulo para tratamento de números decimais
-from decimal import Decimal, getcontext, ROUND_HALF_UP
+from decimal import Decimal, DecimalException, localcontext
 # Importa módulo para tratamento de data/hora
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 # Importa o módulo responsável por selecionar o banco de dados conforme configuração no pacote model
 from model import get_model
 # Importa classe para Enumeradores
@@ -11,13 +11,28 @@ from negocio.baseobject import BaseObject
 from negocio.gestaocadastro import GestaoCadastro
 from negocio.indexador import TipoIndexador
 from negocio.calendario import Calendario
+from negocio.motorcalculo import MotorCalculo, TipoMotor, TipoDetalhe, CONTEXTO
+from negocio.projecao import Projecao, TipoModeloProjecao, JANELA_HISTORICA
+from negocio.tributacao import Tributacao
 # Import o módulo para cálculos matemáticos
 import math
+# Importa o módulo para cópia de objetos
+import copy
+# Importa módulos para cálculos vetorizados e medição de tempo
+import numpy
+import time
 # Importa o módulo Helper
 import utils.helper
 from utils.helper import _converter_datas_dict
 from utils.helper import BusinessException
 
+# Percentis dos saldos calculados na projeção do investimento
+PERCENTIS_PROJECAO = (5, 10, 25, 50, 75, 90, 95)
+# Passo (casas decimais) da taxa de equilíbrio confirmada pelo cálculo completo do investimento
+PASSOS_TAXA_POR_UNIDADE = 10000
+# Taxa de equilíbrio: intervalo inicial (limite superior) e valor máximo de cada variável (em % do indexador ou % a.a.)
+LIMITES_TAXA = {'taxa': (200.0, 10000.0), 'taxaPrefixada': (20.0, 1000.0)}
+
 class Investimento(BaseObject):
     """Classe que representa um Investimento.
     
@@ -30,8 +45,6 @@ class Investimento(BaseObject):
     """
     # Método criador 
     def __init__(self, tipoInvestimento: str, tipoRendimento: str, valInvestimentoInicial: Decimal, indexador: str, taxa: Decimal, taxaPrefixada: Decimal, dataInicial: datetime, dataFinal: datetime):
-        # Define a precisão para 9 casas decimais
-        getcontext().prec = 9
         # Atualiza os atributos com os valores informados na instanciação da classe
         self.tipoInvestimento = tipoInvestimento
         self.tipoRendimento = tipoRendimento
@@ -62,14 +75,494 @@ class Investimento(BaseObject):
         self.valSaldoLiquido = Decimal(0)
         self.evolucao = []
 
-    def calcular_investimento(self):
+    def calcular_investimento(self, motor: str = 'iterativo', arredondamentoDiario: bool = True, serieIndices=None, objIndexador=None, detalhe: str = 'diario'):
         """Realiza o cálculo do investimento em função do período informado.
-    
+
+        Argumentos:
+            mesmos argumentos de gerar_evolucao
         Retorno:
             Retorna uma lista contendo dictionaries referentes aos valores 
             de saldo e rentabilidade do investimento além de uma sublista 
             da evolução do valor inicial em função do tempo (período informado)
         """
+        evolucao = []
+        for item in self.gerar_evolucao(motor, arredondamentoDiario, serieIndices, objIndexador, detalhe):
+            evolucao.append(item)
+        self.evolucao = evolucao
+
+        return self
+
+    def gerar_evolucao(self, motor: str = 'iterativo', arredondamentoDiario: bool = True, serieIndices=None, objIndexador=None, detalhe: str = 'diario'):
+        """Valida o investimento, obtém os índices do período e retorna um generator que produz a evolução do 
+        investimento à medida que os índices são aplicados (permite transmitir a evolução sem materializá-la). 
+        Erros de validação e de obtenção dos índices são lançados na chamada, antes do primeiro item. 
+        Ao final da iteração os valores de saldo e rentabilidade do investimento estão atualizados 
+        (o atributo evolucao não é preenchido).
+
+        Argumentos:
+            motor: motor de cálculo utilizado na aplicação dos índices (ver TipoMotor). Ex.: iterativo, vetorizado
+            arredondamentoDiario: arredonda o saldo para 2 casas decimais a cada dia (motor vetorizado)
+            serieIndices: (opcional) série de índices do indexador já carregada (ver GestaoCadastro.get_serie_indices), 
+            permite compartilhar a mesma série entre vários cálculos
+            objIndexador: (opcional) indexador já carregado (ver GestaoCadastro.get_indexador)
+            detalhe: nível de detalhe da evolução do investimento (ver TipoDetalhe): none (sem evolução), 
+            mensal (saldo no último dia útil de cada mês) ou diario (saldo a cada dia útil)
+        Retorno:
+            Generator que produz um dictionary por item da evolução (dtReferencia, valIndice, valSaldoBruto).
+        """
+        self._validar()
+        # Validação - Motor de cálculo inválido
+        if motor not in TipoMotor.values():
+            mensagem  = "Motor de cálculo inválido [{0}]. Motores esperados: {1}.".format(motor, TipoMotor.values())
+            raise BusinessException('BE010', mensagem)
+        # Validação - Detalhe da evolução inválido
+        if detalhe not in TipoDetalhe.values():
+            mensagem  = "Detalhe da evolução do investimento inválido [{0}]. Valores esperados: {1}.".format(detalhe, TipoDetalhe.values())
+            raise BusinessException('BE011', mensagem)
+
+
+        # Inicializa o valor de investimento atualizado onde serão aplicados índices por período
+        self.valSaldoBruto = self.valInvestimentoInicial
+
+        # Datas e valores dos índices a serem aplicados sobre o valor investido
+        datas, valIndices = self._montar_serie(serieIndices, objIndexador)
+        
+        # Calcula a quantidade de dias corridos do investimento
+        self.qtdDiasCorridos = (self.dataFinal - self.dataInicial).days
+        
+        # Se taxa prefixada foi informada recupera a taxa diária correspondente
+        taxaPrefixadaDiaria = 0
+        if self.taxaPrefixada > Decimal(0):
+            taxaPrefixadaDiaria = self.taxaAnualToDiaria(self.taxaPrefixada)
+
+        # Aplica a série de índices sobre o valor investido
+        return self._aplicar_indices(MotorCalculo.gerar(motor, self.valInvestimentoInicial, datas, valIndices, self.taxa, taxaPrefixadaDiaria, arredondamentoDiario, detalhe), len(datas))
+
+    def _montar_serie(self, serieIndices=None, objIndexador=None):
+        """Monta a série de índices aplicada ao investimento: índices conhecidos do período seguidos do último índice
+        conhecido do indexador projetado para os dias úteis restantes (índice zero para investimentos pré-fixados).
+
+        Argumentos:
+            serieIndices: (opcional) série de índices do indexador já carregada (ver GestaoCadastro.get_serie_indices)
+            objIndexador: (opcional) indexador já carregado (ver GestaoCadastro.get_indexador)
+        Retorno:
+            Tupla contendo a lista de datas e a lista de valores (em percentual) dos índices.
+        """
+        objCadastro = GestaoCadastro()
+        # Executa a consulta e armazena numa lista
+        indices = []
+        if self.tipoRendimento.lower() != 'pre':
+            if serieIndices is None:
+                indices = objCadastro.list_indices(self.indexador.lower(), self.dataInicial, self.dataFinal)
+            else:
+                indices = serieIndices.fatia(self.dataInicial, self.dataFinal)
+  
+        # Listas com as datas e valores dos índices a serem aplicados sobre o valor investido
+        datas = []
+        valIndices = []
+        dtReferencia = self.dataInicial
+        # Varre a lista de índices para montar a série a ser aplicada
+        for indice in indices:
+            # Formata a data de referência
+            dtReferencia = indice['dt_referencia']
+            datas.append(dtReferencia)
+            valIndices.append(indice['val_indice'])
+
+        if len(indices) > 0:
+            dtReferencia = dtReferencia + timedelta(days=1)
+
+        if dtReferencia < self.dataFinal:
+            # Recupera os dados do indexador
+            if self.tipoRendimento.lower() != 'pre':
+                if objIndexador is None:
+                    objIndexador = objCadastro.get_indexador(self.indexador.lower())
+                valIndice = objIndexador.val_ultimo_indice
+            else:
+                valIndice = Decimal(0)
+            # Projeta o último índice conhecido para os dias úteis restantes do período
+            for dtUtil in Calendario.diasUteisEntre(dtReferencia, self.dataFinal):
+                datas.append(dtUtil)
+                valIndices.append(valIndice)
+
+        return datas, valIndices
+
+    def projetar_investimento(self, qtdCenarios: int = 10000, modelo: str = 'bootstrap', semente: int = None, qtdProcessos: int = 1,
+                              serieIndices=None, percentis: tuple = PERCENTIS_PROJECAO):
+        """Projeta a distribuição dos saldos do investimento na data final através de simulação de Monte Carlo dos
+        índices posteriores ao último índice conhecido do indexador (ver Projecao.simular). Os índices conhecidos são
+        aplicados uma única vez e cada cenário aplica uma trajetória de índices simulados aos dias úteis restantes.
+
+        Argumentos:
+            qtdCenarios: quantidade de cenários (trajetórias de índices) simulados
+            modelo: modelo de geração dos índices futuros (ver TipoModeloProjecao). Ex.: bootstrap, reversao-media
+            semente: (opcional) semente da simulação, permite reproduzir o resultado. Gerada quando não informada
+            qtdProcessos: quantidade máxima de processos utilizados na simulação
+            serieIndices: (opcional) série de índices do indexador já carregada (ver GestaoCadastro.get_serie_indices)
+            percentis: percentis calculados sobre os saldos simulados
+        Retorno:
+            Dictionary com os dados do investimento, os dados da simulação, o saldo médio, o percentual de cenários
+            com prejuízo e os saldos bruto e líquido (após imposto de renda) de cada percentil.
+        """
+        self._validar()
+        # Validação - projeção somente para investimentos indexados
+        if self.tipoRendimento.lower() == 'pre':
+            mensagem  = "Projeção disponível somente para investimentos pós-fixados ou híbridos."
+            raise BusinessException('BE014', mensagem)
+        # Validação - modelo de projeção
+        elif modelo not in TipoModeloProjecao.values():
+            mensagem  = "Modelo de projeção inválido [{0}]. Modelos esperados: {1}.".format(modelo, TipoModeloProjecao.values())
+            raise BusinessException('BE015', mensagem)
+
+        if serieIndices is None:
+            serieIndices = GestaoCadastro().get_serie_indices(self.indexador)
+        ultimaData = serieIndices.ultima_data()
+        # Validação - período a ser projetado
+        if ultimaData is None or len(serieIndices) < 2:
+            mensagem  = "Série histórica do indexador [{0}] insuficiente para projeção.".format(self.indexador.lower())
+            raise BusinessException('BE016', mensagem)
+        elif self.dataFinal <= ultimaData:
+            mensagem  = "Data final do investimento deve ser posterior ao último índice conhecido ({0}).".format(ultimaData.strftime('%d/%m/%Y'))
+            raise BusinessException('BE017', mensagem)
+
+        taxa = float(self.taxa)
+        taxaPrefixadaDiaria = float(self.taxaAnualToDiaria(self.taxaPrefixada)) if self.taxaPrefixada > Decimal(0) else 0.0
+        # Aplica os índices conhecidos do período (produto dos fatores diários)
+        inicio, fim = serieIndices.posicoes(self.dataInicial, ultimaData)
+        conhecidos = numpy.frombuffer(serieIndices.valoresFloat, dtype=numpy.float64)[inicio:fim]
+        valSaldoConhecido = float(self.valInvestimentoInicial) * float(numpy.prod(1.0 + (conhecidos * (taxa / 100.0) + taxaPrefixadaDiaria) / 100.0))
+        # Dias úteis projetados
+        dataInicialProjecao = max(self.dataInicial, ultimaData + timedelta(days=1))
+        qtdDiasProjetados = Calendario.contarDiasUteis(dataInicialProjecao, self.dataFinal)
+        self.qtdDiasCorridos = (self.dataFinal - self.dataInicial).days
+
+        if semente is None:
+            semente = int(numpy.random.SeedSequence().generate_state(1)[0])
+        historico = numpy.frombuffer(serieIndices.valoresFloat, dtype=numpy.float64)[-JANELA_HISTORICA:]
+        instanteInicial = time.perf_counter()
+        saldosBrutos = Projecao.simular(modelo, historico, qtdCenarios, qtdDiasProjetados, taxa, taxaPrefixadaDiaria, valSaldoConhecido, semente, qtdProcessos)
+        tempoSimulacao = time.perf_counter() - instanteInicial
+
+        # Tributos sobre o rendimento positivo de cada cenário
+        percImpostoRenda = Tributacao.percImpostoRenda(self.qtdDiasCorridos, self.tipoInvestimento)
+        valInicial = float(self.valInvestimentoInicial)
+        saldosLiquidos = valInicial + Tributacao.aplicar(self.tipoInvestimento, saldosBrutos - valInicial, self.qtdDiasCorridos)[2]
+
+        valoresPercentis = numpy.percentile(saldosBrutos, percentis), numpy.percentile(saldosLiquidos, percentis)
+        listaPercentis = []
+        for percentil, valSaldoBruto, valSaldoLiquido in zip(percentis, *valoresPercentis):
+            listaPercentis.append({'percentil': percentil, 'valSaldoBruto': round(float(valSaldoBruto), 2), 'valSaldoLiquido': round(float(valSaldoLiquido), 2),
+                                   'percRentabilidadeLiquida': round((float(valSaldoLiquido) / valInicial - 1) * 100, 3)})
+
+        return {'tipoInvestimento': self.tipoInvestimento, 'tipoRendimento': self.tipoRendimento, 'indexador': self.indexador,
+                'taxa': self.taxa, 'taxaPrefixada': self.taxaPrefixada, 'valInvestimentoInicial': self.valInvestimentoInicial,
+                'dataInicial': self.dataInicial, 'dataFinal': self.dataFinal, 'qtdDiasCorridos': self.qtdDiasCorridos,
+                'dataUltimoIndice': ultimaData, 'valSaldoBrutoUltimoIndice': round(valSaldoConhecido, 2), 'qtdDiasUteisProjetados': qtdDiasProjetados,
+                'modelo': modelo, 'qtdCenarios': qtdCenarios, 'semente': semente, 'percImpostoRenda': percImpostoRenda,
+                'valSaldoLiquidoMedio': round(float(saldosLiquidos.mean()), 2),
+                'percCenariosPrejuizo': round(float((saldosLiquidos < valInicial).mean()) * 100, 3),
+                'percentis': listaPercentis, 'tempoSimulacao': round(tempoSimulacao * 1000, 3)}
+
+    def backtest_investimento(self, qtdMeses: int = 12, serieIndices=None, indexadorComparacao: str = None, taxaComparacao: Decimal = Decimal(100),
+                              serieComparacao=None):
+        """Calcula a rentabilidade histórica do investimento em janelas deslizantes de qtdMeses meses, uma janela
+        para cada data da série de índices do indexador entre a data inicial e a data final do investimento
+        (somente janelas encerradas até a data final e até o último índice conhecido). Os fatores de todas as
+        janelas são obtidos da soma acumulada dos logaritmos dos fatores diários calculada uma única vez
+        (ver SerieIndices.fatores), sem arredondamento diário do saldo.
+
+        Argumentos:
+            qtdMeses: duração (em meses) de cada janela
+            serieIndices: (opcional) série de índices do indexador já carregada (ver GestaoCadastro.get_serie_indices)
+            indexadorComparacao: (opcional) indexador cuja rentabilidade nas mesmas janelas é comparada à
+            rentabilidade líquida do investimento (ex.: ipca)
+            taxaComparacao: percentual aplicado sobre o indexador de comparação
+            serieComparacao: (opcional) série de índices do indexador de comparação já carregada
+        Retorno:
+            Dictionary com os dados do investimento, as estatísticas das rentabilidades e a lista de janelas
+            (datas inicial e final e rentabilidades bruta, líquida e do indexador de comparação).
+        """
+        self._validar()
+        # Validação - backtest somente para investimentos indexados
+        if self.tipoRendimento.lower() == 'pre':
+            mensagem  = "Backtest disponível somente para investimentos pós-fixados ou híbridos."
+            raise BusinessException('BE020', mensagem)
+
+        objCadastro = GestaoCadastro()
+        if serieIndices is None:
+            serieIndices = objCadastro.get_serie_indices(self.indexador)
+        if indexadorComparacao is not None and serieComparacao is None:
+            serieComparacao = objCadastro.get_serie_indices(indexadorComparacao)
+
+        # Data final das janelas limitada ao último índice conhecido (do indexador e do indexador de comparação)
+        datasLimite = [self.dataFinal, serieIndices.ultima_data()]
+        if serieComparacao is not None:
+            datasLimite.append(serieComparacao.ultima_data())
+        if None in datasLimite:
+            mensagem  = "Série histórica insuficiente para janelas de {0} meses no período informado.".format(qtdMeses)
+            raise BusinessException('BE021', mensagem)
+        dataLimite = min(datasLimite)
+
+        # Datas inicial e final das janelas (data final na mesma data qtdMeses meses depois ou no último dia do mês)
+        ordemEpoca = date(1970, 1, 1).toordinal()
+        ordinais = numpy.array(serieIndices.ordinais, dtype=numpy.int64)
+        primeira, ultima = serieIndices.posicoes(self.dataInicial, self.dataFinal)
+        datasIniciais = (ordinais[primeira:ultima] - ordemEpoca).astype('datetime64[D]')
+        mesesIniciais = datasIniciais.astype('datetime64[M]')
+        mesesFinais = mesesIniciais + numpy.timedelta64(qtdMeses, 'M')
+        datasFinais = numpy.minimum(mesesFinais.astype('datetime64[D]') + (datasIniciais - mesesIniciais.astype('datetime64[D]')),
+                                    (mesesFinais + 1).astype('datetime64[D]') - 1)
+        qtdJanelas = int((datasFinais <= numpy.datetime64(dataLimite, 'D')).sum())
+        if qtdJanelas == 0:
+            mensagem  = "Série histórica insuficiente para janelas de {0} meses no período informado.".format(qtdMeses)
+            raise BusinessException('BE021', mensagem)
+        datasIniciais = datasIniciais[:qtdJanelas]
+        datasFinais = datasFinais[:qtdJanelas]
+        ordinaisIniciais = datasIniciais.astype(numpy.int64) + ordemEpoca
+        ordinaisFinais = datasFinais.astype(numpy.int64) + ordemEpoca
+
+        # Fatores brutos das janelas (índices entre as datas inicial e final, inclusive, como no cálculo do investimento)
+        taxa = float(self.taxa) if self.taxa > Decimal(0) else 100.0
+        taxaPrefixadaDiaria = float(self.taxaAnualToDiaria(self.taxaPrefixada)) if self.taxaPrefixada > Decimal(0) else 0.0
+        inicios = numpy.arange(primeira, primeira + qtdJanelas)
+        fins = numpy.searchsorted(ordinais, ordinaisFinais, side='right')
+        rentabilidadesBrutas = serieIndices.fatores(inicios, fins, taxa, taxaPrefixadaDiaria) - 1.0
+
+        # Tributos sobre o rendimento positivo conforme os dias corridos de cada janela
+        rentabilidadesLiquidas = Tributacao.aplicar(self.tipoInvestimento, rentabilidadesBrutas, ordinaisFinais - ordinaisIniciais)[2]
+
+        estatisticas = {'percRentabilidadeLiquidaMinima': round(float(rentabilidadesLiquidas.min()) * 100, 3),
+                        'percRentabilidadeLiquidaMaxima': round(float(rentabilidadesLiquidas.max()) * 100, 3),
+                        'percRentabilidadeLiquidaMedia': round(float(rentabilidadesLiquidas.mean()) * 100, 3),
+                        'percRentabilidadeLiquidaMediana': round(float(numpy.median(rentabilidadesLiquidas)) * 100, 3),
+                        'percJanelasPrejuizo': round(float((rentabilidadesLiquidas < 0).mean()) * 100, 3)}
+
+        colunas = [datasIniciais.astype(object), datasFinais.astype(object),
+                   numpy.round(rentabilidadesBrutas * 100, 3).tolist(), numpy.round(rentabilidadesLiquidas * 100, 3).tolist()]
+        atributos = ['dataInicial', 'dataFinal', 'percRentabilidadeBruta', 'percRentabilidadeLiquida']
+        if serieComparacao is not None:
+            # Rentabilidade do indexador de comparação nas mesmas janelas
+            ordinaisComparacao = numpy.array(serieComparacao.ordinais, dtype=numpy.int64)
+            iniciosComparacao = numpy.searchsorted(ordinaisComparacao, ordinaisIniciais, side='left')
+            finsComparacao = numpy.searchsorted(ordinaisComparacao, ordinaisFinais, side='right')
+            rentabilidadesComparacao = serieComparacao.fatores(iniciosComparacao, finsComparacao, float(taxaComparacao)) - 1.0
+            estatisticas['percRentabilidadeComparacaoMedia'] = round(float(rentabilidadesComparacao.mean()) * 100, 3)
+            estatisticas['percJanelasSuperioresComparacao'] = round(float((rentabilidadesLiquidas > rentabilidadesComparacao).mean()) * 100, 3)
+            colunas.append(numpy.round(rentabilidadesComparacao * 100, 3).tolist())
+            atributos.append('percRentabilidadeComparacao')
+        janelas = [dict(zip(atributos, valores)) for valores in zip(*colunas)]
+
+        return {'tipoInvestimento': self.tipoInvestimento, 'tipoRendimento': self.tipoRendimento, 'indexador': self.indexador,
+                'taxa': self.taxa, 'taxaPrefixada': self.taxaPrefixada, 'dataInicial': self.dataInicial, 'dataFinal': self.dataFinal,
+                'qtdMeses': qtdMeses, 'indexadorComparacao': indexadorComparacao, 'taxaComparacao': taxaComparacao if indexadorComparacao is not None else None,
+                'qtdJanelas': qtdJanelas, 'estatisticas': estatisticas, 'janelas': janelas}
+
+    def resolver_taxa(self, variavel: str, valSaldoLiquidoAlvo: Decimal, motor: str = 'iterativo', arredondamentoDiario: bool = True, serieIndices=None, objIndexador=None):
+        """Encontra a menor taxa (percentual do indexador) ou taxa prefixada anual, em passos de 0,0001, com a qual o
+        investimento atinge o saldo líquido alvo (ex.: saldo líquido de um produto concorrente). A série de índices é
+        montada uma única vez e o método da falsa posição (variante Illinois) estima o valor com um modelo em lote
+        (numpy, sem arredondamento diário, ver _estimar_taxa). A estimativa é então ajustada por busca monótona sobre
+        o cálculo completo do investimento, que arredonda o saldo a cada dia (ver _buscar_menor_passo).
+
+        Cada cálculo completo é realizado sobre uma cópia do investimento (ver _calcular_com_taxa): o investimento
+        somente é atualizado com o valor encontrado e seus resultados ao final da busca, e permanece inalterado
+        quando a busca é interrompida (ex.: BusinessException, erro no cálculo).
+
+        Argumentos:
+            variavel: taxa (investimentos pós-fixados ou híbridos) ou taxaPrefixada (pré-fixados ou híbridos).
+            O valor informado no investimento para a variável é ignorado
+            valSaldoLiquidoAlvo: saldo líquido a ser atingido na data final
+            motor, arredondamentoDiario, serieIndices, objIndexador: ver gerar_evolucao (cálculo completo)
+        Retorno:
+            Dictionary com a variável, o valor encontrado, o saldo alvo, a quantidade de iterações do modelo, a
+            quantidade de cálculos completos e o investimento calculado com o valor encontrado (sem evolução).
+        """
+        # Validação - variável compatível com o tipo de rendimento
+        variaveis = {'pre': ['taxaPrefixada'], 'pos': ['taxa'], 'hibrido': ['taxa', 'taxaPrefixada']}.get(self.tipoRendimento.lower(), [])
+        if variavel not in variaveis:
+            mensagem  = "Variável [{0}] não pode ser calculada para o tipo de rendimento [{1}]. Variáveis esperadas: {2}.".format(variavel, self.tipoRendimento.lower(), variaveis)
+            raise BusinessException('BE018', mensagem)
+        self._validar()
+        if serieIndices is None and self.tipoRendimento.lower() != 'pre':
+            serieIndices = GestaoCadastro().get_serie_indices(self.indexador)
+
+        # Série de índices montada uma única vez para todas as iterações do modelo
+        datas, valIndices = self._montar_serie(serieIndices, objIndexador)
+        arrIndices = numpy.fromiter(map(float, valIndices), dtype=numpy.float64, count=len(valIndices))
+        alvo = float(valSaldoLiquidoAlvo)
+        limite = LIMITES_TAXA[variavel][1]
+
+        # Cálculos completos realizados (passo: investimento calculado, None quando excede a precisão do cálculo)
+        calculos = {}
+        def atingeAlvo(passo: int):
+            """Indica se o cálculo completo do investimento com a variável igual a passo * 0,0001 atinge o alvo. Um saldo
+            que excede a precisão dos cálculos financeiros é considerado acima do alvo."""
+            if passo not in calculos:
+                calculos[passo] = self._calcular_com_taxa(variavel, Decimal(passo) / Decimal(PASSOS_TAXA_POR_UNIDADE), motor, arredondamentoDiario, serieIndices, objIndexador)
+            return calculos[passo] is None or calculos[passo].valSaldoLiquido >= valSaldoLiquidoAlvo
+
+        # Estimativa do modelo em lote, arredondada para cima em 4 casas decimais
+        valorModelo, qtdIteracoes = self._estimar_taxa(variavel, arrIndices, alvo, alvo)
+        passo = max(math.ceil(round(valorModelo * PASSOS_TAXA_POR_UNIDADE, 6)), 1)
+        # O arredondamento diário desloca o saldo em relação ao modelo: o deslocamento observado no primeiro
+        # cálculo completo corrige o alvo do modelo e aproxima o ponto de partida da busca
+        atingeAlvo(passo)
+        if calculos[passo] is not None:
+            alvoCorrigido = alvo + self._saldo_liquido_modelo(variavel, passo / PASSOS_TAXA_POR_UNIDADE, arrIndices) - float(calculos[passo].valSaldoLiquido)
+            if self._saldo_liquido_modelo(variavel, 0.0, arrIndices) < alvoCorrigido < self._saldo_liquido_modelo(variavel, limite, arrIndices):
+                valorModelo, iteracoes = self._estimar_taxa(variavel, arrIndices, alvoCorrigido, alvo)
+                qtdIteracoes+= iteracoes
+                passo = max(math.ceil(round(valorModelo * PASSOS_TAXA_POR_UNIDADE, 6)), 1)
+
+        # Menor passo que atinge o alvo no cálculo completo
+        passo = self._buscar_menor_passo(atingeAlvo, passo, variavel, alvo)
+        if calculos[passo] is None:
+            mensagem  = "Saldo líquido alvo ({0:.2f}) excede a precisão do cálculo do investimento.".format(alvo)
+            raise BusinessException('BE019', mensagem)
+
+        # Investimento atualizado com o valor encontrado e os resultados do cálculo correspondente
+        self.__dict__.update(calculos[passo].__dict__)
+        return {'variavel': variavel, 'valor': getattr(self, variavel), 'valSaldoLiquidoAlvo': valSaldoLiquidoAlvo, 'qtdIteracoes': qtdIteracoes,
+                'qtdCalculos': len(calculos), 'resultadoInvestimento': self}
+
+    def _calcular_com_taxa(self, variavel: str, valor: Decimal, motor: str, arredondamentoDiario: bool, serieIndices, objIndexador):
+        """Realiza o cálculo completo (sem evolução) de uma cópia do investimento com o valor informado para a variável,
+        sem alterar o investimento.
+
+        Retorno:
+            Cópia do investimento calculada ou None quando o saldo excede a precisão dos cálculos financeiros.
+        """
+        objInvest = copy.copy(self)
+        setattr(objInvest, variavel, valor)
+        try:
+            objInvest.calcular_investimento(motor=motor, arredondamentoDiario=arredondamentoDiario, serieIndices=serieIndices, objIndexador=objIndexador, detalhe=TipoDetalhe.NONE.value)
+        except (DecimalException, OverflowError):
+            return None
+        return objInvest
+
+    def _saldo_liquido_modelo(self, variavel: str, valor: float, arrIndices):
+        """Saldo líquido do modelo em lote (numpy, sem arredondamento diário) com o valor informado para a variável
+        (infinito quando excede o float).
+
+        Argumentos:
+            variavel: taxa ou taxaPrefixada (ver resolver_taxa)
+            valor: valor da variável (em % do indexador ou % a.a.)
+            arrIndices: array numpy com os índices da série do investimento (ver _montar_serie)
+        """
+        valInicial = float(self.valInvestimentoInicial)
+        if variavel == 'taxa':
+            taxa = valor
+            taxaPrefixadaDiaria = float(self.taxaAnualToDiaria(self.taxaPrefixada)) if self.taxaPrefixada > Decimal(0) else 0.0
+        else:
+            taxa = float(self.taxa) if self.taxa > Decimal(0) else 100.0
+            taxaPrefixadaDiaria = ((1.0 + valor / 100.0) ** (1.0 / 252) - 1.0) * 100.0
+        with numpy.errstate(over='ignore'):
+            valSaldoBruto = valInicial * numpy.exp(numpy.log1p((arrIndices * (taxa / 100.0) + taxaPrefixadaDiaria) / 100.0).sum())
+        if not numpy.isfinite(valSaldoBruto):
+            return math.inf
+        qtdDiasCorridos = (self.dataFinal - self.dataInicial).days
+        valIOF, valImpostoRenda, rentabilidadeLiquida = Tributacao.aplicar(self.tipoInvestimento, valSaldoBruto - valInicial, qtdDiasCorridos)
+        return valInicial + float(rentabilidadeLiquida)
+
+    def _estimar_taxa(self, variavel: str, arrIndices, alvoModelo: float, alvo: float):
+        """Estima o valor da variável em que o saldo líquido do modelo em lote é igual ao alvo: o intervalo inicial
+        (ver LIMITES_TAXA) é ampliado até conter o valor procurado e reduzido pelo método da falsa posição (Illinois).
+
+        Argumentos:
+            variavel, arrIndices: ver _saldo_liquido_modelo
+            alvoModelo: saldo líquido procurado no modelo (alvo corrigido pelo deslocamento do arredondamento diário)
+            alvo: saldo líquido alvo informado (mensagens de erro)
+        Retorno:
+            Tupla contendo o valor estimado e a quantidade de iterações do método da falsa posição.
+        """
+        def diferenca(valor: float):
+            return self._saldo_liquido_modelo(variavel, valor, arrIndices) - alvoModelo
+
+        superiorInicial, limite = LIMITES_TAXA[variavel]
+        # Intervalo inicial ampliado até conter o valor procurado
+        inferior, superior = 0.0, superiorInicial
+        diferencaInferior = diferenca(inferior)
+        if diferencaInferior >= 0:
+            mensagem  = "Saldo líquido alvo ({0:.2f}) é atingido com {1} igual a zero.".format(alvo, variavel)
+            raise BusinessException('BE019', mensagem)
+        diferencaSuperior = diferenca(superior)
+        while diferencaSuperior < 0:
+            if superior >= limite:
+                mensagem  = "Não existe {0} de até {1:.0f}% que atinja o saldo líquido alvo ({2:.2f}).".format(variavel, limite, alvo)
+                raise BusinessException('BE019', mensagem)
+            inferior, diferencaInferior = superior, diferencaSuperior
+            superior = min(superior * 2, limite)
+            diferencaSuperior = diferenca(superior)
+        # Saldo acima do float no limite superior: reduz o intervalo até um saldo finito
+        while math.isinf(diferencaSuperior) and superior - inferior > 1e-9:
+            meio = (inferior + superior) / 2
+            diferencaMeio = diferenca(meio)
+            if diferencaMeio < 0:
+                inferior, diferencaInferior = meio, diferencaMeio
+            else:
+                superior, diferencaSuperior = meio, diferencaMeio
+
+        # Método da falsa posição (Illinois): converge como a secante mantendo o valor entre os limites
+        iteracoes = 0
+        ladoAnterior = 0
+        while superior - inferior > 1e-9 and iteracoes < 100:
+            iteracoes+= 1
+            valor = superior - diferencaSuperior * (superior - inferior) / (diferencaSuperior - diferencaInferior)
+            diferencaValor = diferenca(valor)
+            if abs(diferencaValor) < 1e-9:
+                return valor, iteracoes
+            if diferencaValor < 0:
+                inferior, diferencaInferior = valor, diferencaValor
+                if ladoAnterior == -1:
+                    diferencaSuperior /= 2
+                ladoAnterior = -1
+            else:
+                superior, diferencaSuperior = valor, diferencaValor
+                if ladoAnterior == 1:
+                    diferencaInferior /= 2
+                ladoAnterior = 1
+        return superior, iteracoes
+
+    @classmethod
+    def _buscar_menor_passo(cls, atingeAlvo, passo: int, variavel: str, alvo: float):
+        """Busca monótona do menor passo (0,0001) que atinge o alvo no cálculo completo (o saldo não diminui com o
+        aumento da variável): o intervalo é ampliado a partir da estimativa em passos crescentes até conter o menor
+        passo que atinge o alvo e, em seguida, reduzido por bisseção.
+
+        Argumentos:
+            atingeAlvo: função que indica se o cálculo completo com o passo informado atinge o alvo
+            passo: passo estimado pelo modelo em lote (ponto de partida da busca)
+            variavel, alvo: variável calculada e saldo líquido alvo (mensagens de erro)
+        Retorno:
+            Menor passo que atinge o alvo.
+        """
+        limite = LIMITES_TAXA[variavel][1]
+        passoLimite = int(limite * PASSOS_TAXA_POR_UNIDADE)
+        distancia = 1
+        inferior, superior = passo, passo
+        if atingeAlvo(passo):
+            while inferior > 0 and atingeAlvo(inferior):
+                superior = inferior
+                inferior = max(superior - distancia, 0)
+                distancia*= 2
+        else:
+            while not atingeAlvo(superior):
+                if superior >= passoLimite:
+                    mensagem  = "Não existe {0} de até {1:.0f}% que atinja o saldo líquido alvo ({2:.2f}).".format(variavel, limite, alvo)
+                    raise BusinessException('BE019', mensagem)
+                inferior = superior
+                superior = min(inferior + distancia, passoLimite)
+                distancia*= 2
+        while superior - inferior > 1:
+            meio = (inferior + superior) // 2
+            if atingeAlvo(meio):
+                superior = meio
+            else:
+                inferior = meio
+        return superior
+
+    def _validar(self):
+        """Valida os dados do investimento (período, valor, tipo de investimento, rendimento e indexador).
+        """
         # Validação - data inicial mínima
         if self.dataInicial < datetime(2001, 1, 1).date():
             mensagem  = "Data inicial do investimento deve ser maior ou igual a 01/01/2001."
@@ -97,7 +590,7 @@ class Investimento(BaseObject):
         elif self.tipoRendimento.lower() == 'pos' or self.tipoRendimento.lower() == 'hibrido':
             # Validação - Tipo de indexador inválido
             if self.indexador.lower() not in TipoIndexador.values():
-                mensagem  = "Tipo de indexador inválido [{0}]. Tipos esperado: {}.".format(self.indexador.lower(), TipoIndexador.values())
+                mensagem  = "Tipo de indexador inválido [{0}]. Tipos esperado: {1}.".format(self.indexador.lower(), TipoIndexador.values())
                 raise BusinessException('BE007', mensagem)
             elif self.taxa <= Decimal(0):
                 mensagem  = "Você deve informar a taxa sobre o indexador pós fixado."
@@ -105,76 +598,27 @@ class Investimento(BaseObject):
             elif self.tipoRendimento.lower() == 'hibrido':
                 if self.taxaPrefixada <= Decimal(0):
                     mensagem  = "Você deve informar a taxa prefixada."
-                    raise BusinessException('BE009', mensagem)        
-
-        
-        # Define a precisão para 9 casas decimais
-        getcontext().prec = 9
-        getcontext().rounding = ROUND_HALF_UP
-
-        # Inicializa o valor de investimento atualizado onde serão aplicados índices por período
-        self.valSaldoBruto = self.valInvestimentoInicial
+                    raise BusinessException('BE009', mensagem)
 
-        objCadastro = GestaoCadastro()
-        # Executa a consulta e armazena numa lista
-        indices = []
-        if self.tipoRendimento.lower() != 'pre':
-            indices = objCadastro.list_indices(self.indexador.lower(), self.dataInicial, self.dataFinal)
-        
-        # Calcula a quantidade de dias corridos do investimento
-        self.qtdDiasCorridos = (self.dataFinal - self.dataInicial).days
-        
-        # Define a variável do dicionário que armazenará a evolução do valor investido de acordo 
-        # com a peridicidade do índice (diariamente ou mensalmente)
-        resultadoInvestimento = {}
-        # Se taxa prefixada foi informada recupera a taxa diária correspondente
-        taxaPrefixadaDiaria = 0
-        if self.taxaPrefixada > Decimal(0):
-            taxaPrefixadaDiaria = self.taxaAnualToDiaria(self.taxaPrefixada)
-  
-        dtReferencia = self.dataInicial
-        # Varre a lista de índices para calcular a evolução
-        for indice in indices:
-            # Formata a data de referência
-            dtReferencia = indice['dt_referencia']
-            # Formata o valor do índice
-            valIndice = indice['val_indice']
-            valIndice = Decimal(valIndice)
-            # Se taxa em relação ao índice foi informada aplica sobre o índice obtido
-            if self.taxa > Decimal(0):
-                valIndice = valIndice * (self.taxa / Decimal(100))
-            # Majora a taxa do índice com o valor prefixado
-            valIndice = valIndice + taxaPrefixadaDiaria
-                
-            # Atualizado Saldo Bruto do investimento
-            self.valSaldoBruto = self.valSaldoBruto * (1 + (valIndice / Decimal(100)))
-            self.valSaldoBruto = Decimal(round(float(self.valSaldoBruto),2))
-            self.evolucao.append({'dtReferencia': dtReferencia, 'valIndice': float(valIndice), 'valSaldoBruto': float(self.valSaldoBruto)})
-
-        if len(indices) > 0:
-            dtReferencia = dtReferencia + timedelta(days=1)
-
-        if dtReferencia < self.dataFinal:
-            # Recupera os dados do indexador
-            if self.tipoRendimento.lower() != 'pre':
-                objIndexador = objCadastro.get_indexador(self.indexador.lower())
-                valIndice = objIndexador.val_ultimo_indice
-            else:
-                valIndice = Decimal(0)
-             # Se taxa em relação ao índice foi informada aplica sobre o índice obtido
-            if self.taxa > Decimal(0):
-                valIndice = valIndice * (self.taxa / Decimal(100))
-            # Majora a taxa do índice com o valor prefixado
-            valIndice = valIndice + taxaPrefixadaDiaria
-            for dtUtil in Calendario.listDiasUteis(dtReferencia, self.dataFinal):
-                # Atualizado Saldo Bruto do investimento
-                self.valSaldoBruto = self.valSaldoBruto * (1 + (valIndice / Decimal(100)))
-                self.valSaldoBruto = Decimal(round(float(self.valSaldoBruto),2))
-                self.evolucao.append({'dtReferencia': dtUtil, 'valIndice': float(valIndice), 'valSaldoBruto': float(self.valSaldoBruto)})
+    def _aplicar_indices(self, gerador, qtdDiasUteis: int):
+        """Produz a evolução do saldo do motor de cálculo e, ao final, atualiza os valores de saldo e 
+        rentabilidade do investimento.
 
+        Argumentos:
+            gerador: generator do motor de cálculo (ver MotorCalculo.gerar)
+            qtdDiasUteis: quantidade de dias úteis considerados no investimento
+        """
+        self.valSaldoBruto = yield from gerador
 
         # Calcula a quantidade de dias úteis considerados no investimentos
-        self.qtdDiasUteis = len(self.evolucao)
+        self.qtdDiasUteis = qtdDiasUteis
+        # Cálculos no contexto dos cálculos financeiros (sem itens produzidos a partir daqui)
+        with localcontext(CONTEXTO):
+            self._atualizar_resultados()
+
+    def _atualizar_resultados(self):
+        """Atualiza os valores de rentabilidade, impostos e saldo líquido a partir do saldo bruto.
+        """
         ### Atualiza resultados do investimento ###
         # Rentabilidade bruta
         self.rentabilidadeBruta = self.valSaldoBruto - self.valInvestimentoInicial
@@ -182,14 +626,14 @@ class Investimento(BaseObject):
         self.percRentabilidadeBrutaDiaria = Decimal(round(self.taxaPeriodo(self.percRentabilidadeBruta, self.qtdDiasUteis), 6))
         self.percRentabilidadeBrutaMensal = Decimal(round(self.taxaJuros(self.percRentabilidadeBrutaDiaria, 21), 3))
         self.percRentabilidadeBrutaAnual = Decimal(round(self.taxaJuros(self.percRentabilidadeBrutaDiaria, 252), 3))
-        # Imposto de renda
-        if self.tipoInvestimento.lower() in ['poupanca', 'lci', 'lca']:
-            self.percImpostoRenda = Decimal(0)
-        else:
-            self.percImpostoRenda = self.obterPercIR(self.qtdDiasCorridos)
-        self.valImpostoRenda = self.rentabilidadeBruta * (self.percImpostoRenda / Decimal(100))
-        # IOF
-        # TODO: Incluir obtenção do perc e cálculo de IOF de acordo com a qtdDiasCorridos
+        # IOF (somente sobre rendimento positivo)
+        self.percIOF = Tributacao.percIOF(self.qtdDiasCorridos, self.tipoInvestimento)
+        self.valIOF = Decimal(0)
+        if self.rentabilidadeBruta > Decimal(0):
+            self.valIOF = self.rentabilidadeBruta * (self.percIOF / Decimal(100))
+        # Imposto de renda (sobre o rendimento descontado o IOF)
+        self.percImpostoRenda = Tributacao.percImpostoRenda(self.qtdDiasCorridos, self.tipoInvestimento)
+        self.valImpostoRenda = (self.rentabilidadeBruta - self.valIOF) * (self.percImpostoRenda / Decimal(100))
         # Rentabilidade Líquida
         self.rentabilidadeLiquida = self.rentabilidadeBruta - self.valImpostoRenda - self.valIOF
         # Saldo Líquido
@@ -202,8 +646,6 @@ class Investimento(BaseObject):
 
         # for index, item in enumerate(times_ordenados, start=1):
         #     item['class_gols_pro_mand'] = index 
-
-        return self
     
     @classmethod
     def taxaPeriodo(cls, taxa:Decimal, qtdPeriodos:Decimal):
@@ -215,9 +657,10 @@ class Investimento(BaseObject):
         Retorno:
             Retorna um decimal representando a taxa calculada equivalente ao período informado.
         """
-        taxaInformada = Decimal(1) + (Decimal(taxa) / Decimal(100))
-        taxaPeriodo = Decimal(taxaInformada ** Decimal(1 / qtdPeriodos)) - Decimal(1)
-        taxaPeriodo = taxaPeriodo * Decimal(100)
+        with localcontext(CONTEXTO):
+            taxaInformada = Decimal(1) + (Decimal(taxa) / Decimal(100))
+            taxaPeriodo = Decimal(taxaInformada ** Decimal(1 / qtdPeriodos)) - Decimal(1)
+            taxaPeriodo = taxaPeriodo * Decimal(100)
 
         return taxaPeriodo
 
@@ -231,9 +674,10 @@ class Investimento(BaseObject):
         Retorno:
             Retorna um decimal representando a taxa calculada equivalente com juros sobre juros na quantidade de períodos informada.
         """
-        taxaInformada = Decimal(1) + (Decimal(taxa) / Decimal(100))
-        taxaJuros = Decimal(taxaInformada ** Decimal(qtdPeriodos)) - Decimal(1)
-        taxaJuros = taxaJuros * Decimal(100)
+        with localcontext(CONTEXTO):
+            taxaInformada = Decimal(1) + (Decimal(taxa) / Decimal(100))
+            taxaJuros = Decimal(taxaInformada ** Decimal(qtdPeriodos)) - Decimal(1)
+            taxaJuros = taxaJuros * Decimal(100)
 
         return taxaJuros
     
@@ -261,28 +705,13 @@ class Investimento(BaseObject):
 
     def obterPercIR(self, qtdDiasCorridos:int):
         """Identifica o percentual de Imposto de renda aplicável de acordo com a quantidade 
-        de dias corridos do investimento.
+        de dias corridos e o tipo do investimento (ver Tributacao, faixas e isenções em static/json/tributacao.json).
     
         Retorno:
             Retorna um decimal representando o percentual de IR a ser aplicado sob o rendimento
-            do investimento.
+            do investimento (zero quando o tipo de investimento é isento).
         """
-        # Define a precisão para 9 casas decimais
-        getcontext().prec = 9
-        percIR = Decimal(0)
-
-        # TODO: criar entidade no banco de dados com os intervalos e respectivos % para flexibilizar 
-        # manutenção dos intervalos e %s
-        if qtdDiasCorridos <= 180:
-            percIR = 22.5
-        elif qtdDiasCorridos <= 360:
-            percIR = 20
-        elif qtdDiasCorridos <= 720:
-            percIR = 17.5
-        else:
-            percIR = 15
-        
-        return Decimal(percIR)
+        return Tributacao.percImpostoRenda(qtdDiasCorridos, self.tipoInvestimento)
 
 # Enum de tipos de investimento - para evitar buscas excessivas no banco dado que não não mudam tanto
 class TipoInvestimento(Enum):
@@ -0,0 +1,223 @@
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal, Context, ROUND_HALF_UP
+# Importa classe para Enumeradores
+from enum import Enum
+# Importa o módulo para cálculos vetorizados
+import numpy
+# Importa o módulo de log
+import logging
+# Importa a classe base
+from negocio.baseobject import BaseObject
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Classe MotorCalculo')
+logger.setLevel(logging.INFO)
+
+# Contexto decimal dos cálculos financeiros: precisão de 9 casas e arredondamento comercial. Utilizado de forma 
+# explícita (métodos do contexto ou decimal.localcontext) sem alterar o contexto da thread, de modo que o resultado 
+# não depende da ordem das chamadas nem de outras requisições atendidas pela mesma thread
+CONTEXTO = Context(prec=9, rounding=ROUND_HALF_UP)
+
+class MotorCalculo(BaseObject):
+    """Classe que concentra os motores de cálculo responsáveis por aplicar uma série de índices
+    sobre um valor inicial (juros compostos).
+    """
+    # Método criador
+    def __init__(self):
+        return None
+
+    @classmethod
+    def compor(cls, motor: str, valInicial: Decimal, datas: list, indices: list, taxa: Decimal, taxaPrefixadaDiaria: Decimal, arredondamentoDiario: bool = True, detalhe: str = 'diario'):
+        """Aplica a série de índices sobre o valor inicial utilizando o motor de cálculo solicitado.
+
+        Argumentos:
+            motor: motor de cálculo a ser utilizado (ver TipoMotor)
+            valInicial: valor inicial sobre o qual os índices serão aplicados
+            datas: lista com as datas de referência de cada índice
+            indices: lista com os valores (em percentual) de cada índice
+            taxa: percentual aplicado sobre o índice (ex.: 130 (130% do cdi))
+            taxaPrefixadaDiaria: taxa diária (em percentual) somada a cada índice
+            arredondamentoDiario: se verdadeiro arredonda o saldo para 2 casas decimais a cada dia
+            (somente motor vetorizado, o motor iterativo sempre arredonda)
+            detalhe: nível de detalhe da evolução do saldo retornada (ver TipoDetalhe)
+        Retorno:
+            Tupla contendo o saldo bruto final (Decimal) e a lista da evolução do saldo.
+        """
+        evolucao = []
+        valSaldoBruto = cls.consumir(cls.gerar(motor, valInicial, datas, indices, taxa, taxaPrefixadaDiaria, arredondamentoDiario, detalhe), evolucao.append)
+        return valSaldoBruto, evolucao
+
+    @classmethod
+    def gerar(cls, motor: str, valInicial: Decimal, datas: list, indices: list, taxa: Decimal, taxaPrefixadaDiaria: Decimal, arredondamentoDiario: bool = True, detalhe: str = 'diario'):
+        """Retorna um generator que produz a evolução do saldo (um dictionary por posição incluída de acordo com o 
+        nível de detalhe) à medida que os índices são aplicados, permitindo transmitir a evolução sem materializá-la. 
+        O saldo bruto final é o valor de retorno do generator (ver consumir). Mesmos argumentos de compor.
+        """
+        if motor == TipoMotor.VETORIZADO.value:
+            return cls.gerar_vetorizado(valInicial, datas, indices, taxa, taxaPrefixadaDiaria, arredondamentoDiario, detalhe)
+        elif motor == TipoMotor.ITERATIVO.value:
+            return cls.gerar_iterativo(valInicial, datas, indices, taxa, taxaPrefixadaDiaria, detalhe)
+        else:
+            raise ValueError('Motor de cálculo inválido [{0}]. Motores esperados: {1}.'.format(motor, TipoMotor.values()))
+
+    @classmethod
+    def consumir(cls, gerador, destino):
+        """Percorre o generator de evolução do saldo entregando cada item ao destino informado.
+
+        Argumentos:
+            gerador: generator retornado por gerar, gerar_iterativo ou gerar_vetorizado
+            destino: função chamada com cada item da evolução (ex.: lista.append)
+        Retorno:
+            Saldo bruto final (valor de retorno do generator).
+        """
+        while True:
+            try:
+                item = next(gerador)
+            except StopIteration as fim:
+                return fim.value
+            destino(item)
+
+    @classmethod
+    def posicoes_detalhe(cls, datas: list, detalhe: str):
+        """Retorna as posições da série de datas que compõem a evolução do saldo de acordo com o nível de detalhe.
+
+        Argumentos:
+            datas: lista ordenada com as datas de referência de cada índice
+            detalhe: nível de detalhe (ver TipoDetalhe)
+        Retorno:
+            Lista com as posições: todas (diario), o último dia de cada mês (mensal) ou nenhuma (none).
+        """
+        if detalhe == TipoDetalhe.DIARIO.value:
+            return list(range(len(datas)))
+        elif detalhe == TipoDetalhe.MENSAL.value:
+            ultimaPosicao = len(datas) - 1
+            return [posicao for posicao in range(len(datas)) if posicao == ultimaPosicao or datas[posicao + 1].month != datas[posicao].month]
+        elif detalhe == TipoDetalhe.NONE.value:
+            return []
+        else:
+            raise ValueError('Detalhe inválido [{0}]. Valores esperados: {1}.'.format(detalhe, TipoDetalhe.values()))
+
+    @classmethod
+    def gerar_iterativo(cls, valInicial: Decimal, datas: list, indices: list, taxa: Decimal, taxaPrefixadaDiaria: Decimal, detalhe: str = 'diario'):
+        """Generator do motor iterativo (motor de cálculo original): aplica os índices um a um sobre o valor 
+        inicial, arredondando o saldo para 2 casas decimais a cada dia. Produz a evolução do saldo dia a dia e 
+        retorna o saldo bruto final. Argumentos: ver compor.
+        """
+        # Posições da série a serem incluídas na evolução do saldo (todas quando detalhe diário)
+        posicoes = None if detalhe == TipoDetalhe.DIARIO.value else set(cls.posicoes_detalhe(datas, detalhe))
+
+        # Operações realizadas explicitamente no contexto dos cálculos financeiros (o generator pode ser 
+        # intercalado com outros processamentos da thread entre um item e outro)
+        contexto = CONTEXTO
+        percTaxa = contexto.divide(taxa, Decimal(100))
+
+        valSaldoBruto = valInicial
+        for posicao, (dtReferencia, valIndice) in enumerate(zip(datas, indices)):
+            valIndice = Decimal(valIndice)
+            # Se taxa em relação ao índice foi informada aplica sobre o índice obtido
+            if taxa > Decimal(0):
+                valIndice = contexto.multiply(valIndice, percTaxa)
+            # Majora a taxa do índice com o valor prefixado
+            valIndice = contexto.add(valIndice, taxaPrefixadaDiaria)
+            # Atualizado Saldo Bruto do investimento
+            valSaldoBruto = contexto.multiply(valSaldoBruto, contexto.add(1, contexto.divide(valIndice, Decimal(100))))
+            valSaldoBruto = Decimal(round(float(valSaldoBruto),2))
+            if posicoes is None or posicao in posicoes:
+                yield {'dtReferencia': dtReferencia, 'valIndice': float(valIndice), 'valSaldoBruto': float(valSaldoBruto)}
+
+        return valSaldoBruto
+
+    @classmethod
+    def gerar_vetorizado(cls, valInicial: Decimal, datas: list, indices: list, taxa: Decimal, taxaPrefixadaDiaria: Decimal, arredondamentoDiario: bool = True, detalhe: str = 'diario'):
+        """Generator do motor vetorizado: produz a evolução do saldo e retorna o saldo bruto final. Argumentos: 
+        ver compor.
+
+        Sem arredondamento diário o saldo de cada dia é obtido em lote (numpy) pelo produto acumulado dos fatores 
+        diários e apenas os dictionaries da evolução são produzidos sob demanda. Com arredondamento diário o saldo 
+        de um dia depende do saldo arredondado do dia anterior: a recorrência continua dia a dia em Decimal (sem 
+        uso do numpy) e apenas os fatores diários são calculados uma única vez por valor distinto de índice, com 
+        resultado idêntico ao do motor iterativo.
+        """
+        # Posições da série a serem incluídas na evolução do saldo
+        posicoes = cls.posicoes_detalhe(datas, detalhe)
+        if len(indices) == 0:
+            return valInicial
+
+        # Operações realizadas explicitamente no contexto dos cálculos financeiros (ver gerar_iterativo)
+        contexto = CONTEXTO
+
+        if arredondamentoDiario:
+            # Calcula o índice ajustado e o fator diário uma única vez por valor distinto de índice
+            percTaxa = contexto.divide(taxa, Decimal(100))
+            fatoresCalculados = {}
+            for valIndice in indices:
+                if valIndice not in fatoresCalculados:
+                    valIndiceAjustado = Decimal(valIndice)
+                    if taxa > Decimal(0):
+                        valIndiceAjustado = contexto.multiply(valIndiceAjustado, percTaxa)
+                    valIndiceAjustado = contexto.add(valIndiceAjustado, taxaPrefixadaDiaria)
+                    fatoresCalculados[valIndice] = (float(valIndiceAjustado), contexto.add(1, contexto.divide(valIndiceAjustado, Decimal(100))))
+            fatores = [fatoresCalculados[valIndice] for valIndice in indices]
+            # Aplica a recorrência com arredondamento diário
+            valSaldoBruto = valInicial
+            if len(posicoes) == len(datas):
+                for dtReferencia, (valIndice, fator) in zip(datas, fatores):
+                    valSaldoBruto = Decimal(round(float(contexto.multiply(valSaldoBruto, fator)),2))
+                    yield {'dtReferencia': dtReferencia, 'valIndice': valIndice, 'valSaldoBruto': float(valSaldoBruto)}
+            else:
+                # Produz somente os saldos das posições incluídas na evolução
+                posicoesEvolucao = set(posicoes)
+                for posicao, (valIndice, fator) in enumerate(fatores):
+                    valSaldoBruto = Decimal(round(float(contexto.multiply(valSaldoBruto, fator)),2))
+                    if posicao in posicoesEvolucao:
+                        yield {'dtReferencia': datas[posicao], 'valIndice': valIndice, 'valSaldoBruto': float(valSaldoBruto)}
+        else:
+            # Converte a série de índices para um array e aplica taxa e taxa prefixada em lote
+            arrIndices = numpy.fromiter(map(float, indices), dtype=numpy.float64, count=len(indices))
+            if taxa > Decimal(0):
+                arrIndices = arrIndices * (float(taxa) / 100.0)
+            arrIndices = arrIndices + float(taxaPrefixadaDiaria)
+            arrFatores = 1.0 + (arrIndices / 100.0)
+            if len(posicoes) == 0:
+                # Sem evolução basta o produto dos fatores diários (mesma ordem de multiplicação do produto acumulado)
+                valSaldoBruto = Decimal(round(float(float(valInicial) * numpy.cumprod(arrFatores)[-1]),2))
+            else:
+                # Saldo de cada dia obtido pelo produto acumulado dos fatores diários
+                arrSaldos = float(valInicial) * numpy.cumprod(arrFatores)
+                valSaldoBruto = Decimal(round(float(arrSaldos[-1]),2))
+                arrPosicoes = numpy.array(posicoes, dtype=numpy.intp)
+                for posicao, valIndice, saldo in zip(posicoes, arrIndices[arrPosicoes].tolist(), arrSaldos[arrPosicoes].tolist()):
+                    yield {'dtReferencia': datas[posicao], 'valIndice': valIndice, 'valSaldoBruto': saldo}
+
+        return valSaldoBruto
+
+# Enum de níveis de detalhe da evolução do saldo
+class TipoDetalhe(Enum):
+    ''' Enum que define os níveis de detalhe da evolução do saldo retornada no cálculo de investimento
+    '''
+    NONE = 'none'
+    MENSAL = 'mensal'
+    DIARIO = 'diario'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+	        lista.append(item.value)
+        lista.sort()
+        return lista
+
+# Enum de motores de cálculo disponíveis
+class TipoMotor(Enum):
+    ''' Enum que define os motores de cálculo disponíveis para cálculo de investimento
+    '''
+    ITERATIVO = 'iterativo'
+    VETORIZADO = 'vetorizado'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+	        lista.append(item.value)
+        lista.sort()
+        return lista
@@ -0,0 +1,154 @@
+# Importa classe para Enumeradores
+from enum import Enum
+# Importa módulos para execução em paralelo (processos) e controle de concorrência
+from concurrent.futures import ProcessPoolExecutor
+import os
+import threading
+# Importa o módulo para cálculos vetorizados
+import numpy
+# Importa o módulo de log
+import logging
+# Importa a classe base
+from negocio.baseobject import BaseObject
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Classe Projecao')
+logger.setLevel(logging.INFO)
+
+# Quantidade de cenários simulados por tarefa. Cada bloco possui sua própria semente (derivada da semente da
+# simulação), de modo que o resultado não depende da quantidade de processos utilizados
+TAMANHO_BLOCO = 1000
+# Quantidade de dias úteis mais recentes da série histórica utilizados na simulação (~5 anos)
+JANELA_HISTORICA = 1260
+# Quantidade mínima de valores (cenários x dias) a partir da qual a simulação é distribuída entre processos
+MIN_VALORES_PARALELO = 2000000
+
+# Pool de processos da simulação (criado na primeira simulação paralela do processo, somente com
+# PROJECAO_PROCESSOS maior que 1)
+_executor = None
+_pidExecutor = None
+_qtdProcessosExecutor = None
+_lockExecutor = threading.Lock()
+
+class Projecao(BaseObject):
+    """Classe que concentra a simulação de Monte Carlo dos índices futuros de um indexador: cada cenário é uma
+    trajetória de índices diários (um por dia útil projetado) aplicada sobre o saldo conhecido do investimento.
+    """
+    # Método criador
+    def __init__(self):
+        return None
+
+    @classmethod
+    def simular(cls, modelo: str, historico, qtdCenarios: int, qtdDias: int, taxa: float, taxaPrefixadaDiaria: float,
+                valSaldoInicial: float, semente: int, qtdProcessos: int = 1):
+        """Simula os saldos brutos finais de um investimento a partir dos índices históricos do indexador.
+
+        Argumentos:
+            modelo: modelo de geração dos índices futuros (ver TipoModeloProjecao):
+                bootstrap: índices sorteados (com reposição) da série histórica
+                reversao-media: processo autorregressivo (Ornstein-Uhlenbeck discreto) com média, velocidade
+                de reversão e volatilidade estimadas na série histórica, iniciado no último índice conhecido
+            historico: valores (em percentual) dos índices diários mais recentes do indexador
+            qtdCenarios: quantidade de trajetórias simuladas
+            qtdDias: quantidade de dias úteis projetados
+            taxa: percentual aplicado sobre o índice (ex.: 120 (120% do cdi))
+            taxaPrefixadaDiaria: taxa diária (em percentual) somada a cada índice
+            valSaldoInicial: saldo bruto no início da projeção
+            semente: semente da simulação (mesma semente e parâmetros produzem os mesmos saldos)
+            qtdProcessos: quantidade máxima de processos utilizados na simulação
+        Retorno:
+            Array numpy com o saldo bruto final de cada cenário.
+        """
+        historico = numpy.asarray(historico, dtype=numpy.float64)
+        if modelo == TipoModeloProjecao.BOOTSTRAP.value:
+            parametros = (numpy.log1p((historico * (taxa / 100.0) + taxaPrefixadaDiaria) / 100.0),)
+        elif modelo == TipoModeloProjecao.REVERSAO_MEDIA.value:
+            parametros = cls.estimar_reversao_media(historico) + (float(historico[-1]), taxa, taxaPrefixadaDiaria)
+        else:
+            raise ValueError('Modelo de projeção inválido [{0}]. Modelos esperados: {1}.'.format(modelo, TipoModeloProjecao.values()))
+
+        # Divide os cenários em blocos com sementes independentes
+        qtdBlocos = -(-qtdCenarios // TAMANHO_BLOCO)
+        sementes = numpy.random.SeedSequence(semente).spawn(qtdBlocos)
+        tarefas = [(modelo, parametros, min(TAMANHO_BLOCO, qtdCenarios - bloco * TAMANHO_BLOCO), qtdDias, sementes[bloco])
+                   for bloco in range(qtdBlocos)]
+        if qtdProcessos > 1 and qtdBlocos > 1 and qtdCenarios * qtdDias >= MIN_VALORES_PARALELO:
+            logFatores = list(_get_executor(qtdProcessos).map(_simular_bloco, tarefas))
+        else:
+            logFatores = list(map(_simular_bloco, tarefas))
+        return valSaldoInicial * numpy.exp(numpy.concatenate(logFatores))
+
+    @classmethod
+    def estimar_reversao_media(cls, historico):
+        """Estima os parâmetros do processo autorregressivo x(t+1) = media + phi * (x(t) - media) + volatilidade * e(t)
+        por mínimos quadrados sobre a série histórica.
+
+        Retorno:
+            Tupla contendo a média de longo prazo, o coeficiente phi (1 - velocidade de reversão) e a volatilidade.
+        """
+        anteriores = historico[:-1]
+        posteriores = historico[1:]
+        media = float(historico.mean())
+        variancia = float(((anteriores - media) ** 2).sum())
+        phi = float(((anteriores - media) * (posteriores - media)).sum() / variancia) if variancia > 0 else 0.0
+        # Limita phi ao intervalo estacionário
+        phi = min(max(phi, 0.0), 0.999)
+        residuos = posteriores - (media + phi * (anteriores - media))
+        volatilidade = float(residuos.std())
+        return media, phi, volatilidade
+
+def _simular_bloco(tarefa: tuple):
+    """Simula um bloco de cenários e retorna a soma dos logaritmos dos fatores diários de cada cenário.
+    Função do módulo (e não método) para ser executada nos processos do pool.
+    """
+    modelo, parametros, qtdCenarios, qtdDias, semente = tarefa
+    gerador = numpy.random.default_rng(semente)
+    if modelo == TipoModeloProjecao.BOOTSTRAP.value:
+        logFatoresHistoricos, = parametros
+        sorteados = gerador.integers(0, len(logFatoresHistoricos), size=(qtdCenarios, qtdDias))
+        return logFatoresHistoricos[sorteados].sum(axis=1)
+    media, phi, volatilidade, valorInicial, taxa, taxaPrefixadaDiaria = parametros
+    # Desvios em relação à média: d(t) = phi * d(t-1) + volatilidade * e(t), calculados sobre o próprio array
+    # de choques (uma linha por dia), com a recorrência dia a dia vetorizada entre os cenários do bloco
+    desvios = gerador.standard_normal(size=(qtdDias, qtdCenarios))
+    desvios *= volatilidade
+    desvios[0] += phi * (valorInicial - media)
+    anterior = numpy.empty(qtdCenarios)
+    for dia in range(1, qtdDias):
+        numpy.multiply(desvios[dia - 1], phi, out=anterior)
+        desvios[dia] += anterior
+    desvios += media
+    return numpy.log1p((desvios * (taxa / 100.0) + taxaPrefixadaDiaria) / 100.0).sum(axis=0)
+
+def _get_executor(qtdProcessos: int):
+    """Retorna o pool de processos da simulação, criando-o na primeira chamada do processo (ou após fork).
+    Utilizado somente quando a quantidade de processos é configurada explicitamente acima de 1 (ver
+    PROJECAO_PROCESSOS em config.py, inclusive as restrições de fork a partir de workers com múltiplas threads).
+    """
+    global _executor, _pidExecutor, _qtdProcessosExecutor
+    pid = os.getpid()
+    if _executor is None or _pidExecutor != pid or _qtdProcessosExecutor != qtdProcessos:
+        with _lockExecutor:
+            if _executor is None or _pidExecutor != pid or _qtdProcessosExecutor != qtdProcessos:
+                if _executor is not None and _pidExecutor == pid:
+                    _executor.shutdown(wait=False)
+                _executor = ProcessPoolExecutor(max_workers=qtdProcessos)
+                _pidExecutor = pid
+                _qtdProcessosExecutor = qtdProcessos
+                logger.info('Pool de processos da projeção criado. Qtd. processos: {}'.format(qtdProcessos))
+    return _executor
+
+# Enum de modelos de projeção dos índices futuros
+class TipoModeloProjecao(Enum):
+    ''' Enum que define os modelos de geração dos índices futuros na projeção de investimentos
+    '''
+    BOOTSTRAP = 'bootstrap'
+    REVERSAO_MEDIA = 'reversao-media'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+	        lista.append(item.value)
+        lista.sort()
+        return lista
@@ -0,0 +1,173 @@
+# Importanto módulo para tratamento de números decimais
+from decimal import Decimal
+# Importa classe para Enumeradores
+from enum import Enum
+# Importa módulo pra tratamento de arquivos json
+import json
+# Importa módulos para manipulação de caminhos de arquivos e controle de concorrência
+import os
+import threading
+# Importa o módulo para cálculos vetorizados
+import numpy
+# Importa o módulo de log
+import logging
+# Importa a classe base
+from negocio.baseobject import BaseObject
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Classe Tributacao')
+logger.setLevel(logging.INFO)
+
+# Arquivo com as tabelas regressivas de imposto de renda e IOF e os tipos de investimento isentos
+ARQUIVO_TRIBUTACAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'json', 'tributacao.json')
+
+class Tributacao(BaseObject):
+    """Classe que concentra os tributos sobre o rendimento dos investimentos (imposto de renda e IOF).
+
+    As faixas de cada tributo (percentual até a quantidade de dias corridos da faixa) são carregadas do arquivo
+    de tributação e convertidas em tabelas com o percentual de cada quantidade de dias corridos, de modo que
+    o percentual de um prazo é obtido por acesso direto à tabela e os tributos de arrays inteiros de
+    rendimentos (ex.: todas as datas de resgate de um investimento) são calculados de uma única vez.
+    """
+    # Tabelas em memória (carregadas uma única vez por processo):
+    #   _percentuais: por tributo, array com o percentual de cada qtd. de dias corridos (a última posição
+    #   vale para todos os prazos maiores)
+    #   _percentuaisDecimal: por tributo, lista com os mesmos percentuais em Decimal, construídos a partir do
+    #   texto do arquivo (sem conversão via float), utilizada no cálculo de um único investimento
+    #   _isentos: por tributo, tipos de investimento isentos
+    _percentuais = None
+    _percentuaisDecimal = None
+    _isentos = None
+    _lock = threading.Lock()
+
+    # Método criador
+    def __init__(self):
+        return None
+
+    @classmethod
+    def carregarTabelas(cls, arquivo: str = ARQUIVO_TRIBUTACAO):
+        """Carrega em memória as tabelas de tributação a partir do arquivo de tributação.
+        A carga é realizada uma única vez por processo, chamadas subsequentes não têm efeito.
+
+        Argumentos:
+            - arquivo: caminho do arquivo JSON de tributação (padrão: static/json/tributacao.json)
+        """
+        if cls._percentuais is not None:
+            return
+        with cls._lock:
+            if cls._percentuais is not None:
+                return
+            with open(arquivo, encoding='utf8') as f:
+                dados = json.load(f, parse_float=Decimal)
+            percentuais = {}
+            percentuaisDecimal = {}
+            isentos = {}
+            for tributo in TipoTributo.values():
+                faixas = dados[tributo]['faixas']
+                # Faixas em ordem crescente de prazo, a última sem prazo final (ate_dias nulo)
+                limites = [faixa['ate_dias'] for faixa in faixas[:-1]]
+                if faixas[-1]['ate_dias'] is not None or limites != sorted(limites):
+                    raise ValueError('Tributacao: faixas do tributo {} devem estar em ordem crescente de prazo e a última sem prazo final'.format(tributo))
+                tabela = numpy.empty((limites[-1] if limites else 0) + 2)
+                tabelaDecimal = [None] * len(tabela)
+                inicio = 0
+                for faixa in faixas:
+                    fim = len(tabela) if faixa['ate_dias'] is None else faixa['ate_dias'] + 1
+                    percentual = Decimal(faixa['percentual'])
+                    tabela[inicio:fim] = float(percentual)
+                    tabelaDecimal[inicio:fim] = [percentual] * (fim - inicio)
+                    inicio = fim
+                percentuais[tributo] = tabela
+                percentuaisDecimal[tributo] = tabelaDecimal
+                isentos[tributo] = frozenset(tipo.lower() for tipo in dados[tributo]['isentos'])
+            logger.info("Tabelas de tributação carregadas em memória. Tributos: {}".format(TipoTributo.values()))
+            cls._isentos = isentos
+            cls._percentuaisDecimal = percentuaisDecimal
+            cls._percentuais = percentuais
+
+    @classmethod
+    def isento(cls, tributo: str, tipoInvestimento: str):
+        """Indica se o tipo de investimento é isento do tributo (ver TipoTributo).
+        """
+        cls.carregarTabelas()
+        return tipoInvestimento is not None and tipoInvestimento.lower() in cls._isentos[tributo]
+
+    @classmethod
+    def percentuais(cls, tributo: str, qtdDiasCorridos, tipoInvestimento: str = None):
+        """Retorna os percentuais do tributo para as quantidades de dias corridos informadas.
+
+        Argumentos:
+            tributo: tributo (ver TipoTributo). Ex.: impostoRenda, iof
+            qtdDiasCorridos: quantidade (int) ou array numpy de quantidades de dias corridos do investimento
+            tipoInvestimento: (opcional) tipo de investimento, percentual zero quando isento do tributo
+        Retorno:
+            Percentual (float) ou array numpy com o percentual de cada quantidade de dias corridos.
+        """
+        cls.carregarTabelas()
+        tabela = cls._percentuais[tributo]
+        if cls.isento(tributo, tipoInvestimento):
+            tabela = numpy.zeros(1)
+        percentuais = tabela[numpy.minimum(numpy.maximum(qtdDiasCorridos, 0), len(tabela) - 1)]
+        return float(percentuais) if numpy.ndim(percentuais) == 0 else percentuais
+
+    @classmethod
+    def percentualDecimal(cls, tributo: str, qtdDiasCorridos: int, tipoInvestimento: str = None):
+        """Retorna o percentual (Decimal) do tributo para a quantidade de dias corridos informada, obtido da
+        tabela Decimal construída a partir do arquivo de tributação (sem conversão via float).
+
+        Argumentos:
+            tributo: tributo (ver TipoTributo). Ex.: impostoRenda, iof
+            qtdDiasCorridos: quantidade de dias corridos do investimento
+            tipoInvestimento: (opcional) tipo de investimento, percentual zero quando isento do tributo
+        """
+        cls.carregarTabelas()
+        if cls.isento(tributo, tipoInvestimento):
+            return Decimal(0)
+        tabela = cls._percentuaisDecimal[tributo]
+        return tabela[min(max(int(qtdDiasCorridos), 0), len(tabela) - 1)]
+
+    @classmethod
+    def percImpostoRenda(cls, qtdDiasCorridos: int, tipoInvestimento: str = None):
+        """Retorna o percentual (Decimal) de imposto de renda aplicável à quantidade de dias corridos do investimento.
+        """
+        return cls.percentualDecimal(TipoTributo.IMPOSTO_RENDA.value, qtdDiasCorridos, tipoInvestimento)
+
+    @classmethod
+    def percIOF(cls, qtdDiasCorridos: int, tipoInvestimento: str = None):
+        """Retorna o percentual (Decimal) de IOF aplicável à quantidade de dias corridos do investimento.
+        """
+        return cls.percentualDecimal(TipoTributo.IOF.value, qtdDiasCorridos, tipoInvestimento)
+
+    @classmethod
+    def aplicar(cls, tipoInvestimento: str, rendimentos, qtdDiasCorridos):
+        """Calcula em lote os tributos sobre rendimentos brutos. O IOF incide sobre o rendimento positivo e o
+        imposto de renda sobre o rendimento positivo descontado o IOF.
+
+        Argumentos:
+            tipoInvestimento: tipo de investimento (ex.: cdb, lci, poupanca)
+            rendimentos: array numpy com os rendimentos brutos (valores ou rentabilidades, ex.: 0.05 para 5%)
+            qtdDiasCorridos: quantidade de dias corridos (int) de todos os rendimentos ou array numpy com a
+            quantidade de dias corridos de cada rendimento (ex.: cada data de resgate)
+        Retorno:
+            Tupla contendo os arrays numpy de IOF, imposto de renda e rendimento líquido.
+        """
+        rendimentos = numpy.asarray(rendimentos, dtype=numpy.float64)
+        baseCalculo = numpy.maximum(rendimentos, 0.0)
+        valIOF = baseCalculo * (cls.percentuais(TipoTributo.IOF.value, qtdDiasCorridos, tipoInvestimento) / 100.0)
+        valImpostoRenda = (baseCalculo - valIOF) * (cls.percentuais(TipoTributo.IMPOSTO_RENDA.value, qtdDiasCorridos, tipoInvestimento) / 100.0)
+        return valIOF, valImpostoRenda, rendimentos - valIOF - valImpostoRenda
+
+# Enum de tributos sobre o rendimento dos investimentos
+class TipoTributo(Enum):
+    ''' Enum que define os tributos incidentes sobre o rendimento dos investimentos
+    '''
+    IMPOSTO_RENDA = 'impostoRenda'
+    IOF = 'iof'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+	        lista.append(item.value)
+        lista.sort()
+        return lista
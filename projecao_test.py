@@ -0,0 +1,32 @@
+import numpy
+
+from negocio.projecao import Projecao
+
+
+def test_historico_constante_equivale_ao_calculo_deterministico():
+    historico = [0.04] * 300
+    esperado = 1000.0 * (1 + 0.04 * 1.2 / 100) ** 500
+    for modelo in ('bootstrap', 'reversao-media'):
+        saldos = Projecao.simular(modelo, historico, 1500, 500, 120.0, 0.0, 1000.0, semente=1)
+        assert len(saldos) == 1500
+        assert numpy.allclose(saldos, esperado, rtol=1e-12)
+
+
+def test_projecao_reproduzivel_pela_semente(app_memoria, monkeypatch):
+    # Configuração padrão: simulação no próprio processo, sem pool de processos
+    def sem_pool(qtdProcessos):
+        raise AssertionError('pool de processos criado sem configuração explícita')
+    monkeypatch.setattr('negocio.projecao._get_executor', sem_pool)
+    client = app_memoria().test_client()
+    url = ('/api/investimento/projecao?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi&taxa=100'
+           '&dataInicial=2020-01-02&dataFinal=2070-01-02&cenarios=2000&modelo=reversao-media&semente=42')
+    projecao = client.get(url).get_json()['body']['projecaoInvestimento']
+    assert projecao['semente'] == 42 and projecao['qtdCenarios'] == 2000
+    saldos = [percentil['valSaldoLiquido'] for percentil in projecao['percentis']]
+    assert saldos == sorted(saldos) and saldos[0] < saldos[-1]
+    # Imposto de renda descontado do rendimento de cada cenário
+    assert all(percentil['valSaldoLiquido'] < percentil['valSaldoBruto'] for percentil in projecao['percentis'])
+    assert client.get(url).get_json()['body']['projecaoInvestimento']['percentis'] == projecao['percentis']
+
+    r = client.get(url.replace('dataFinal=2070-01-02', 'dataFinal=2020-06-01'))
+    assert r.status_code == 400 and r.get_json()['body']['BusinessException']['codigo'] == 'BE017'
@@ -0,0 +1,23 @@
+import json
+
+from utils.helper import TAMANHO_BLOCO_STREAM
+
+
+def test_formatos_transmitidos_em_partes(app_memoria):
+    client = app_memoria(CACHE_INVESTIMENTOS_MAX_BYTES=0).test_client()
+    url = ('/api/investimento?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi&taxa=100'
+           '&dataInicial=2019-01-02&dataFinal=2021-01-04')
+    resposta = client.get(url).get_json()
+    evolucao = resposta['body']['resultadoInvestimento']['evolucao']
+    assert len(evolucao) > TAMANHO_BLOCO_STREAM
+
+    # NDJSON: um JSON por linha (cabeçalho, itens da evolução e resultado), sem linhas vazias entre os blocos
+    linhas = client.get(url + '&formato=ndjson').get_data(as_text=True).split('\n')
+    assert linhas[-1] == ''
+    registros = [json.loads(linha) for linha in linhas[:-1]]
+    assert len(registros) == len(evolucao) + 2
+    assert registros[1:-1] == evolucao
+    assert registros[-1]['resultadoInvestimento']['valSaldoBruto'] == resposta['body']['resultadoInvestimento']['valSaldoBruto']
+
+    # json-stream: mesmo JSON da resposta json
+    assert json.loads(client.get(url + '&formato=json-stream').get_data(as_text=True)) == resposta
@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from negocio.investimento import Investimento
+
+
+def test_taxa_reproduz_saldo_liquido_alvo(app_memoria):
+    client = app_memoria(CACHE_INVESTIMENTOS_MAX_BYTES=0).test_client()
+    investimento = {'tipoInvestimento': 'cdb', 'tipoRendimento': 'pos', 'valor': 1000, 'indexador': 'cdi',
+                    'dataInicial': '2019-01-02', 'dataFinal': '2021-01-04'}
+    r = client.post('/api/investimento/taxa-equilibrio', json={'investimento': investimento, 'valSaldoLiquidoAlvo': 1100})
+    assert r.status_code == 200
+    taxaEquilibrio = r.get_json()['body']['taxaEquilibrio']
+    assert taxaEquilibrio['variavel'] == 'taxa'
+    assert 1100 <= taxaEquilibrio['resultadoInvestimento']['valSaldoLiquido'] < 1100.1
+
+    # Taxa inferior não atinge o saldo alvo (o saldo do motor varia em centavos a cada ~0,01% de taxa)
+    taxaInferior = Decimal(str(taxaEquilibrio['valor'])) - Decimal('0.1')
+    url = ('/api/investimento?tipoInvestimento=cdb&tipoRendimento=pos&valor=1000&indexador=cdi&taxa={}'
+           '&dataInicial=2019-01-02&dataFinal=2021-01-04&detalhe=none').format(taxaInferior)
+    assert client.get(url).get_json()['body']['resultadoInvestimento']['valSaldoLiquido'] < 1100
+
+    r = client.post('/api/investimento/taxa-equilibrio', json={'investimento': investimento, 'valSaldoLiquidoAlvo': 900})
+    assert r.status_code == 400 and r.get_json()['body']['BusinessException']['codigo'] == 'BE019'
+
+
+def test_taxa_equivalente_ao_investimento_de_referencia(app_memoria):
+    client = app_memoria(CACHE_INVESTIMENTOS_MAX_BYTES=0).test_client()
+    periodo = {'valor': 1000, 'dataInicial': '2019-01-02', 'dataFinal': '2021-01-04'}
+    referencia = dict(periodo, tipoInvestimento='lci', tipoRendimento='pos', indexador='cdi', taxa=95)
+    for investimento, variavel in ((dict(periodo, tipoInvestimento='cdb', tipoRendimento='pos', indexador='cdi'), 'taxa'),
+                                   (dict(periodo, tipoInvestimento='cdb', tipoRendimento='pre'), 'taxaPrefixada')):
+        r = client.post('/api/investimento/taxa-equilibrio', json={'investimento': investimento, 'investimentoReferencia': referencia})
+        assert r.status_code == 200
+        taxaEquilibrio = r.get_json()['body']['taxaEquilibrio']
+        valReferencia = taxaEquilibrio['resultadoReferencia']['valSaldoLiquido']
+        assert taxaEquilibrio['variavel'] == variavel and taxaEquilibrio['valSaldoLiquidoAlvo'] == valReferencia
+        assert 0 <= taxaEquilibrio['resultadoInvestimento']['valSaldoLiquido'] - valReferencia < 0.1
+    # Imposto de renda do CDB exige taxa maior que a da LCI isenta
+    r = client.post('/api/investimento/taxa-equilibrio', json={'investimento': dict(periodo, tipoInvestimento='cdb', tipoRendimento='pos', indexador='cdi'), 'investimentoReferencia': referencia})
+    assert r.get_json()['body']['taxaEquilibrio']['valor'] > 95
+
+
+def test_taxa_minima_em_periodos_longos_e_curtos(app_memoria):
+    client = app_memoria(CACHE_INVESTIMENTOS_MAX_BYTES=0).test_client()
+    pos = {'tipoInvestimento': 'cdb', 'tipoRendimento': 'pos', 'valor': 1000, 'indexador': 'cdi'}
+    pre = {'tipoInvestimento': 'cdb', 'tipoRendimento': 'pre', 'valor': 1000}
+    hibrido = {'tipoInvestimento': 'cdb', 'tipoRendimento': 'hibrido', 'valor': 1000, 'indexador': 'cdi', 'taxaPrefixada': 5}
+    casos = ((dict(pre, dataInicial='2001-01-02', dataFinal='2078-12-01'), 'taxaPrefixada', 1050),
+             (dict(hibrido, dataInicial='2019-01-02', dataFinal='2019-03-01'), 'taxa', 1500),
+             (dict(pos, dataInicial='2015-01-02', dataFinal='2030-01-02'), 'taxa', 1050),
+             (dict(pos, dataInicial='2019-01-02', dataFinal='2019-03-01'), 'taxa', 1001))
+    for investimento, variavel, alvo in casos:
+        r = client.post('/api/investimento/taxa-equilibrio', json={'investimento': investimento, 'variavel': variavel, 'valSaldoLiquidoAlvo': alvo})
+        assert r.status_code == 200
+        taxaEquilibrio = r.get_json()['body']['taxaEquilibrio']
+        assert taxaEquilibrio['resultadoInvestimento']['valSaldoLiquido'] >= alvo
+
+        # Valor imediatamente inferior (0,0001) não atinge o saldo alvo
+        parametros = dict(investimento, detalhe='none')
+        parametros[variavel] = str(Decimal(str(taxaEquilibrio['valor'])) - Decimal('0.0001'))
+        assert client.get('/api/investimento', query_string=parametros).get_json()['body']['resultadoInvestimento']['valSaldoLiquido'] < alvo
+
+    # Saldo alvo inatingível com a variável no limite
+    r = client.post('/api/investimento/taxa-equilibrio', json={'investimento': dict(pos, dataInicial='2019-01-02', dataFinal='2019-03-01'), 'valSaldoLiquidoAlvo': 5000})
+    assert r.status_code == 400 and r.get_json()['body']['BusinessException']['codigo'] == 'BE019'
+
+
+def test_investimento_inalterado_quando_a_busca_e_interrompida(app_memoria, monkeypatch):
+    calcular_investimento = Investimento.calcular_investimento
+    qtdCalculos = []
+    def calcular_com_falha(objInvest, *args, **kwargs):
+        qtdCalculos.append(objInvest.taxa)
+        if len(qtdCalculos) == 3:
+            raise RuntimeError('falha no cálculo')
+        return calcular_investimento(objInvest, *args, **kwargs)
+    monkeypatch.setattr(Investimento, 'calcular_investimento', calcular_com_falha)
+
+    objInvest = Investimento('cdb', 'pos', Decimal(1000), 'cdi', Decimal(100), Decimal(0), date(2019, 1, 2), date(2021, 1, 4))
+    with app_memoria().app_context():
+        with pytest.raises(RuntimeError):
+            objInvest.resolver_taxa('taxa', Decimal(1100))
+        assert len(set(qtdCalculos)) == 3 and objInvest.taxa == 100 and objInvest.valSaldoLiquido == 0
+
+        # Concluída a busca, o investimento contém o valor encontrado e os resultados correspondentes
+        monkeypatch.setattr(Investimento, 'calcular_investimento', calcular_investimento)
+        taxaEquilibrio = objInvest.resolver_taxa('taxa', Decimal(1100))
+    assert objInvest.taxa == taxaEquilibrio['valor'] and objInvest.valSaldoLiquido >= 1100
@@ -0,0 +1,40 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy
+
+from negocio.investimento import Investimento
+from negocio.tributacao import Tributacao
+
+
+def test_faixas_e_aplicacao_em_lote():
+    assert [Tributacao.percImpostoRenda(dias) for dias in (0, 180, 181, 360, 361, 720, 721, 10000)] == \
+           [Decimal('22.5'), Decimal('22.5'), 20, 20, Decimal('17.5'), Decimal('17.5'), 15, 15]
+    assert [Tributacao.percIOF(dias) for dias in (1, 2, 29, 30, 365)] == [96, 93, 3, 0, 0]
+    assert Tributacao.percImpostoRenda(100, 'lci') == 0 and Tributacao.percIOF(10, 'poupanca') == 0
+    # Percentuais Decimal construídos a partir do texto do arquivo, sem conversão via float
+    assert str(Tributacao.percImpostoRenda(0)) == '22.5' and str(Tributacao.percIOF(1)) == '96'
+    objInvest = Investimento('lci', 'pre', Decimal(1000), None, Decimal(100), Decimal(10), date(2019, 3, 1), date(2019, 3, 11))
+    assert objInvest.obterPercIR(100) == 0
+    assert Investimento('cdb', 'pre', Decimal(1000), None, Decimal(100), Decimal(10), date(2019, 3, 1), date(2019, 3, 11)).obterPercIR(100) == Decimal('22.5')
+
+    # Curva líquida de todas as datas de resgate em uma única chamada igual ao cálculo de cada prazo
+    qtdDiasCorridos = numpy.arange(1, 1000)
+    rendimentos = qtdDiasCorridos * 0.3
+    valIOF, valImpostoRenda, liquidos = Tributacao.aplicar('cdb', rendimentos, qtdDiasCorridos)
+    for dias in (1, 15, 29, 30, 180, 181, 721):
+        iof = dias * 0.3 * float(Tributacao.percIOF(dias)) / 100
+        ir = (dias * 0.3 - iof) * float(Tributacao.percImpostoRenda(dias)) / 100
+        assert numpy.isclose(valIOF[dias - 1], iof) and numpy.isclose(liquidos[dias - 1], dias * 0.3 - iof - ir)
+    # Rendimento negativo não é tributado
+    assert list(Tributacao.aplicar('cdb', numpy.array([-5.0]), 10)[2]) == [-5.0]
+
+
+def test_iof_no_resultado_do_investimento(app_memoria):
+    objInvest = Investimento('cdb', 'pre', Decimal(1000), None, Decimal(100), Decimal(10), date(2019, 3, 1), date(2019, 3, 11))
+    with app_memoria().app_context():
+        objInvest.calcular_investimento(detalhe='none')
+    assert objInvest.percIOF == 66 and objInvest.valIOF > 0
+    valIOF = objInvest.rentabilidadeBruta * Decimal('0.66')
+    assert abs(objInvest.valImpostoRenda - (objInvest.rentabilidadeBruta - valIOF) * Decimal('0.225')) < Decimal('0.0001')
+    assert objInvest.valSaldoLiquido < objInvest.valSaldoBruto
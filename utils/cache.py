@@ -0,0 +1,83 @@
+# Importa módulos para estrutura ordenada, controle de concorrência e tamanho de objetos
+from collections import OrderedDict
+import os
+import sys
+import threading
+
+class CacheLRU(object):
+    """Cache em memória com descarte do item menos recentemente utilizado (LRU) quando a soma dos
+    tamanhos dos itens armazenados ultrapassa a capacidade definida. Seguro entre threads.
+
+    Argumentos:
+        nome: nome identificador do cache (ex.: investimentos)
+        capacidadeBytes: tamanho máximo (em bytes) da soma dos itens armazenados
+    """
+    def __init__(self, nome: str, capacidadeBytes: int):
+        self.nome = nome
+        self.capacidadeBytes = capacidadeBytes
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()
+        self._tamanhoBytes = 0
+        self._qtdAcertos = 0
+        self._qtdFalhas = 0
+        self._qtdDescartes = 0
+
+    def obter(self, chave):
+        """Retorna o item armazenado na chave informada (marcando-o como o mais recentemente utilizado)
+        ou None caso não esteja armazenado.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self._qtdFalhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self._qtdAcertos += 1
+            return item[0]
+
+    def armazenar(self, chave, valor, tamanhoBytes: int = None):
+        """Armazena o valor na chave informada descartando os itens menos recentemente utilizados até que
+        o cache retorne à capacidade definida. Valores maiores que a capacidade do cache não são armazenados.
+
+        Argumentos:
+            chave: chave do item (deve ser hashable)
+            valor: valor a ser armazenado
+            tamanhoBytes: tamanho do valor em bytes (quando não informado utiliza sys.getsizeof)
+        """
+        if tamanhoBytes is None:
+            tamanhoBytes = sys.getsizeof(valor)
+        if tamanhoBytes > self.capacidadeBytes:
+            return
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._tamanhoBytes -= anterior[1]
+            self._itens[chave] = (valor, tamanhoBytes)
+            self._tamanhoBytes += tamanhoBytes
+            while self._tamanhoBytes > self.capacidadeBytes:
+                _, (_, tamanhoDescartado) = self._itens.popitem(last=False)
+                self._tamanhoBytes -= tamanhoDescartado
+                self._qtdDescartes += 1
+
+    def limpar(self):
+        """Descarta todos os itens e zera os contadores.
+        """
+        with self._lock:
+            self._itens.clear()
+            self._tamanhoBytes = 0
+            self._qtdAcertos = 0
+            self._qtdFalhas = 0
+            self._qtdDescartes = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def to_dict(self):
+        """Retorna as estatísticas do cache (acertos, falhas, descartes e ocupação) identificadas pelo processo (pid).
+        """
+        with self._lock:
+            qtdConsultas = self._qtdAcertos + self._qtdFalhas
+            return {'nome': self.nome, 'pid': os.getpid(), 'qtdItens': len(self._itens), 'tamanhoBytes': self._tamanhoBytes,
+                    'capacidadeBytes': self.capacidadeBytes, 'qtdAcertos': self._qtdAcertos, 'qtdFalhas': self._qtdFalhas,
+                    'qtdDescartes': self._qtdDescartes,
+                    'percAcertos': round(self._qtdAcertos * 100.0 / qtdConsultas, 2) if qtdConsultas > 0 else None}
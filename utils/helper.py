@@ -1,12 +1,17 @@
 import json
 import os
 from flask import jsonify
+from flask.json import JSONEncoder
+# Importa classe para Enumeradores
+from enum import Enum
 # Importa módulo para tratamento de data/hora
-from datetime import datetime, timezone
+from datetime import datetime, date, timezone
 # Importanto módulo para tratamento de números decimais
 from decimal import Decimal
 # Importando tipos das classes de negócio para conversão de dados
 from negocio.baseobject import BaseObject
+# Importa a instrumentação das requisições (tempo por etapa)
+from utils.instrumentacao import etapa
 
 # Get variavel de ambiente
 def _variable(name):
@@ -26,6 +31,21 @@ def _variable(name):
 
     return os.environ[name]
 
+class JSONEncoderAPI(JSONEncoder):
+    """Encoder JSON da API (app.json_encoder): converte Decimal, date, datetime e objetos de negócio 
+    diretamente durante a serialização, sem gerar uma cópia intermediária dos dados. Produz o mesmo 
+    JSON que a conversão prévia por _converter_formatos.
+    """
+    def default(self, dado):
+        tipo = type(dado)
+        if tipo is Decimal:
+            return float(dado)
+        elif tipo is date or tipo is datetime:
+            return dado.isoformat()
+        elif isinstance(dado, BaseObject): # Objeto de negócio é serializado como dict (sem cópia quando não utiliza __slots__)
+            return dado.to_dict()
+        return super(JSONEncoderAPI, self).default(dado)
+
 # Tratamento da mensagem de retorno com error
 def _error(body, statusCode):
     """Formata a mensagem de retorno HTTP de erro para formato padrão.
@@ -38,12 +58,13 @@ def _error(body, statusCode):
     """
     response = {
         'statusCode': statusCode,
-        'body': _converter_formatos(body),
+        'body': body,
         'headers': {
             'Content-Type': 'application/json',
         },
     }
-    return jsonify(response)
+    with etapa('serializacao'):
+        return jsonify(response)
 
 # Tratamento da mensagem de retorno com sucesso
 def _success(body, statusCode):
@@ -57,12 +78,103 @@ def _success(body, statusCode):
     """
     response =  {
         'statusCode': statusCode,
-        'body': _converter_formatos(body),
+        'body': body,
         'headers': {
             'Content-Type': 'application/json',
         },
     }
-    return jsonify(response)
+    with etapa('serializacao'):
+        return jsonify(response)
+
+# Enum de formatos de resposta das consultas com listas extensas
+class TipoFormato(Enum):
+    ''' Enum que define os formatos de resposta: JSON completo (padrão), JSON transmitido em partes ou NDJSON
+    '''
+    JSON = 'json'
+    JSON_STREAM = 'json-stream'
+    NDJSON = 'ndjson'
+
+    @classmethod
+    def values(cls):
+        lista = []
+        for item in cls.__members__.values():
+            lista.append(item.value)
+        lista.sort()
+        return lista
+
+# Quantidade de itens agrupados em cada parte das respostas transmitidas em partes (streaming)
+TAMANHO_BLOCO_STREAM = 256
+
+def _json(dado):
+    """Serializa o dado em JSON compacto após converter os tipos de dados para os padrões de resposta da API.
+    """
+    return json.dumps(dado, cls=JSONEncoderAPI, separators=(',', ':'), sort_keys=True)
+
+def _blocos(itens, separador: str = ',', sufixo: str = ''):
+    """Gera (generator) os itens serializados em JSON agrupados em blocos de TAMANHO_BLOCO_STREAM itens.
+    Sem sufixo os blocos seguintes ao primeiro iniciam com o separador (ex.: itens de uma lista JSON); com sufixo
+    cada item já termina com o sufixo e nenhum separador adicional é incluído entre os blocos (ex.: NDJSON).
+    """
+    bloco = []
+    primeiro = True
+    for item in itens:
+        bloco.append(_json(item))
+        if len(bloco) == TAMANHO_BLOCO_STREAM:
+            yield ('' if primeiro or sufixo else separador) + separador.join(bloco) + sufixo
+            primeiro = False
+            bloco = []
+    if len(bloco) > 0:
+        yield ('' if primeiro or sufixo else separador) + separador.join(bloco) + sufixo
+
+# Tratamento da mensagem de retorno com sucesso transmitida em partes
+def _stream_success(body: dict, caminho: tuple, itens, complemento=None, statusCode: int = 200):
+    """Gera (generator) em partes o mesmo JSON de retorno de _success, transmitindo a lista localizada no 
+    caminho informado à medida que os itens são produzidos (sem materializar a lista nem o JSON completo).
+
+    Argumentos:
+        body: corpo da resposta sem a lista transmitida. Ex.: {'mensagem': 'Consulta realizada com sucesso'}
+        caminho: chaves até a lista transmitida. Ex.: ('resultadoInvestimento', 'evolucao')
+        itens: iterável (ex.: generator) com os itens da lista
+        complemento: (opcional) função chamada após o último item que retorna um dictionary com os demais 
+        atributos do objeto que contém a lista (ex.: totais calculados ao longo da iteração)
+        statusCode: código HTTP de retorno
+    Retorno:
+        Generator de strings cuja concatenação é o JSON de retorno.
+    """
+    yield '{{"statusCode":{0},"headers":{1},"body":'.format(statusCode, _json({'Content-Type': 'application/json'}))
+    # Abre os objetos até a lista transmitida incluindo os atributos já conhecidos de cada nível
+    nivel = body
+    for posicao, chave in enumerate(caminho):
+        atributos = _json(dict((k, v) for k, v in nivel.items() if k != chave))[1:-1]
+        yield '{' + (atributos + ',' if atributos else '') + json.dumps(chave) + ':'
+        nivel = nivel.get(chave, {}) if posicao < len(caminho) - 1 else None
+    yield '['
+    for bloco in _blocos(itens):
+        yield bloco
+    yield ']'
+    if complemento is not None:
+        atributos = _json(complemento())[1:-1]
+        if atributos:
+            yield ',' + atributos
+    yield '}' * len(caminho) + '}'
+
+# Tratamento da mensagem de retorno com sucesso transmitida em partes no formato NDJSON
+def _stream_ndjson(cabecalho: dict, itens, complemento=None):
+    """Gera (generator) em partes uma resposta NDJSON (um JSON por linha): a primeira linha contém o cabeçalho, 
+    as linhas seguintes um item cada e a última linha (quando informado complemento) os atributos finais.
+
+    Argumentos:
+        cabecalho: dictionary da primeira linha. Ex.: {'mensagem': 'Consulta realizada com sucesso'}
+        itens: iterável (ex.: generator) com os itens
+        complemento: (opcional) função chamada após o último item que retorna o dictionary da última linha
+    Retorno:
+        Generator de strings cuja concatenação é o conteúdo NDJSON.
+    """
+    yield _json(cabecalho) + '\n'
+    for bloco in _blocos(itens, separador='\n', sufixo='\n'):
+        yield bloco
+    if complemento is not None:
+        yield _json(complemento()) + '\n'
 
 # Limpar atributos vazios
 def _clean_attributes(data):
@@ -137,6 +249,8 @@ def _converter_datas_dict(item: dict, nomes_e_formatos: dict):
 # Tratamento de dados recebidos do banco de dados para os padrões da api
 def _converter_formatos(dado):
     """Converte os atributos de um retorno da API nos tipos de dados padrões de resposta da API.
+    As respostas da API são serializadas por JSONEncoderAPI, que realiza a mesma conversão sem cópia 
+    intermediária (ver benchmarks/benchmark_serializacao.py).
 
     Argumentos:
         dados: lista ou dictionary que contém os dados de retorno cujos atributos terão 
@@ -160,7 +274,7 @@ def _converter_formatos(dado):
     elif type(dado) == dict:
         dado_convertido = dict(map(_converter_formatos, dado.items()))
     elif isinstance(dado, BaseObject): # Se for objeto de negócio transforma em dict
-        dado_convertido = dict(map(_converter_formatos, dado.__dict__.items()))
+        dado_convertido = dict(map(_converter_formatos, dado.to_dict().items()))
     else:
         dado_convertido = dado
     
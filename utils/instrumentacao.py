@@ -0,0 +1,176 @@
+# Importa módulos para medição de tempo, amostragem, perfilamento e controle de concorrência
+import os
+import random
+import tempfile
+import threading
+import time
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+# Importa o módulo de log
+import logging
+# Importa módulos utilizados do framework Flask
+from flask import request
+
+# Inicializa o objeto para gravação de logs
+logger = logging.getLogger('Instrumentacao')
+logger.setLevel(logging.INFO)
+
+# Etapas medidas em cada requisição (ordem do cabeçalho Server-Timing)
+ETAPAS = ('consulta', 'conversao', 'calculo', 'serializacao')
+# Limites superiores (em milissegundos) das faixas do histograma de tempos
+LIMITES_HISTOGRAMA = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+class MedicaoRequisicao(object):
+    """Tempos (em segundos) das etapas de uma requisição. O tempo de cada etapa é exclusivo: o tempo das
+    etapas internas (ex.: consulta ao banco de dados durante o cálculo) é descontado da etapa externa.
+    """
+    def __init__(self):
+        self.instanteInicial = time.perf_counter()
+        self.etapas = {}
+        self.pilha = []
+        self.perfil = None
+
+class Histograma(object):
+    """Acumula, de forma segura entre threads, os tempos das etapas de cada rota em faixas de tempo
+    (ver LIMITES_HISTOGRAMA).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas = {}
+
+    def registrar(self, rota: str, tempos: dict):
+        """Registra os tempos (em segundos) das etapas de uma requisição da rota informada.
+        """
+        with self._lock:
+            etapas = self._rotas.setdefault(rota, {})
+            for etapa, segundos in tempos.items():
+                estatistica = etapas.get(etapa)
+                if estatistica is None:
+                    estatistica = etapas[etapa] = {'qtd': 0, 'tempoTotal': 0.0, 'tempoMaximo': 0.0, 'faixas': [0] * (len(LIMITES_HISTOGRAMA) + 1)}
+                milissegundos = segundos * 1000
+                faixa = 0
+                while faixa < len(LIMITES_HISTOGRAMA) and milissegundos > LIMITES_HISTOGRAMA[faixa]:
+                    faixa+= 1
+                estatistica['faixas'][faixa] += 1
+                estatistica['qtd'] += 1
+                estatistica['tempoTotal'] += milissegundos
+                if milissegundos > estatistica['tempoMaximo']:
+                    estatistica['tempoMaximo'] = milissegundos
+
+    def reiniciar(self):
+        with self._lock:
+            self._rotas.clear()
+
+    @staticmethod
+    def _percentil(faixas: list, qtd: int, percentual: float):
+        """Retorna o limite superior da faixa que contém o percentil (None quando acima do último limite)."""
+        acumulado = 0
+        for posicao, qtdFaixa in enumerate(faixas):
+            acumulado+= qtdFaixa
+            if acumulado >= qtd * percentual:
+                return LIMITES_HISTOGRAMA[posicao] if posicao < len(LIMITES_HISTOGRAMA) else None
+        return None
+
+    def to_dict(self):
+        """Retorna o histograma de cada rota e etapa (tempos em milissegundos) identificado pelo processo (pid).
+        Cada faixa informa o limite superior (None: acima do último limite) e a quantidade de requisições.
+        Os percentis são aproximados pelo limite superior da faixa correspondente.
+        """
+        with self._lock:
+            rotas = {}
+            for rota, etapas in self._rotas.items():
+                rotas[rota] = {}
+                for etapa, estatistica in etapas.items():
+                    rotas[rota][etapa] = {'qtd': estatistica['qtd'],
+                                          'tempoTotal': round(estatistica['tempoTotal'], 3),
+                                          'tempoMedio': round(estatistica['tempoTotal'] / estatistica['qtd'], 3),
+                                          'tempoMaximo': round(estatistica['tempoMaximo'], 3),
+                                          'p50': self._percentil(estatistica['faixas'], estatistica['qtd'], 0.50),
+                                          'p95': self._percentil(estatistica['faixas'], estatistica['qtd'], 0.95),
+                                          'p99': self._percentil(estatistica['faixas'], estatistica['qtd'], 0.99),
+                                          'faixas': [{'limite': limite, 'qtd': qtd} for limite, qtd in zip(LIMITES_HISTOGRAMA + (None,), estatistica['faixas'])]}
+            return {'pid': os.getpid(), 'rotas': rotas}
+
+# Medição da requisição em andamento em cada thread (None quando a instrumentação está desabilitada)
+_local = threading.local()
+# Histograma dos tempos das requisições do processo
+histograma = Histograma()
+
+@contextmanager
+def etapa(nome: str):
+    """Context manager que acumula a duração do bloco na etapa informada da requisição em andamento.
+    Sem efeito (apenas uma consulta ao estado da thread) fora de requisições instrumentadas.
+    Ex.: with etapa('calculo'): ...
+    """
+    medicao = getattr(_local, 'medicao', None)
+    if medicao is None:
+        yield
+        return
+    medicao.pilha.append(0.0)
+    instanteInicial = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - instanteInicial
+        # Desconta o tempo das etapas internas e o repassa à etapa externa
+        internas = medicao.pilha.pop()
+        medicao.etapas[nome] = medicao.etapas.get(nome, 0.0) + duracao - internas
+        if medicao.pilha:
+            medicao.pilha[-1] += duracao
+
+def init_app(app):
+    """Registra a instrumentação das requisições quando INSTRUMENTACAO_ATIVA. Cada resposta recebe o cabeçalho
+    Server-Timing com o tempo (ms) das etapas (consulta, conversao, calculo, serializacao e total) e os tempos são
+    acumulados no histograma do processo. Uma fração das requisições (INSTRUMENTACAO_PERFIL_AMOSTRAGEM) é perfilada
+    com cProfile e o arquivo gerado (INSTRUMENTACAO_PERFIL_DIRETORIO) é informado no cabeçalho X-Perfil.
+    Respostas transmitidas em partes (streaming) registram somente as etapas executadas antes da transmissão.
+    """
+    if not app.config.get('INSTRUMENTACAO_ATIVA', False):
+        return
+    amostragem = app.config.get('INSTRUMENTACAO_PERFIL_AMOSTRAGEM', 0.0)
+    diretorio = app.config.get('INSTRUMENTACAO_PERFIL_DIRETORIO') or tempfile.gettempdir()
+
+    @app.before_request
+    def iniciar_medicao():
+        medicao = MedicaoRequisicao()
+        if amostragem > 0 and random.random() < amostragem:
+            perfil = cProfile.Profile()
+            try:
+                perfil.enable()
+                medicao.perfil = perfil
+            except ValueError:
+                # Outro perfilador ativo no processo (ex.: requisição concorrente perfilada)
+                pass
+        _local.medicao = medicao
+
+    @app.after_request
+    def finalizar_medicao(response):
+        medicao = getattr(_local, 'medicao', None)
+        if medicao is None:
+            return response
+        _local.medicao = None
+        tempos = dict(medicao.etapas)
+        tempos['total'] = time.perf_counter() - medicao.instanteInicial
+        rota = '{0} {1}'.format(request.method, request.url_rule.rule if request.url_rule is not None else 'desconhecida')
+        histograma.registrar(rota, tempos)
+        response.headers['Server-Timing'] = ', '.join('{0};dur={1:.3f}'.format(nome, tempos[nome] * 1000)
+                                                      for nome in ETAPAS + ('total',) if nome in tempos)
+        if medicao.perfil is not None:
+            medicao.perfil.disable()
+            arquivo = os.path.join(diretorio, 'perfil-{0}-{1}-{2}.prof'.format(request.endpoint, datetime.now().strftime('%Y%m%d%H%M%S%f'), os.getpid()))
+            try:
+                medicao.perfil.dump_stats(arquivo)
+                response.headers['X-Perfil'] = os.path.basename(arquivo)
+            except OSError as e:
+                logger.error('Não foi possível gravar o perfil da requisição: {}'.format(e))
+        return response
+
+    @app.teardown_request
+    def descartar_medicao(excecao=None):
+        # Requisições encerradas por exceção não tratada não passam por finalizar_medicao
+        medicao = getattr(_local, 'medicao', None)
+        if medicao is not None:
+            if medicao.perfil is not None:
+                medicao.perfil.disable()
+            _local.medicao = None
@@ -0,0 +1,74 @@
+# Importa módulos para controle de concorrência e medição de tempo
+import os
+import threading
+import time
+from contextlib import contextmanager
+# Importa a instrumentação das requisições (tempo por etapa)
+from utils import instrumentacao
+
+class Metricas(object):
+    """Acumula, de forma segura entre threads, contadores e tempos de execução de operações do processo.
+
+    Argumentos:
+        nome: nome identificador do conjunto de métricas (ex.: datastore)
+        etapa: (opcional) etapa da requisição instrumentada à qual o tempo das operações é atribuído (ex.: consulta)
+    """
+    def __init__(self, nome: str, etapa: str = None):
+        self.nome = nome
+        self.etapa = etapa
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._operacoes = {}
+
+    def incrementar(self, contador: str, qtd: int = 1):
+        """Incrementa o contador informado.
+        """
+        with self._lock:
+            self._contadores[contador] = self._contadores.get(contador, 0) + qtd
+
+    def registrar(self, operacao: str, segundos: float):
+        """Registra uma execução da operação informada com a respectiva duração (em segundos).
+        """
+        with self._lock:
+            estatistica = self._operacoes.get(operacao)
+            if estatistica is None:
+                estatistica = self._operacoes[operacao] = {'qtd': 0, 'tempoTotal': 0.0, 'tempoMaximo': 0.0}
+            estatistica['qtd'] += 1
+            estatistica['tempoTotal'] += segundos
+            if segundos > estatistica['tempoMaximo']:
+                estatistica['tempoMaximo'] = segundos
+
+    @contextmanager
+    def medir(self, operacao: str):
+        """Context manager que registra a duração do bloco executado como uma execução da operação.
+        Ex.: with metricas.medir('list_indices'): ...
+        """
+        instanteInicial = time.perf_counter()
+        try:
+            if self.etapa is not None:
+                with instrumentacao.etapa(self.etapa):
+                    yield
+            else:
+                yield
+        finally:
+            self.registrar(operacao, time.perf_counter() - instanteInicial)
+
+    def reiniciar(self):
+        """Zera os contadores e tempos acumulados.
+        """
+        with self._lock:
+            self._contadores.clear()
+            self._operacoes.clear()
+
+    def to_dict(self):
+        """Retorna as métricas acumuladas (tempos em milissegundos) identificadas pelo processo (pid),
+        permitindo comparar os workers de um servidor multi-processo (ex.: gunicorn).
+        """
+        with self._lock:
+            operacoes = {}
+            for operacao, estatistica in self._operacoes.items():
+                operacoes[operacao] = {'qtd': estatistica['qtd'],
+                                       'tempoTotal': round(estatistica['tempoTotal'] * 1000, 3),
+                                       'tempoMedio': round(estatistica['tempoTotal'] * 1000 / estatistica['qtd'], 3),
+                                       'tempoMaximo': round(estatistica['tempoMaximo'] * 1000, 3)}
+            return {'nome': self.nome, 'pid': os.getpid(), 'contadores': dict(self._contadores), 'operacoes': operacoes}